@@ -5,10 +5,11 @@ import subprocess
 import tempfile
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta, datetime
 from pathlib import Path
 from typing import Tuple, Dict, Any, List
-from threading import Event
+from threading import Event, Condition, Lock
 import iso639
 import psutil
 import pytz
@@ -21,7 +22,8 @@ from app.log import logger
 from app.plugins import _PluginBase
 from app.utils.system import SystemUtils
 from plugins.autosubv2.ffmpeg import Ffmpeg
-from plugins.autosubv2.translate.openai import OpenAi
+from plugins.autosubv2.translate.memory import TranslationMemory
+from plugins.autosubv2.translate.openai import OpenAi, OpenAiRateLimitError
 from app.schemas.types import NotificationType
 
 
@@ -32,6 +34,113 @@ class UserInterruptException(Exception):
     """用户中断当前任务的异常"""
     pass
 
+
+class TranslateThrottle(object):
+    """
+    翻译请求并发控制：限制同时进行的请求数；遇到限流时并发减半并暂停一段时间，连续成功后逐步恢复并发
+    """
+    # 限流后最长暂停秒数
+    max_backoff = 60
+
+    def __init__(self, concurrency: int):
+        self._max_limit = max(1, concurrency)
+        self._limit = self._max_limit
+        self._running = 0
+        self._successes = 0
+        self._backoff = 0
+        self._pause_until = 0
+        self._cond = Condition()
+        # 限流次数
+        self.throttled = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def acquire(self, event: Event = None):
+        """
+        等待可用的请求名额
+        """
+        with self._cond:
+            while True:
+                if event and event.is_set():
+                    raise UserInterruptException(f"用户中断当前任务")
+                wait = self._pause_until - time.time()
+                if wait <= 0 and self._running < self._limit:
+                    self._running += 1
+                    return
+                self._cond.wait(timeout=min(wait, 1) if wait > 0 else 1)
+
+    def release(self, rate_limited: bool = False, retry_after: float = None):
+        """
+        释放请求名额
+        :param rate_limited: 本次请求是否被限流
+        :param retry_after: 服务端建议的等待秒数
+        """
+        with self._cond:
+            self._running -= 1
+            if rate_limited:
+                self.throttled += 1
+                self._successes = 0
+                # 同一轮并发请求中的多次限流只处理一次
+                if time.time() >= self._pause_until:
+                    self._limit = max(1, self._limit // 2)
+                    self._backoff = min(self._backoff * 2 if self._backoff else 2, self.max_backoff)
+                    self._pause_until = time.time() + (retry_after or self._backoff)
+            else:
+                if time.time() >= self._pause_until:
+                    self._backoff = 0
+                self._successes += 1
+                # 每连续成功一轮，并发加一
+                if self._limit < self._max_limit and self._successes >= self._limit:
+                    self._limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+class SubtitleSidecarIndex(object):
+    """
+    目录外挂字幕索引，每个目录只列举一次，生成新字幕后同步加入索引
+    """
+    extensions = (".srt", ".sub", ".ass", ".ssa", ".vtt")
+
+    def __init__(self):
+        self._lock = Lock()
+        self._dirs: Dict[str, List[str]] = {}
+
+    def update(self, directory: str, files: List[str]):
+        """
+        使用已列举的目录文件更新索引
+        """
+        with self._lock:
+            self._dirs[directory] = [file for file in files if os.path.splitext(file)[-1].lower() in self.extensions]
+
+    def get(self, directory: str) -> List[str]:
+        """
+        获取目录下的字幕文件名，目录未索引时列举一次
+        """
+        with self._lock:
+            if directory not in self._dirs:
+                try:
+                    files = os.listdir(directory)
+                except OSError:
+                    files = []
+                self._dirs[directory] = [file for file in files
+                                         if os.path.splitext(file)[-1].lower() in self.extensions]
+            return list(self._dirs[directory])
+
+    def add(self, file_path: str):
+        """
+        新生成的字幕文件加入索引
+        """
+        directory, file = os.path.split(str(file_path))
+        with self._lock:
+            files = self._dirs.get(directory)
+            if files is not None and file not in files \
+                    and os.path.splitext(file)[-1].lower() in self.extensions:
+                files.append(file)
+
+
 class AutoSubv2(_PluginBase):
     # 插件名称
     plugin_name = "AI字幕自动生成(v2)"
@@ -42,7 +151,7 @@ class AutoSubv2(_PluginBase):
     # 主题色
     plugin_color = "#2C4F7E"
     # 插件版本
-    plugin_version = "1.2"
+    plugin_version = "1.7"
     # 插件作者
     plugin_author = "TimoYoung"
     # 作者主页
@@ -61,6 +170,22 @@ class AutoSubv2(_PluginBase):
     # 语句结束符
     _end_token = ['.', '!', '?', '。', '！', '？', '。"', '！"', '？"', '."', '!"', '?"']
     _noisy_token = [('(', ')'), ('[', ']'), ('{', '}'), ('【', '】'), ('♪', '♪'), ('♫', '♫'), ('♪♪', '♪♪')]
+    # 流式识别每个窗口的音频秒数
+    _stream_window = 300
+    # 流式识别每次最少读取的音频秒数
+    _stream_min_read = 30
+    # 被限流时单次请求最多重试次数
+    _rate_limit_retries = 5
+    # 翻译并发控制
+    _throttle: TranslateThrottle = None
+    _stats_lock = Lock()
+    # 目录外挂字幕索引
+    _sidecars: SubtitleSidecarIndex = None
+    # 视频元数据，每个文件只读取一次
+    _video_metas: Dict[str, Any] = None
+    # faster-whisper模型，同一次任务中并行处理的文件共用
+    _whisper_model = None
+    _whisper_model_lock = Lock()
 
     def __init__(self):
         super().__init__()
@@ -89,6 +214,11 @@ class AutoSubv2(_PluginBase):
         self.batch_size = None
         self.context_window = None
         self.max_retries = None
+        self.translate_concurrency = None
+        self.translate_memory = None
+        self.process_workers = None
+        self.asr_stream = None
+        self._memory = None
         self._proxy = None
         self._translate_preference = None
 
@@ -129,9 +259,23 @@ class AutoSubv2(_PluginBase):
         self.batch_size = int(config.get('batch_size')) if config.get('batch_size') else 20
         self.context_window = int(config.get('context_window')) if config.get('context_window') else 5
         self.max_retries = int(config.get('max_retries')) if config.get('max_retries') else 3
+        try:
+            self.translate_concurrency = max(1, int(config.get('translate_concurrency') or 3))
+        except ValueError:
+            self.translate_concurrency = 3
+        try:
+            self.process_workers = max(1, int(config.get('process_workers') or 1))
+        except ValueError:
+            self.process_workers = 1
+        self.translate_memory = config.get('translate_memory', True)
+        if self.translate_zh and self.translate_memory:
+            self._memory = TranslationMemory(self.get_data_path() / "translation_memory.json")
+        else:
+            self._memory = None
         self.additional_args = config.get('additional_args', '-t 4 -p 1')
         self.send_notify = config.get('send_notify', False)
         self.asr_engine = config.get('asr_engine', 'faster_whisper')
+        self.asr_stream = config.get('asr_stream', False)
         self.faster_whisper_model = config.get('faster_whisper_model', 'base')
         self.faster_whisper_model_path = config.get('faster_whisper_model_path',
                                                     self.get_data_path() / "faster-whisper-models")
@@ -175,6 +319,13 @@ class AutoSubv2(_PluginBase):
         try:
             self._running = True
             self.success_count = self.skip_count = self.fail_count = self.process_count = 0
+            self._sidecars = SubtitleSidecarIndex()
+            self._video_metas = {}
+            # 清理异常退出的临时文件
+            tempdir = tempfile.gettempdir()
+            for file in os.listdir(tempdir):
+                if file.startswith('autosub-'):
+                    os.remove(os.path.join(tempdir, file))
             for path in path_list:
                 if self._event.is_set():
                     logger.info(f"字幕生成服务停止")
@@ -207,6 +358,9 @@ class AutoSubv2(_PluginBase):
         finally:
             logger.info(f"处理完成: "
                         f"成功{self.success_count} / 跳过{self.skip_count} / 失败{self.fail_count} / 共{self.process_count}")
+            # 任务结束后释放模型
+            with self._whisper_model_lock:
+                self._whisper_model = None
             self._running = False
 
     def __check_asr(self):
@@ -242,14 +396,41 @@ class AutoSubv2(_PluginBase):
             return False
         return True
 
+    def __add_count(self, name: str):
+        """
+        处理计数，多个文件并行处理时加锁
+        """
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def __get_video_meta(self, video_file):
+        """
+        获取视频元数据，同一文件只调用一次ffprobe，文件处理完第一阶段后释放
+        """
+        if video_file not in self._video_metas:
+            self._video_metas[video_file] = Ffmpeg().get_video_metadata(video_file)
+        return self._video_metas[video_file]
+
     def __process_file_subtitle(self, video_file):
-        if not video_file:
-            return
+        """
+        处理单个视频文件
+        """
+        prepared = self.__prepare_file_subtitle(video_file)
+        if prepared:
+            self.__finish_file_subtitle(*prepared)
+
+    def __prepare_file_subtitle(self, video_file):
+        """
+        第一阶段：判断目的字幕是否已存在，提取已有字幕或语音识别生成字幕
+        :return: 需要继续处理时返回 (视频文件, 开始时间, 字幕语言, 字幕路径)，否则返回None
+        """
+        if not video_file or self._event.is_set():
+            return None
         # 如果文件大小小于指定大小， 则不处理
         if os.path.getsize(video_file) < self.file_size:
-            return
+            return None
 
-        self.process_count += 1
+        self.__add_count('process_count')
         start_time = time.time()
         file_path, file_ext = os.path.splitext(video_file)
         file_name = os.path.basename(video_file)
@@ -259,28 +440,44 @@ class AutoSubv2(_PluginBase):
             # 判断目的字幕（和内嵌）是否已存在
             if self.__target_subtitle_exists(video_file):
                 logger.warn(f"字幕文件已经存在，不进行处理")
-                self.skip_count += 1
-                return
+                self.__add_count('skip_count')
+                return None
             # 生成字幕
             ret, lang, gen_sub_path = self.__generate_subtitle(video_file, file_path, self.enable_asr)
             if not ret:
                 message = f" 媒体: {file_name}\n "
                 if not self.enable_asr:
                     message += "内嵌&外挂字幕不存在，不进行翻译"
-                    self.skip_count += 1
+                    self.__add_count('skip_count')
                 else:
                     message += "生成字幕失败，跳过后续处理"
-                    self.fail_count += 1
+                    self.__add_count('fail_count')
 
                 if self.send_notify:
                     self.post_message(mtype=NotificationType.Plugin, title="【自动字幕生成】", text=message)
-                return
+                return None
+            self._sidecars.add(gen_sub_path)
+            return video_file, start_time, lang, gen_sub_path
+        except Exception as e:
+            self.__handle_file_error(video_file, start_time, e)
+            return None
+        finally:
+            # 元数据只在第一阶段使用
+            self._video_metas.pop(video_file, None)
+
+    def __finish_file_subtitle(self, video_file, start_time, lang, gen_sub_path):
+        """
+        第二阶段：翻译字幕并发送通知
+        """
+        file_path, file_ext = os.path.splitext(video_file)
+        file_name = os.path.basename(video_file)
 
+        try:
             if self.translate_zh:
                 # 翻译字幕
                 logger.info(f"开始翻译字幕为中文 ...")
-                # self.__translate_zh_subtitle(lang, f"{file_path}.{lang}.srt", f"{file_path}.zh.机翻.srt")
                 self.__translate_zh_subtitle(lang, gen_sub_path, f"{file_path}.zh.机翻.srt")
+                self._sidecars.add(f"{file_path}.zh.机翻.srt")
                 logger.info(f"翻译字幕完成：{file_name}.zh.机翻.srt")
 
             end_time = time.time()
@@ -291,32 +488,51 @@ class AutoSubv2(_PluginBase):
             logger.info(f"自动字幕生成 处理完成：{message}")
             if self.send_notify:
                 self.post_message(mtype=NotificationType.Plugin, title="【自动字幕生成】", text=message)
-            self.success_count += 1
-        except UserInterruptException:
-            logger.info(f"用户中断当前任务：{video_file}")
-            self.fail_count += 1
+            self.__add_count('success_count')
         except Exception as e:
-            logger.error(f"自动字幕生成 处理异常：{e}")
-            end_time = time.time()
-            message = f" 媒体: {file_name}\n 处理失败\n 耗时：{round(end_time - start_time, 2)}秒"
-            if self.send_notify:
-                self.post_message(mtype=NotificationType.Plugin, title="【自动字幕生成】", text=message)
-            # 打印调用栈
-            logger.error(traceback.format_exc())
-            self.fail_count += 1
+            self.__handle_file_error(video_file, start_time, e)
+
+    def __handle_file_error(self, video_file, start_time, e: Exception):
+        """
+        处理文件异常
+        """
+        if isinstance(e, UserInterruptException):
+            logger.info(f"用户中断当前任务：{video_file}")
+            self.__add_count('fail_count')
+            return
+        logger.error(f"自动字幕生成 处理异常：{e}")
+        end_time = time.time()
+        message = f" 媒体: {os.path.basename(video_file)}\n 处理失败\n 耗时：{round(end_time - start_time, 2)}秒"
+        if self.send_notify:
+            self.post_message(mtype=NotificationType.Plugin, title="【自动字幕生成】", text=message)
+        # 打印调用栈
+        logger.error(traceback.format_exc())
+        self.__add_count('fail_count')
 
     def __process_folder_subtitle(self, path):
         """
-        处理目录字幕
+        处理目录字幕：多个文件并行提取/识别字幕，识别完成的文件依次翻译，识别与翻译同时进行
         :param path:
         :return:
         """
-        # 获取目录媒体文件列表
-        for video_file in self.__get_library_files(path):
-            if self._event.is_set():
-                logger.info(f"{video_file}处理中止")
-                return
-            self.__process_file_subtitle(video_file)
+        # 获取目录媒体文件列表，同时建立目录字幕索引
+        video_files = list(self.__get_library_files(path, sidecars=self._sidecars))
+        if not video_files:
+            return
+        with ThreadPoolExecutor(max_workers=self.process_workers,
+                                thread_name_prefix="autosubv2-asr") as executor:
+            futures = [executor.submit(self.__prepare_file_subtitle, video_file) for video_file in video_files]
+            try:
+                for future in as_completed(futures):
+                    if self._event.is_set():
+                        logger.info(f"{path}处理中止")
+                        return
+                    prepared = future.result()
+                    if prepared:
+                        self.__finish_file_subtitle(*prepared)
+            finally:
+                for future in futures:
+                    future.cancel()
 
     def __do_speech_recognition(self, audio_lang, audio_file):
         """
@@ -342,18 +558,7 @@ class AutoSubv2(_PluginBase):
                 return True, lang
         elif self.asr_engine == 'faster-whisper':
             try:
-                from faster_whisper import WhisperModel, download_model
-                # 设置缓存目录, 防止缓存同目录出现 cross-device 错误
-                cache_dir = os.path.join(self.faster_whisper_model_path, "cache")
-                if not os.path.exists(cache_dir):
-                    os.mkdir(cache_dir)
-                os.environ["HF_HUB_CACHE"] = cache_dir
-                if self._proxy:
-                    os.environ["HTTP_PROXY"] = settings.PROXY['http']
-                    os.environ["HTTPS_PROXY"] = settings.PROXY['https']
-                model = WhisperModel(
-                    download_model(self.faster_whisper_model, local_files_only=False, cache_dir=cache_dir),
-                    device="cpu", compute_type="int8", cpu_threads=psutil.cpu_count(logical=False))
+                model = self.__load_faster_whisper_model()
                 segments, info = model.transcribe(audio_file,
                                                   language=lang if lang != 'auto' else None,
                                                   word_timestamps=True,
@@ -365,42 +570,167 @@ class AutoSubv2(_PluginBase):
                 if lang == 'auto':
                     lang = info.language
 
-                subs = []
-                if lang in ['en', 'eng']:
-                    # 英文先生成单词级别字幕，再合并
-                    idx = 0
-                    for segment in segments:
-                        if self._event.is_set():
-                            logger.info(f"whisper音轨转录服务停止")
-                            raise UserInterruptException(f"用户中断当前任务")
-                        for word in segment.words:
-                            idx += 1
-                            subs.append(srt.Subtitle(index=idx,
-                                                     start=timedelta(seconds=word.start),
-                                                     end=timedelta(seconds=word.end),
-                                                     content=word.word))
-                    subs = self.__merge_srt(subs)
-                else:
-                    for i, segment in enumerate(segments):
-                        if self._event.is_set():
-                            logger.info(f"whisper音轨转录服务停止")
-                            raise UserInterruptException(f"用户中断当前任务")
-                        subs.append(srt.Subtitle(index=i,
-                                                 start=timedelta(seconds=segment.start),
-                                                 end=timedelta(seconds=segment.end),
-                                                 content=segment.text))
+                subs = self.__segments_to_subs(self.__collect_segments(segments), lang)
                 self.__save_srt(f"{audio_file}.srt", subs)
                 logger.info(f"音轨转字幕完成")
                 return True, lang
             except ImportError:
                 logger.warn(f"faster-whisper 未安装，不进行处理")
                 return False, None
+            except UserInterruptException:
+                raise
             except Exception as e:
                 traceback.print_exc()
                 logger.error(f"faster-whisper 处理异常：{e}")
                 return False, None
         return False, None
 
+    def __load_faster_whisper_model(self):
+        """
+        加载faster-whisper模型，同一次任务只加载一次，并行处理的文件共用同一模型，
+        模型按并行文件数开启多个工作线程，多线程同时转录时不必各自加载模型
+        """
+        with self._whisper_model_lock:
+            if self._whisper_model is None:
+                self._whisper_model = self.__create_faster_whisper_model()
+            return self._whisper_model
+
+    def __create_faster_whisper_model(self):
+        """
+        创建faster-whisper模型
+        """
+        from faster_whisper import WhisperModel, download_model
+        # 设置缓存目录, 防止缓存同目录出现 cross-device 错误
+        cache_dir = os.path.join(self.faster_whisper_model_path, "cache")
+        if not os.path.exists(cache_dir):
+            os.mkdir(cache_dir)
+        os.environ["HF_HUB_CACHE"] = cache_dir
+        if self._proxy:
+            os.environ["HTTP_PROXY"] = settings.PROXY['http']
+            os.environ["HTTPS_PROXY"] = settings.PROXY['https']
+        return WhisperModel(
+            download_model(self.faster_whisper_model, local_files_only=False, cache_dir=cache_dir),
+            device="cpu", compute_type="int8",
+            cpu_threads=max(1, (psutil.cpu_count(logical=False) or 1) // (self.process_workers or 1)),
+            num_workers=self.process_workers or 1)
+
+    def __collect_segments(self, segments) -> list:
+        """
+        执行转录并收集识别结果，转录过程中响应停止
+        """
+        collected = []
+        for segment in segments:
+            if self._event.is_set():
+                logger.info(f"whisper音轨转录服务停止")
+                raise UserInterruptException(f"用户中断当前任务")
+            collected.append(segment)
+        return collected
+
+    def __segments_to_subs(self, segments: list, lang: str, offset: float = 0) -> List[srt.Subtitle]:
+        """
+        识别结果转换为字幕
+        :param offset: 识别音频起点在整个音轨中的秒数
+        """
+        subs = []
+        if lang in ['en', 'eng']:
+            # 英文先生成单词级别字幕，再合并
+            for segment in segments:
+                for word in segment.words:
+                    subs.append(srt.Subtitle(index=len(subs) + 1,
+                                             start=timedelta(seconds=offset + word.start),
+                                             end=timedelta(seconds=offset + word.end),
+                                             content=word.word))
+            return self.__merge_srt(subs)
+        for i, segment in enumerate(segments):
+            subs.append(srt.Subtitle(index=i,
+                                     start=timedelta(seconds=offset + segment.start),
+                                     end=timedelta(seconds=offset + segment.end),
+                                     content=segment.text))
+        return subs
+
+    def __do_stream_speech_recognition(self, video_file, audio_index, audio_lang, srt_path):
+        """
+        流式语音识别：从ffmpeg管道按固定时长读取音频分段识别，不生成临时音频文件，识别结果逐段写入字幕文件
+        :return: 是否成功，字幕语言
+        """
+        try:
+            import numpy as np
+            model = self.__load_faster_whisper_model()
+        except ImportError:
+            logger.warn(f"faster-whisper 未安装，不进行处理")
+            return False, None
+
+        lang = audio_lang
+        # 16000hz 16-bit 单声道，每秒字节数
+        bytes_per_second = 16000 * 2
+        window_bytes = self._stream_window * bytes_per_second
+        process = Ffmpeg.open_pcm_stream(video_file, audio_index)
+        if not process:
+            return False, None
+        # 尚未输出字幕的音频及其在音轨中的起始秒数
+        buffer = b""
+        offset = 0.0
+        index = 0
+        try:
+            with open(srt_path, 'w', encoding="utf8") as f:
+                eof = False
+                while not eof:
+                    if self._event.is_set():
+                        logger.info(f"whisper音轨转录服务停止")
+                        raise UserInterruptException(f"用户中断当前任务")
+                    size = max(window_bytes - len(buffer), self._stream_min_read * bytes_per_second)
+                    chunk = process.stdout.read(size)
+                    eof = len(chunk) < size
+                    buffer += chunk
+                    if len(buffer) < bytes_per_second // 10:
+                        break
+                    audio = np.frombuffer(buffer[:len(buffer) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+                    segments, info = model.transcribe(audio,
+                                                      language=lang if lang != 'auto' else None,
+                                                      word_timestamps=True,
+                                                      vad_filter=True,
+                                                      temperature=0,
+                                                      beam_size=5)
+                    if lang == 'auto':
+                        # 首个窗口识别语言，后续窗口沿用
+                        logger.info("Detected language '%s' with probability %f"
+                                    % (info.language, info.language_probability))
+                        lang = info.language
+                    segments = self.__collect_segments(segments)
+
+                    keep_from = len(buffer)
+                    if not eof:
+                        if len(segments) > 1:
+                            # 最后一段可能被窗口截断，留到下一个窗口重新识别
+                            keep_from = min(int(segments.pop().start * 16000) * 2, len(buffer))
+                        elif not segments:
+                            # 没有识别结果时保留末尾少量音频，避免截断刚开始的语音
+                            keep_from = max(len(buffer) - 2 * bytes_per_second, 0)
+
+                    for sub in self.__segments_to_subs(segments, lang, offset):
+                        index += 1
+                        sub.index = index
+                        f.write(sub.to_srt())
+                    f.flush()
+                    logger.info(f"已识别音频 {round(offset + keep_from / bytes_per_second)} 秒")
+                    buffer = buffer[keep_from:]
+                    offset += keep_from / bytes_per_second
+            if process.wait() != 0:
+                logger.error(f"ffmpeg 提取音频失败：{video_file}")
+                return False, None
+            logger.info(f"音轨转字幕完成")
+            return True, lang
+        except UserInterruptException:
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            logger.error(f"faster-whisper 处理异常：{e}")
+            return False, None
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
     def __generate_subtitle(self, video_file, subtitle_file, enable_asr=True):
         """
         生成字幕
@@ -409,7 +739,7 @@ class AutoSubv2(_PluginBase):
         :return: 生成成功返回True，字幕语言,字幕路径，否则返回False, None, None
         """
         # 获取文件元数据
-        video_meta = Ffmpeg().get_video_metadata(video_file)
+        video_meta = self.__get_video_meta(video_file)
         if not video_meta:
             logger.error(f"获取视频文件元数据失败，跳过后续处理")
             return False, None, None
@@ -438,10 +768,9 @@ class AutoSubv2(_PluginBase):
                                                                                 iso639.to_iso639_1(audio_lang)]
         # 获取外挂字幕
         logger.info(f"使用 {prefer_subtitle_langs} 匹配已有外挂字幕文件 ...")
-        external_sub_exist, external_sub_lang, exist_sub_name = self.__external_subtitle_exists(video_file,
-                                                                                                prefer_subtitle_langs,
-                                                                                                only_srt=True,
-                                                                                                strict=strict)
+        external_sub_exist, external_sub_lang, exist_sub_name = self.__external_subtitle_exists(
+            video_file, prefer_subtitle_langs, only_srt=True, strict=strict,
+            files=self._sidecars.get(os.path.dirname(video_file)))
         # 获取内嵌字幕
         logger.info(f"使用 {prefer_subtitle_langs} 匹配内嵌字幕文件 ...")
         inner_sub_exist, subtitle_index, inner_sub_lang, = self.__get_video_prefer_subtitle(video_meta,
@@ -494,11 +823,18 @@ class AutoSubv2(_PluginBase):
             logger.info(f"未开启语音识别，且无已有字幕文件，跳过后续处理")
             return False, None, None
 
-        # 清理异常退出的临时文件
-        tempdir = tempfile.gettempdir()
-        for file in os.listdir(tempdir):
-            if file.startswith('autosub-'):
-                os.remove(os.path.join(tempdir, file))
+        if self.asr_engine == 'faster-whisper' and self.asr_stream:
+            # 流式识别，字幕先写入临时文件
+            with tempfile.NamedTemporaryFile(prefix='autosub-', suffix='.srt', delete=True) as srt_file:
+                logger.info(f"开始流式生成字幕, 语言 {audio_lang} ...")
+                ret, lang = self.__do_stream_speech_recognition(video_file, audio_index, audio_lang, srt_file.name)
+                if not ret:
+                    logger.error(f"生成字幕失败")
+                    return False, None, None
+                logger.info(f"生成字幕成功，原始语言：{lang}")
+                SystemUtils.copy(Path(srt_file.name), Path(f"{subtitle_file}.{lang}.srt"))
+                logger.info(f"复制字幕文件：{subtitle_file}.{lang}.srt")
+                return ret, lang, Path(f"{subtitle_file}.{lang}.srt")
 
         with tempfile.NamedTemporaryFile(prefix='autosub-', suffix='.wav', delete=True) as audio_file:
             # 提取音频
@@ -522,9 +858,10 @@ class AutoSubv2(_PluginBase):
                 return False, None, None
 
     @staticmethod
-    def __get_library_files(in_path, exclude_path=None):
+    def __get_library_files(in_path, exclude_path=None, sidecars: SubtitleSidecarIndex = None):
         """
         获取目录媒体文件列表
+        :param sidecars: 目录字幕索引，遍历时顺带记录各目录的字幕文件
         """
         if not os.path.isdir(in_path):
             yield in_path
@@ -535,6 +872,8 @@ class AutoSubv2(_PluginBase):
                                     for path in exclude_path.split(",")):
                 continue
 
+            if sidecars is not None:
+                sidecars.update(root, files)
             for file in files:
                 cur_path = os.path.join(root, file)
                 # 检查后缀
@@ -732,33 +1071,92 @@ class AutoSubv2(_PluginBase):
         """
         return any(content.startswith(t[0]) and content.endswith(t[1]) for t in self._noisy_token)
 
-    def __get_context(self, all_subs: list, target_indices: List[int], is_batch: bool) -> str:
-        """通用上下文获取方法"""
-        min_idx = max(0, min(target_indices) - self.context_window)
-        max_idx = min(len(all_subs) - 1, max(target_indices) + self.context_window) if is_batch else min(target_indices)
-
-        context = []
-        for idx in range(min_idx, max_idx + 1):
-            status = "[待译]" if idx in target_indices else ""
-            content = all_subs[idx].content.replace('\n', ' ').strip()
-            context.append(f"{status}{content}")
-
-        return "\n".join(context)
-
-    def __process_items(self, all_subs: list, items: list) -> list:
-        """统一处理入口（支持批量和单条）"""
-        if self.enable_batch and len(items) > 1:
-            return self.__process_batch(all_subs, items)
-        return [self.__process_single(all_subs, item) for item in items]
-
-    def __process_batch(self, all_subs: list, batch: list) -> list:
-        """批量处理逻辑"""
-        indices = [all_subs.index(item) for item in batch]
-        context = self.__get_context(all_subs, indices, is_batch=True) if self.context_window > 0 else None
+    def __get_context(self, lines: List[str], target_indices: List[int], is_batch: bool) -> str:
+        """
+        通用上下文获取方法
+        :param lines: 预先清理过的全部字幕内容，与字幕位置一一对应
+        :param target_indices: 待译字幕的位置
+        """
+        first, last = min(target_indices), max(target_indices)
+        min_idx = max(0, first - self.context_window)
+        max_idx = min(len(lines) - 1, last + self.context_window) if is_batch else first
+
+        # 待译字幕为连续区间，按区间判断即可
+        if last - first + 1 == len(target_indices):
+            return "\n".join(f"[待译]{lines[idx]}" if first <= idx <= last else lines[idx]
+                             for idx in range(min_idx, max_idx + 1))
+        targets = set(target_indices)
+        return "\n".join(f"[待译]{lines[idx]}" if idx in targets else lines[idx]
+                         for idx in range(min_idx, max_idx + 1))
+
+    def __count(self, key: str, num: int = 1):
+        """
+        统计计数，翻译批次并发执行时加锁
+        """
+        with self._stats_lock:
+            self._stats[key] += num
+
+    def __translate(self, text: str, context: str = None) -> Tuple[bool, str]:
+        """
+        调用大模型翻译，受并发控制，被限流时退避后重试
+        """
+        for _ in range(self._rate_limit_retries):
+            self._throttle.acquire(self._event)
+            try:
+                ret, result = self.openai.translate_to_zh(text, context)
+            except OpenAiRateLimitError as e:
+                self._throttle.release(rate_limited=True, retry_after=e.retry_after)
+                self.__count('rate_limited')
+                logger.warn(f"翻译请求被限流，并发降为 {self._throttle.limit}：{str(e)}")
+                continue
+            except Exception:
+                self._throttle.release()
+                raise
+            self._throttle.release()
+            return ret, result
+        return False, "翻译请求持续被限流"
+
+    def __process_items(self, all_subs: list, lines: List[str], indices: List[int], keys: List[str] = None) -> list:
+        """
+        统一处理入口（支持批量和单条）
+        :param all_subs: 全部字幕
+        :param lines: 预先清理过的全部字幕内容
+        :param indices: 本批次字幕的位置
+        :param keys: 全部字幕的翻译记忆键，为空时不使用翻译记忆
+        """
+        results = {}
+        # 先查询翻译记忆，只翻译未命中的字幕
+        if keys and self._memory is not None:
+            for idx in indices:
+                trans = self._memory.get(keys[idx])
+                if trans:
+                    item = copy.copy(all_subs[idx])
+                    item.content = f"{trans}\n{item.content}"
+                    results[idx] = item
+            self.__count('memory_hit', len(results))
+            self.__count('memory_miss', len(indices) - len(results))
+        pending = [idx for idx in indices if idx not in results]
+        if self.enable_batch and len(pending) > 1:
+            results.update(zip(pending, self.__process_batch(all_subs, lines, pending, keys)))
+        else:
+            results.update((idx, self.__process_single(all_subs, lines, idx, keys)) for idx in pending)
+        return [results[idx] for idx in indices]
+
+    def __remember(self, keys: List[str], idx: int, trans: str):
+        """
+        保存译文到翻译记忆
+        """
+        if keys and self._memory is not None:
+            self._memory.set(keys[idx], trans)
+
+    def __process_batch(self, all_subs: list, lines: List[str], indices: List[int], keys: List[str] = None) -> list:
+        """批量处理逻辑，返回翻译后的字幕副本，原字幕保持不变以供其它批次构建上下文"""
+        batch = [all_subs[idx] for idx in indices]
+        context = self.__get_context(lines, indices, is_batch=True) if self.context_window > 0 else None
         batch_text = '\n'.join([item.content for item in batch])
 
         try:
-            ret, result = self.openai.translate_to_zh(batch_text, context)
+            ret, result = self.__translate(batch_text, context)
             if not ret:
                 raise Exception(result)
 
@@ -766,34 +1164,45 @@ class AutoSubv2(_PluginBase):
             if len(translated) != len(batch):
                 raise Exception(f"批次行数不匹配 {len(translated)}/{len(batch)}")
 
-            for item, trans in zip(batch, translated):
+            processed = []
+            for idx, item, trans in zip(indices, batch, translated):
+                self.__remember(keys, idx, trans)
+                item = copy.copy(item)
                 item.content = f"{trans}\n{item.content}"
-            self._stats['batch_success'] += len(batch)
-            return batch
+                processed.append(item)
+            self.__count('batch_success', len(batch))
+            return processed
+        except UserInterruptException:
+            raise
         except Exception as e:
             logger.warning(f"批次翻译失败（{str(e)}），降级到单行匹配...")
-            self._stats['batch_fail'] += 1
-            return [self.__process_single(all_subs, item) for item in batch]
+            self.__count('batch_fail')
+            return [self.__process_single(all_subs, lines, idx, keys) for idx in indices]
 
-    def __process_single(self, all_subs: List[srt.Subtitle], item: srt.Subtitle) -> srt.Subtitle:
+    def __process_single(self, all_subs: List[srt.Subtitle], lines: List[str], idx: int,
+                         keys: List[str] = None) -> srt.Subtitle:
         """单条处理逻辑"""
+        item = all_subs[idx]
+        context = self.__get_context(lines, [idx], is_batch=False) if self.context_window > 0 else None
         for _ in range(self.max_retries):
-            idx = all_subs.index(item)
-            context = self.__get_context(all_subs, [idx], is_batch=False) if self.context_window > 0 else None
-            success, trans = self.openai.translate_to_zh(item.content, context)
+            success, trans = self.__translate(item.content, context)
 
             if success:
+                self.__remember(keys, idx, trans)
+                item = copy.copy(item)
                 item.content = f"{trans}\n{item.content}"
-                self._stats['line_fallback'] += 1
+                self.__count('line_fallback')
                 return item
 
             time.sleep(1)
 
+        item = copy.copy(item)
         item.content = f"[翻译失败]\n{item.content}"
         return item
 
     def __translate_zh_subtitle(self, source_lang: str, source_subtitle: str, dest_subtitle: str):
-        self._stats = {'total': 0, 'batch_success': 0, 'batch_fail': 0, 'line_fallback': 0}
+        self._stats = {'total': 0, 'batch_success': 0, 'batch_fail': 0, 'line_fallback': 0, 'rate_limited': 0,
+                       'memory_hit': 0, 'memory_miss': 0}
         subs = self.__load_srt(source_subtitle)
         if source_lang in ["en", "eng"]:    
             valid_subs = self.__merge_srt(subs)
@@ -802,39 +1211,60 @@ class AutoSubv2(_PluginBase):
             valid_subs = subs
         self._stats['total'] = len(valid_subs)
         processed = []
-        current_batch = []
-
-        for item in valid_subs:
-            if self._event.is_set():
-                logger.info(f"字幕{source_subtitle}翻译停止")
-                raise UserInterruptException(f"用户中断当前任务")
-            current_batch.append(item)
-
-            if len(current_batch) >= self.batch_size:
-                processed += self.__process_items(valid_subs, current_batch)
-                current_batch = []
-                logger.info(f"进度: {len(processed)}/{len(valid_subs)}")
+        start_time = time.time()
 
-        if current_batch:
-            processed += self.__process_items(valid_subs, current_batch)
+        # 预先清理字幕内容，构建上下文时直接按位置取用
+        lines = [item.content.replace('\n', ' ').strip() for item in valid_subs]
+        # 翻译记忆键：原文 + 语言 + 模型 + 前后相邻字幕，前后字幕相同的重复台词（片头、片尾等）可直接复用
+        keys = [TranslationMemory.make_key(line, source_lang, self._openai_model or "",
+                                           f"{lines[idx - 1] if idx > 0 else ''}\n"
+                                           f"{lines[idx + 1] if idx + 1 < len(lines) else ''}")
+                for idx, line in enumerate(lines)] if self._memory is not None else None
+        # 多个批次同时翻译，按字幕顺序合并结果，批次只记录字幕位置
+        batches = [range(i, min(i + self.batch_size, len(valid_subs)))
+                   for i in range(0, len(valid_subs), self.batch_size)]
+        self._throttle = TranslateThrottle(self.translate_concurrency)
+        with ThreadPoolExecutor(max_workers=self.translate_concurrency,
+                                thread_name_prefix="autosubv2-translate") as executor:
+            futures = [executor.submit(self.__process_items, valid_subs, lines, batch, keys) for batch in batches]
+            try:
+                for future in futures:
+                    if self._event.is_set():
+                        logger.info(f"字幕{source_subtitle}翻译停止")
+                        raise UserInterruptException(f"用户中断当前任务")
+                    processed += future.result()
+                    logger.info(f"进度: {len(processed)}/{len(valid_subs)}")
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                # 中断或失败时也保存已完成的译文，重新运行时可直接复用
+                if self._memory is not None:
+                    self._memory.save()
 
         self.__save_srt(dest_subtitle, processed)
+        elapsed = max(time.time() - start_time, 0.001)
         logger.info(f"""
     翻译完成！
     总处理条目: {self._stats['total']}
-    批次成功: {self._stats['batch_success']} ({(self._stats['batch_success'] / self._stats['total']) * 100:.1f}%)
+    批次成功: {self._stats['batch_success']} ({(self._stats['batch_success'] / max(self._stats['total'], 1)) * 100:.1f}%)
     批次失败: {self._stats['batch_fail']}
     行补偿翻译: {self._stats['line_fallback']}
+    限流次数: {self._stats['rate_limited']}
+    翻译记忆命中: {self._stats['memory_hit']}/{self._stats['memory_hit'] + self._stats['memory_miss']} ({(self._stats['memory_hit'] / max(self._stats['memory_hit'] + self._stats['memory_miss'], 1)) * 100:.1f}%)
+    翻译速度: {self._stats['total'] / elapsed:.1f} 行/秒（并发 {self.translate_concurrency}）
             """)
 
     @staticmethod
-    def __external_subtitle_exists(video_file, prefer_langs=None, only_srt=False, strict=True):
+    def __external_subtitle_exists(video_file, prefer_langs=None, only_srt=False, strict=True, files=None):
         """
         外部字幕文件是否存在,支持多种格式及扩展需求。
         :param video_file: 视频文件路径
         :param prefer_langs: 偏好语言列表，支持单个语言字符串或列表
         :param only_srt: 是否只匹配srt格式的字幕
         :param strict: 是否严格匹配偏好语言.当不存在偏好语言字幕但存在其他语言字幕时,是否返回其他字幕
+        :param files: 视频所在目录的文件名列表，为空时列举目录
         :return: 元组 (是否存在, 检测到的语言, 文件名)
         """
         video_dir, video_name = os.path.split(video_file)
@@ -880,7 +1310,7 @@ class AutoSubv2(_PluginBase):
         second_lang = None
         second_file = None
         # 检查字幕文件
-        for file in os.listdir(video_dir):
+        for file in (files if files is not None else os.listdir(video_dir)):
             if not file.startswith(video_name):
                 continue
 
@@ -931,11 +1361,12 @@ class AutoSubv2(_PluginBase):
                 prefer_langs = None
                 strict = False
 
-        exist, lang, _ = self.__external_subtitle_exists(video_file, prefer_langs, strict=strict)
+        exist, lang, _ = self.__external_subtitle_exists(video_file, prefer_langs, strict=strict,
+                                                         files=self._sidecars.get(os.path.dirname(video_file)))
         if exist:
             return True
 
-        video_meta = Ffmpeg().get_video_metadata(video_file)
+        video_meta = self.__get_video_meta(video_file)
         if not video_meta:
             return False
         ret, subtitle_index, subtitle_lang = self.__get_video_prefer_subtitle(video_meta, prefer_lang=prefer_langs,
@@ -1116,6 +1547,40 @@ class AutoSubv2(_PluginBase):
                                     }
                                 ]
                             },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'process_workers',
+                                            'label': '并行处理文件数（越多内存占用越高）',
+                                            'placeholder': '1，faster-whisper共用一个模型，每增加一个文件需额外的识别缓存'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3,
+                                    'v-show': 'enable_asr'
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'asr_stream',
+                                            'label': '流式识别（不生成临时音频）',
+                                        }
+                                    }
+                                ]
+                            },
                         ]
                     },
                     {
@@ -1193,6 +1658,41 @@ class AutoSubv2(_PluginBase):
                                     }
                                 ]
                             },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3,
+                                    'v-show': 'translate_zh'
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'translate_concurrency',
+                                            'label': '并发翻译批次数',
+                                            'placeholder': '3'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3,
+                                    'v-show': 'translate_zh'
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'translate_memory',
+                                            'label': '启用翻译记忆',
+                                        }
+                                    }
+                                ]
+                            },
                         ]
                     },
                     {
@@ -1313,6 +1813,10 @@ class AutoSubv2(_PluginBase):
             "batch_size": 20,
             "context_window": 5,
             "max_retries": 3,
+            "translate_concurrency": 3,
+            "translate_memory": True,
+            "process_workers": 1,
+            "asr_stream": False,
             "path_list": "",
             "file_size": "10",
         }
@@ -26,6 +26,26 @@ class Ffmpeg:
             return True
         return False
 
+    @staticmethod
+    def open_pcm_stream(video_path, audio_index=None):
+        """
+        使用ffmpeg从视频文件中提取16000hz, 16-bit单声道PCM音频，通过管道输出，不落盘
+        :return: ffmpeg进程，从stdout读取音频数据
+        """
+        if not video_path:
+            return None
+
+        command = ['ffmpeg', "-hide_banner", "-loglevel", "warning", '-i', video_path]
+        # 提取指定音频流
+        if audio_index:
+            command += ['-map', f'0:a:{audio_index}']
+        command += ['-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', '16000', 'pipe:1']
+        try:
+            return subprocess.Popen(command, stdout=subprocess.PIPE)
+        except Exception as e:
+            print(e)
+        return None
+
     @staticmethod
     def get_video_metadata(video_path):
         """
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+from app.log import logger
+
+
+class TranslationMemory:
+    """
+    翻译记忆，按 原文 + 语言 + 模型 + 上下文 缓存译文，超出容量时淘汰最久未使用的条目
+    """
+
+    def __init__(self, path: Path, max_size: int = 50000):
+        self._path = path
+        self._max_size = max(1, max_size)
+        self._lock = Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._dirty = False
+        self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(text: str, lang: str, model: str, context: str = None) -> str:
+        """
+        生成缓存键，原文去除多余空白后参与计算
+        """
+        text = " ".join((text or "").split())
+        context_hash = hashlib.sha1((context or "").encode("utf-8")).hexdigest()
+        return hashlib.sha1(f"{lang}\0{model}\0{text}\0{context_hash}".encode("utf-8")).hexdigest()
+
+    def load(self):
+        """
+        从文件加载
+        """
+        with self._lock:
+            self._entries = OrderedDict()
+            self._dirty = False
+            if not self._path.exists():
+                return
+            try:
+                data = json.loads(self._path.read_text(encoding="utf-8")) or {}
+                self._entries = OrderedDict(data)
+                while len(self._entries) > self._max_size:
+                    self._entries.popitem(last=False)
+            except Exception as e:
+                logger.error(f"加载翻译记忆失败：{str(e)}")
+
+    def save(self) -> bool:
+        """
+        有变化时写入文件
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            content = json.dumps(self._entries, ensure_ascii=False, separators=(',', ':'))
+            self._dirty = False
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_suffix(".tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, self._path)
+            return True
+        except Exception as e:
+            logger.error(f"保存翻译记忆失败：{str(e)}")
+            return False
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查询译文，命中时标记为最近使用
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                # 访问顺序同样需要持久化
+                self._dirty = True
+            return value
+
+    def set(self, key: str, value: str):
+        """
+        保存译文
+        """
+        if not value:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+            self._dirty = True
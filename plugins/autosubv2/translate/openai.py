@@ -7,6 +7,14 @@ from cacheout import Cache
 OpenAISessionCache = Cache(maxsize=100, ttl=3600, timer=time.time, default=None)
 
 
+class OpenAiRateLimitError(Exception):
+    """请求被限流（HTTP 429）"""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class OpenAi:
     _api_key: str = None
     _api_url: str = None
@@ -107,11 +115,26 @@ class OpenAi:
         if OpenAISessionCache.get(session_id):
             OpenAISessionCache.delete(session_id)
 
+    @staticmethod
+    def __get_retry_after(error: Exception):
+        """
+        判断是否为限流错误，是则返回建议的等待秒数（未提供时为0），否则返回None
+        """
+        status = getattr(error, "http_status", None) or getattr(error, "status_code", None)
+        if status != 429:
+            return None
+        headers = getattr(error, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after") or 0)
+        except (TypeError, ValueError):
+            return 0
+
     def translate_to_zh(self, text: str, context: str = None):
         """
         翻译为中文
         :param text: 输入文本
         :param context: 翻译上下文
+        :raises OpenAiRateLimitError: 请求被限流，由调用方退避后重试
         """
         system_prompt = """您是一位专业字幕翻译专家，请严格遵循以下规则：
 1. 将原文精准翻译为简体中文，保持原文本意
@@ -129,5 +152,8 @@ class OpenAi:
             result = completion.choices[0].message.content.strip()
             return True, result
         except Exception as e:
+            retry_after = self.__get_retry_after(e)
+            if retry_after is not None:
+                raise OpenAiRateLimitError(str(e), retry_after=retry_after or None)
             print(f"{str(e)}：{result}")
             return False, f"{str(e)}：{result}"
@@ -4,9 +4,11 @@ import random
 import re
 import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 from threading import Event
-from typing import Any, List, Dict, Tuple, Optional, Union, Set
+from typing import Any, List, Dict, Tuple, Optional, Union, Set, Callable
 from urllib.parse import urlparse, parse_qs, unquote
 
 import pytz
@@ -37,6 +39,9 @@ class BrushConfig:
     刷流配置
     """
 
+    # 预编译的刷流条件属性，不参与站点配置复制及配置输出
+    COMPILED_ATTRS = ("size_range", "seeder_range", "pubtime_range", "brush_rules")
+
     def __init__(self, config: dict, process_site_config=True):
         self.enabled = config.get("enabled", False)
         self.notify = config.get("notify", True)
@@ -79,8 +84,12 @@ class BrushConfig:
         self.auto_qb_category = config.get("auto_qb_category", False)
         self.qb_first_last_piece = config.get("qb_first_last_piece", False)
         self.site_hr_active = config.get("site_hr_active", False)
+        self.brush_threads = self.__parse_number(config.get("brush_threads"))
+        self.brush_timeout = self.__parse_number(config.get("brush_timeout"))
 
         self.brush_tag = "刷流"
+        # 预编译刷流条件
+        self.__compile_brush_rules()
         # 站点独立配置
         self.enable_site_config = config.get("enable_site_config", False)
         self.site_config = config.get("site_config", "[]")
@@ -140,7 +149,7 @@ class BrushConfig:
                 site_specific_config = {key: config[key] for key in allowed_fields & set(config.keys())}
 
                 full_config = {key: getattr(self, key) for key in vars(self) if
-                               key not in ['group_site_configs', 'site_config']}
+                               key not in ['group_site_configs', 'site_config', *self.COMPILED_ATTRS]}
                 full_config.update(site_specific_config)
 
                 self.group_site_configs[sitename] = BrushConfig(config=full_config, process_site_config=False)
@@ -196,6 +205,126 @@ class BrushConfig:
 }]"""
         return desc + config
 
+    def __compile_brush_rules(self):
+        """
+        预编译刷流条件，解析范围数值及正则表达式，生成按顺序执行的条件链
+        """
+        self.size_range = self.__parse_range(self.size, desc="种子大小", scale=1024 ** 3)
+        self.seeder_range = self.__parse_range(self.seeder, desc="做种人数")
+        self.pubtime_range = self.__parse_range(self.pubtime, desc="发布时间")
+
+        rules: List[Callable[[Any], Optional[str]]] = []
+
+        # 促销条件
+        if self.freeleech:
+            rules.append(lambda torrent: "非免费种子" if torrent.downloadvolumefactor != 0 else None)
+        if self.freeleech == "2xfree":
+            rules.append(lambda torrent: "非双倍上传种子" if torrent.uploadvolumefactor != 2 else None)
+
+        # H&R
+        if self.hr == "yes":
+            rules.append(lambda torrent: "存在H&R" if torrent.hit_and_run else None)
+
+        # 包含规则
+        include = self.__compile_pattern(self.include, desc="包含规则")
+        if include:
+            rules.append(lambda torrent: None if include.search(torrent.title or "")
+                         or include.search(torrent.description or "") else "不符合包含规则")
+
+        # 排除规则
+        exclude = self.__compile_pattern(self.exclude, desc="排除规则")
+        if exclude:
+            rules.append(lambda torrent: "符合排除规则" if exclude.search(torrent.title or "")
+                         or exclude.search(torrent.description or "") else None)
+
+        # 种子大小（GB）
+        sizes = self.size_range
+        if sizes and len(sizes) == 1:
+            rules.append(lambda torrent: f"种子大小 {torrent.size / 1024 ** 3:.1f} GB，不符合条件"
+                         if torrent.size < sizes[0] else None)
+        elif sizes:
+            rules.append(lambda torrent: f"种子大小 {torrent.size / 1024 ** 3:.1f} GB，不在指定范围内"
+                         if not sizes[0] <= torrent.size <= sizes[1] else None)
+
+        # 做种人数，仅指定了一个数字时，做种人数需要小于等于该数字
+        seeders = self.seeder_range
+        if seeders and len(seeders) == 1:
+            rules.append(lambda torrent: f"做种人数 {torrent.seeders}，超过单个指定值"
+                         if torrent.seeders > seeders[0] else None)
+        elif seeders:
+            rules.append(lambda torrent: f"做种人数 {torrent.seeders}，不在指定范围内"
+                         if not seeders[0] <= torrent.seeders <= seeders[1] else None)
+
+        # 发布时间，已支持独立站点配置，取消单独适配站点时区逻辑，可通过配置项「pubtime」自行适配
+        pubtimes = self.pubtime_range
+        if pubtimes:
+            def check_pubtime(torrent) -> Optional[str]:
+                pubdate_minutes = self.get_pubminutes(torrent.pubdate)
+                if len(pubtimes) == 1:
+                    # 单个值：选择发布时间小于等于该值的种子
+                    if pubdate_minutes > pubtimes[0]:
+                        return f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不符合条件"
+                elif not pubtimes[0] <= pubdate_minutes <= pubtimes[1]:
+                    # 范围值：选择发布时间在范围内的种子
+                    return f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不在指定范围内"
+                return None
+
+            rules.append(check_pubtime)
+
+        self.brush_rules = rules
+
+    def evaluate_brush_rules(self, torrent: Any) -> Tuple[bool, Optional[str]]:
+        """
+        依次执行预编译的刷流条件，返回是否通过及未通过的原因
+        """
+        for rule in self.brush_rules:
+            reason = rule(torrent)
+            if reason:
+                return False, reason
+        return True, None
+
+    @staticmethod
+    def __parse_range(value, desc: str, scale: float = 1) -> Optional[Tuple[float, ...]]:
+        """
+        解析数字或数字范围（如'5', '5.5', '5-10'），返回按比例换算后的数值元组
+        """
+        if value is None or value == "":
+            return None
+        try:
+            return tuple(float(n) * scale for n in str(value).split("-"))
+        except ValueError:
+            logger.error(f"{desc}设置错误：{value}，已忽略该条件")
+            return None
+
+    @staticmethod
+    def __compile_pattern(pattern: Optional[str], desc: str) -> Optional[re.Pattern]:
+        """
+        预编译正则表达式，忽略大小写
+        """
+        if not pattern:
+            return None
+        try:
+            return re.compile(pattern, re.I)
+        except re.error as e:
+            logger.error(f"{desc}设置错误：{pattern}，已忽略该条件，错误详情: {e}")
+            return None
+
+    @staticmethod
+    def get_pubminutes(pubdate: str) -> float:
+        """
+        将字符串转换为时间，并计算与当前时间差）（分钟）
+        """
+        try:
+            if not pubdate:
+                return 0
+            pubdate = pubdate.replace("T", " ").replace("Z", "")
+            pubdate = datetime.strptime(pubdate, "%Y-%m-%d %H:%M:%S")
+            now = datetime.now()
+            return (now - pubdate).total_seconds() // 60
+        except Exception as e:
+            logger.error(f"发布时间 {pubdate} 获取分钟失败，错误详情: {e}")
+            return 0
+
     def get_site_config(self, sitename):
         """
         根据站点名称获取特定的BrushConfig实例。如果没有找到站点特定的配置，则返回全局的BrushConfig实例。
@@ -239,7 +368,7 @@ class BrushConfig:
             return str(v)
 
     def __str__(self):
-        attrs = vars(self)
+        attrs = {k: v for k, v in vars(self).items() if k not in self.COMPILED_ATTRS}
         # Note the use of self.format_value(v) here to call the instance method
         attrs_str = ', '.join(f'"{k}": {self.__format_value(v)}' for k, v in attrs.items())
         return f'{{ {attrs_str} }}'
@@ -248,6 +377,388 @@ class BrushConfig:
         return self.__str__()
 
 
+class BrushTaskStore:
+    """
+    刷流任务存储
+    按种子Hash维护活跃、归档及未托管任务，各分组按Hash分片保存，仅回写包含变更任务的分片，并增量维护统计数据
+    """
+
+    # 统计字段
+    STATISTIC_KEYS = ("count", "deleted", "uploaded", "downloaded", "unarchived",
+                      "active", "active_uploaded", "active_downloaded")
+    # 任务分组
+    BUCKET_KEYS = ("torrents", "archived", "unmanaged")
+    # 每个分组的分片数量
+    SHARD_COUNT = 16
+    # 已迁移为分片保存的标记，存在时不再读取旧版按整组保存的数据
+    SHARD_FLAG_KEY = "task_shards"
+
+    def __init__(self, get_data: Callable[[str], Any], save_data: Callable[[str, Any], Any]):
+        self._get_data = get_data
+        self._save_data = save_data
+        self._lock = threading.RLock()
+        self._active: Dict[str, dict] = {}
+        self._archived: Dict[str, dict] = {}
+        self._unmanaged: Dict[str, dict] = {}
+        # 各数据分组中发生变更的种子Hash
+        self._dirty: Dict[str, Set[str]] = {}
+        self._statistic: Dict[str, float] = {}
+        self._seeding_size = 0
+        # 活跃任务的去重索引，值为命中的任务数量
+        self._title_keys: Dict[str, int] = {}
+        self._page_url_keys: Dict[str, int] = {}
+        self._title_sites: Dict[str, Dict[str, int]] = {}
+        # 旧版整组数据尚未迁移到分片
+        self._migrating = False
+        self.reload()
+
+    @classmethod
+    def shard_key(cls, bucket: str, torrent_hash: str) -> str:
+        """
+        任务所在分片的数据键
+        """
+        return f"{bucket}_{zlib.crc32(torrent_hash.encode('utf-8')) % cls.SHARD_COUNT:02d}"
+
+    def __load_bucket(self, bucket: str) -> Dict[str, dict]:
+        """
+        加载分组的全部分片，尚未迁移时读取旧版按整组保存的数据
+        """
+        tasks = {}
+        for index in range(self.SHARD_COUNT):
+            tasks.update(self._get_data(f"{bucket}_{index:02d}") or {})
+        if self._migrating:
+            legacy = self._get_data(bucket)
+            if legacy:
+                for torrent_hash, task in legacy.items():
+                    tasks.setdefault(torrent_hash, task)
+                # 全部任务标记变更，下次回写时写入分片
+                self._dirty.setdefault(bucket, set()).update(tasks.keys())
+        return tasks
+
+    def reload(self):
+        """
+        从插件数据中加载全部任务，并重新计算统计数据
+        """
+        with self._lock:
+            self._dirty = {}
+            self._migrating = not self._get_data(self.SHARD_FLAG_KEY)
+            self._active = self.__load_bucket("torrents")
+            self._archived = self.__load_bucket("archived")
+            self._unmanaged = self.__load_bucket("unmanaged")
+            self._statistic = {key: 0 for key in self.STATISTIC_KEYS}
+            self._seeding_size = 0
+            self._title_keys, self._page_url_keys, self._title_sites = {}, {}, {}
+            for torrent_hash, task in self._archived.items():
+                # 与活跃任务重复的归档任务只统计一次
+                if torrent_hash not in self._active:
+                    self.__apply(task=task, archived=True, sign=1)
+            for task in self._active.values():
+                self.__apply(task=task, archived=False, sign=1)
+            # 统计数据由任务重新计算得到，无需回写
+            self._dirty.pop("statistic", None)
+
+    def get(self, torrent_hash: str, default: Optional[dict] = None) -> Optional[dict]:
+        return self._active.get(torrent_hash, default)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._active.keys())
+
+    def values(self) -> List[dict]:
+        with self._lock:
+            return list(self._active.values())
+
+    def items(self) -> List[Tuple[str, dict]]:
+        with self._lock:
+            return list(self._active.items())
+
+    def __contains__(self, torrent_hash: str) -> bool:
+        return torrent_hash in self._active
+
+    def __getitem__(self, torrent_hash: str) -> dict:
+        return self._active[torrent_hash]
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def contains_title(self, site_name: str, title: str) -> bool:
+        """
+        判断活跃任务中是否存在相同站点、相同标题的种子
+        """
+        return f"{site_name}{title}" in self._title_keys
+
+    def contains_page_url(self, site_name: str, page_url: str) -> bool:
+        """
+        判断活跃任务中是否存在相同站点、相同详情地址的种子
+        """
+        return f"{site_name}{page_url}" in self._page_url_keys
+
+    def contains_title_in_other_site(self, site_name: str, title: str) -> bool:
+        """
+        判断活跃任务中其他站点是否存在尚未做种的相同标题种子
+        """
+        sites = self._title_sites.get(title)
+        return bool(sites) and any(site != site_name for site in sites)
+
+    @property
+    def seeding_size(self) -> float:
+        """
+        保种体积，即未删除的活跃任务的种子体积之和
+        """
+        return self._seeding_size
+
+    @property
+    def statistic(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._statistic)
+
+    def upsert(self, torrent_hash: str, task: dict):
+        """
+        新增或替换活跃任务
+        """
+        with self._lock:
+            old_task = self._active.get(torrent_hash)
+            if old_task is not None:
+                self.__apply(task=old_task, archived=False, sign=-1)
+            elif torrent_hash in self._archived:
+                # 与活跃任务重复的归档任务只统计一次
+                self.__apply(task=self._archived[torrent_hash], archived=True, sign=-1)
+            self._active[torrent_hash] = task
+            self.__apply(task=task, archived=False, sign=1)
+            self.__mark_dirty("torrents", torrent_hash)
+
+    def update(self, torrent_hash: str, **fields) -> bool:
+        """
+        更新活跃任务的部分字段，字段值没有变化时不会标记变更
+        """
+        with self._lock:
+            task = self._active.get(torrent_hash)
+            if task is None:
+                return False
+            if all(task.get(key) == value for key, value in fields.items()):
+                return False
+            self.__apply(task=task, archived=False, sign=-1)
+            task.update(fields)
+            self.__apply(task=task, archived=False, sign=1)
+            self.__mark_dirty("torrents", torrent_hash)
+            return True
+
+    def unmanage(self, torrent_hash: str) -> Optional[dict]:
+        """
+        将活跃任务移出刷流管理
+        """
+        with self._lock:
+            task = self._active.pop(torrent_hash, None)
+            if task is None:
+                return None
+            self.__apply(task=task, archived=False, sign=-1)
+            if torrent_hash in self._archived:
+                self.__apply(task=self._archived[torrent_hash], archived=True, sign=1)
+            self._unmanaged[torrent_hash] = task
+            self.__mark_dirty("torrents", torrent_hash)
+            self.__mark_dirty("unmanaged", torrent_hash)
+            return task
+
+    def manage(self, torrent_hash: str) -> Optional[dict]:
+        """
+        将未托管任务重新纳入刷流管理
+        """
+        with self._lock:
+            task = self._unmanaged.pop(torrent_hash, None)
+            if task is None:
+                return None
+            self.__mark_dirty("unmanaged", torrent_hash)
+            self.upsert(torrent_hash, task)
+            return task
+
+    def is_unmanaged(self, torrent_hash: str) -> bool:
+        return torrent_hash in self._unmanaged
+
+    def archive(self, torrent_hashes: List[str]) -> int:
+        """
+        归档活跃任务，返回归档数量
+        """
+        count = 0
+        with self._lock:
+            for torrent_hash in torrent_hashes:
+                task = self._active.pop(torrent_hash, None)
+                if task is None:
+                    continue
+                self.__apply(task=task, archived=False, sign=-1)
+                self._archived[torrent_hash] = task
+                self.__apply(task=task, archived=True, sign=1)
+                self.__mark_dirty("torrents", torrent_hash)
+                self.__mark_dirty("archived", torrent_hash)
+                count += 1
+        return count
+
+    def clear(self):
+        """
+        清除全部任务及统计数据
+        """
+        with self._lock:
+            # 原有任务所在的分片需要回写为空
+            for bucket, tasks in zip(self.BUCKET_KEYS, (self._active, self._archived, self._unmanaged)):
+                self._dirty.setdefault(bucket, set()).update(tasks.keys())
+            self._active, self._archived, self._unmanaged = {}, {}, {}
+            self._statistic = {key: 0 for key in self.STATISTIC_KEYS}
+            self._seeding_size = 0
+            self._title_keys, self._page_url_keys, self._title_sites = {}, {}, {}
+            self._dirty.setdefault("statistic", set())
+
+    def flush(self) -> int:
+        """
+        回写包含变更任务的分片及统计数据，返回变更的任务数量
+        """
+        with self._lock:
+            if not self._dirty:
+                return 0
+            buckets = {
+                "torrents": self._active,
+                "archived": self._archived,
+                "unmanaged": self._unmanaged
+            }
+            changed = 0
+            for key, hashes in self._dirty.items():
+                if key == "statistic":
+                    self._save_data(key, self._statistic)
+                    continue
+                changed += len(hashes)
+                shards = {self.shard_key(key, torrent_hash): {} for torrent_hash in hashes}
+                for torrent_hash, task in buckets[key].items():
+                    shard = shards.get(self.shard_key(key, torrent_hash))
+                    if shard is not None:
+                        shard[torrent_hash] = task
+                for shard_key, tasks in shards.items():
+                    self._save_data(shard_key, tasks)
+            if self._migrating:
+                # 旧版整组数据已全部写入分片，原数据保留不删除，降级后仍可读取
+                self._save_data(self.SHARD_FLAG_KEY, self.SHARD_COUNT)
+                self._migrating = False
+            self._dirty = {}
+            return changed
+
+    @staticmethod
+    def __count(index: Dict[str, int], key: str, sign: int):
+        count = index.get(key, 0) + sign
+        if count > 0:
+            index[key] = count
+        else:
+            index.pop(key, None)
+
+    def __index(self, task: dict, sign: int):
+        """
+        维护活跃任务的去重索引
+        """
+        site_name = f"{task.get('site_name')}"
+        title = f"{task.get('title')}"
+        self.__count(self._title_keys, f"{site_name}{title}", sign)
+        self.__count(self._page_url_keys, f"{site_name}{task.get('page_url')}", sign)
+        if not task.get("seed_time"):
+            sites = self._title_sites.setdefault(title, {})
+            self.__count(sites, site_name, sign)
+            if not sites:
+                self._title_sites.pop(title, None)
+
+    def __mark_dirty(self, key: str, torrent_hash: str):
+        self._dirty.setdefault(key, set()).add(torrent_hash)
+
+    def __apply(self, task: dict, archived: bool, sign: int):
+        """
+        将任务对统计数据的贡献累加（sign=1）或扣减（sign=-1）
+        """
+        deleted = bool(task.get("deleted", False))
+        uploaded = task.get("uploaded") or 0
+        downloaded = task.get("downloaded") or 0
+        statistic = self._statistic
+        statistic["count"] += sign
+        statistic["uploaded"] += sign * uploaded
+        statistic["downloaded"] += sign * downloaded
+        if deleted:
+            statistic["deleted"] += sign
+        if not archived:
+            self.__index(task=task, sign=sign)
+            if deleted:
+                statistic["unarchived"] += sign
+            else:
+                statistic["active"] += sign
+                statistic["active_uploaded"] += sign * uploaded
+                statistic["active_downloaded"] += sign * downloaded
+                self._seeding_size += sign * (task.get("size") or 0)
+        self._dirty.setdefault("statistic", set())
+
+
+class TorrentSnapshot:
+    """
+    下载器种子快照
+    将种子信息一次性转换为列式数据，供删除条件按列批量计算
+    """
+
+    # 参与删除条件计算的列
+    COLUMNS = ("seeding_time", "ratio", "uploaded", "downloaded", "avg_upspeed", "iatime", "dltime", "total_size")
+
+    def __init__(self, torrent_infos: List[dict]):
+        self.infos = torrent_infos
+        self.hashes = [info.get("hash") for info in torrent_infos]
+        self.index = {torrent_hash: i for i, torrent_hash in enumerate(self.hashes)}
+        self.columns: Dict[str, list] = {
+            column: [info.get(column) or 0 for info in torrent_infos] for column in self.COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __contains__(self, torrent_hash: str) -> bool:
+        return torrent_hash in self.index
+
+    def get(self, torrent_hash: str) -> Optional[dict]:
+        """
+        获取单个种子的信息
+        """
+        i = self.index.get(torrent_hash)
+        return self.infos[i] if i is not None else None
+
+    def column(self, name: str) -> list:
+        return self.columns[name]
+
+
+class DownloaderSnapshot:
+    """
+    下载器快照缓存
+    在有效期内复用下载器种子列表及传输信息，避免同一周期内重复请求下载器
+    """
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        获取缓存数据，缓存不存在或已过期时通过loader重新加载，loader返回None时不缓存
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[0] < self.ttl:
+                return entry[1]
+        value = loader()
+        if value is not None:
+            with self._lock:
+                self._entries[key] = (time.time(), value)
+        return value
+
+    def invalidate(self, *keys: str):
+        """
+        使指定的缓存失效，未指定时清空全部缓存
+        """
+        with self._lock:
+            if not keys:
+                self._entries.clear()
+                return
+            for key in keys:
+                self._entries.pop(key, None)
+
+
 class BrushFlow(_PluginBase):
     # region 全局定义
 
@@ -258,7 +769,7 @@ class BrushFlow(_PluginBase):
     # 插件图标
     plugin_icon = "brush.jpg"
     # 插件版本
-    plugin_version = "3.8"
+    plugin_version = "3.13"
     # 插件作者
     plugin_author = "jxxghp,InfinityPacer"
     # 作者主页
@@ -279,6 +790,12 @@ class BrushFlow(_PluginBase):
     tr = None
     # 刷流配置
     _brush_config = None
+    # 刷流任务存储
+    _task_store = None
+    # 下载器快照缓存
+    _downloader_snapshot = None
+    # 下载器快照有效期（秒）
+    _downloader_snapshot_ttl = 60
     # Brush任务是否启动
     _task_brush_enable = False
     # 订阅缓存信息
@@ -300,6 +817,8 @@ class BrushFlow(_PluginBase):
         self.siteoper = SiteOper()
         self.torrents = TorrentsChain()
         self.subscribeoper = SubscribeOper()
+        self._task_store = BrushTaskStore(get_data=self.get_data, save_data=self.save_data)
+        self._downloader_snapshot = DownloaderSnapshot(ttl=self._downloader_snapshot_ttl)
         self._task_brush_enable = False
 
         if not config:
@@ -1153,6 +1672,49 @@ class BrushFlow(_PluginBase):
                                                 ]
                                             }
                                         ]
+                                    },
+                                    {
+                                        'component': 'VRow',
+                                        'content': [
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'brush_threads',
+                                                            'label': '站点并发数',
+                                                            'placeholder': '同时获取种子的站点数，默认5',
+                                                            'type': 'number',
+                                                            "min": "1"
+                                                        }
+                                                    }
+                                                ]
+                                            },
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'brush_timeout',
+                                                            'label': '站点获取超时时间（秒）',
+                                                            'placeholder': '超时后跳过该站点，默认60',
+                                                            'type': 'number',
+                                                            "min": "1"
+                                                        }
+                                                    }
+                                                ]
+                                            }
+                                        ]
                                     }
                                 ]
                             },
@@ -1856,7 +2418,7 @@ class BrushFlow(_PluginBase):
 
     def get_page(self) -> List[dict]:
         # 种子明细
-        torrents = self.get_data("torrents") or {}
+        torrents = self._task_store.values() if self._task_store else []
 
         if not torrents:
             return [
@@ -1869,9 +2431,8 @@ class BrushFlow(_PluginBase):
                 }
             ]
         else:
-            data_list = torrents.values()
             # 按time倒序排序
-            data_list = sorted(data_list, key=lambda x: x.get("time") or 0, reverse=True)
+            data_list = sorted(torrents, key=lambda x: x.get("time") or 0, reverse=True)
 
         # 表格标题
         headers = [
@@ -1973,11 +2534,9 @@ class BrushFlow(_PluginBase):
         with lock:
             logger.info(f"开始执行刷流任务 ...")
 
-            torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
-            torrents_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
-
             # 判断能否通过保种体积前置条件
-            size_condition_passed, reason = self.__evaluate_size_condition_for_brush(torrents_size=torrents_size)
+            size_condition_passed, reason = self.__evaluate_size_condition_for_brush(
+                torrents_size=self._task_store.seeding_size)
             self.__log_brush_conditions(passed=size_condition_passed, reason=reason)
             if not size_condition_passed:
                 logger.info(f"刷流任务执行完成")
@@ -1990,53 +2549,130 @@ class BrushFlow(_PluginBase):
                 logger.info(f"刷流任务执行完成")
                 return
 
-            statistic_info = self.__get_statistic_info()
+        # 获取所有站点的信息，并过滤掉不存在的站点
+        site_infos = []
+        for siteid in brush_config.brushsites:
+            siteinfo = self.siteoper.get(siteid)
+            if siteinfo:
+                site_infos.append(siteinfo)
+            else:
+                logger.warn(f"站点不存在：{siteid}")
 
-            # 获取所有站点的信息，并过滤掉不存在的站点
-            site_infos = []
-            for siteid in brush_config.brushsites:
-                siteinfo = self.siteoper.get(siteid)
-                if siteinfo:
-                    site_infos.append(siteinfo)
+        # 根据是否开启顺序刷流来决定是否需要打乱顺序
+        if not brush_config.brush_sequential:
+            random.shuffle(site_infos)
 
-            # 根据是否开启顺序刷流来决定是否需要打乱顺序
-            if not brush_config.brush_sequential:
-                random.shuffle(site_infos)
+        logger.info(f"即将针对站点 {', '.join(site.name for site in site_infos)} 开始刷流")
 
-            logger.info(f"即将针对站点 {', '.join(site.name for site in site_infos)} 开始刷流")
+        # 获取订阅标题
+        subscribe_titles = self.__get_subscribe_titles()
 
-            # 获取订阅标题
-            subscribe_titles = self.__get_subscribe_titles()
+        # 并发获取所有站点的种子，网络请求不占用锁，避免阻塞Check服务
+        site_torrents = self.__prefetch_site_torrents(site_infos=site_infos)
 
-            # 处理所有站点
+        with lock:
+            # 按站点顺序处理已获取到的种子，任务存储在获取站点种子期间可能已被Check服务更新
             for site in site_infos:
                 # 如果站点刷流没有正确响应，说明没有通过前置条件，其他站点也不需要继续刷流了
-                if not self.__brush_site_torrents(siteid=site.id, torrent_tasks=torrent_tasks,
-                                                  statistic_info=statistic_info,
+                if not self.__brush_site_torrents(siteinfo=site, torrents=site_torrents.get(site.id),
                                                   subscribe_titles=subscribe_titles):
                     logger.info(f"站点 {site.name} 刷流中途结束，停止后续刷流")
                     break
                 else:
                     logger.info(f"站点 {site.name} 刷流完成")
 
-            # 保存数据
-            self.save_data("torrents", torrent_tasks)
-            # 保存统计数据
-            self.save_data("statistic", statistic_info)
+            # 保存变更的任务及统计数据
+            self._task_store.flush()
             logger.info(f"刷流任务执行完成")
 
-    def __brush_site_torrents(self, siteid, torrent_tasks: Dict[str, dict], statistic_info: Dict[str, int],
-                              subscribe_titles: Set[str]) -> bool:
+    def __prefetch_site_torrents(self, site_infos: List[Any]) -> Dict[int, List[TorrentInfo]]:
         """
-        针对站点进行刷流
+        并发获取站点种子，返回站点ID与种子列表的映射，超时或获取失败的站点不包含在结果中
         """
-        siteinfo = self.siteoper.get(siteid)
-        if not siteinfo:
-            logger.warn(f"站点不存在：{siteid}")
-            return True
+        if not site_infos:
+            return {}
 
+        brush_config = self.__get_brush_config()
+        threads = max(int(brush_config.brush_threads or 5), 1)
+        timeout = max(float(brush_config.brush_timeout or 60), 1)
+        threads = min(threads, len(site_infos))
+        # 每个站点从开始获取时计算超时；总等待时间按轮次计算，仅在工作线程全部卡住时兜底
+        rounds = (len(site_infos) + threads - 1) // threads
+
+        logger.info(f"开始并发获取 {len(site_infos)} 个站点的种子，并发数 {threads}，单站点超时 {timeout:.0f} 秒")
+
+        site_torrents: Dict[int, List[TorrentInfo]] = {}
+        site_elapsed: Dict[str, float] = {}
+        # 各站点实际开始获取的时间
+        site_started: Dict[Any, float] = {}
+        start_time = time.time()
+        deadline = start_time + timeout * rounds
+
+        def __browse(_site: Any) -> Tuple[List[TorrentInfo], float]:
+            site_started[_site.id] = time.time()
+            return self.__browse_site_torrents(_site)
+
+        executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="BrushFlow-Prefetch")
+        try:
+            futures = {executor.submit(__browse, site): site for site in site_infos}
+            pending = set(futures)
+            while pending:
+                now = time.time()
+                # 已开始获取且超过单站点超时时间的站点不再等待
+                for future in [f for f in pending
+                               if not f.done() and futures[f].id in site_started
+                               and now - site_started[futures[f].id] >= timeout]:
+                    pending.discard(future)
+                    logger.warn(f"站点 {futures[future].name} 获取种子超过 {timeout:.0f} 秒，本次刷流跳过该站点")
+                if not pending or now >= deadline:
+                    break
+                # 等待到有站点完成，或最早开始的站点超时
+                next_check = min([site_started[futures[f].id] + timeout for f in pending
+                                  if futures[f].id in site_started] + [deadline])
+                done, pending = wait(pending, timeout=max(next_check - now, 0.1), return_when=FIRST_COMPLETED)
+                for future in done:
+                    site = futures[future]
+                    try:
+                        torrents, elapsed = future.result()
+                    except Exception as e:
+                        logger.error(f"站点 {site.name} 获取种子失败，错误详情: {e}")
+                        continue
+                    site_elapsed[site.name] = elapsed
+                    if elapsed > timeout:
+                        logger.warn(f"站点 {site.name} 获取种子耗时 {elapsed:.2f} 秒，"
+                                    f"超过设定的超时时间 {timeout:.0f} 秒，本次刷流跳过该站点")
+                        continue
+                    site_torrents[site.id] = torrents
+            for future in pending:
+                future.cancel()
+                logger.warn(f"站点 {futures[future].name} 获取种子超时，本次刷流跳过该站点")
+        finally:
+            # 超时的请求无法中断，这里不等待其完成
+            executor.shutdown(wait=False)
+
+        if site_elapsed:
+            ranking = sorted(site_elapsed.items(), key=lambda x: x[1], reverse=True)
+            logger.info(f"站点种子获取完成，总耗时 {time.time() - start_time:.2f} 秒，各站点耗时："
+                        f"{', '.join(f'{name} {elapsed:.2f}s' for name, elapsed in ranking)}")
+
+        return site_torrents
+
+    def __browse_site_torrents(self, siteinfo: Any) -> Tuple[List[TorrentInfo], float]:
+        """
+        获取站点种子，返回种子列表及耗时（秒）
+        """
         logger.info(f"开始获取站点 {siteinfo.name} 的新种子 ...")
-        torrents = self.torrents.browse(domain=siteinfo.domain)
+        start_time = time.time()
+        torrents = self.torrents.browse(domain=siteinfo.domain) or []
+        elapsed = time.time() - start_time
+        logger.info(f"站点 {siteinfo.name} 获取到种子 {len(torrents)} 个，耗时 {elapsed:.2f} 秒")
+        return torrents, elapsed
+
+    def __brush_site_torrents(self, siteinfo: Any, torrents: Optional[List[TorrentInfo]],
+                              subscribe_titles: Set[str]) -> bool:
+        """
+        针对站点进行刷流
+        """
         if not torrents:
             logger.info(f"站点 {siteinfo.name} 没有获取到种子")
             return True
@@ -2053,8 +2689,6 @@ class BrushFlow(_PluginBase):
         # 按发布日期降序排列
         torrents.sort(key=lambda x: x.pubdate or '', reverse=True)
 
-        torrents_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
-
         logger.info(f"正在准备种子刷流，数量 {len(torrents)}")
 
         # 过滤种子
@@ -2068,21 +2702,23 @@ class BrushFlow(_PluginBase):
             logger.debug(f"种子详情：{torrent}")
 
             # 判断能否通过保种体积刷流条件
-            size_condition_passed, reason = self.__evaluate_size_condition_for_brush(torrents_size=torrents_size,
-                                                                                     add_torrent_size=torrent.size)
+            size_condition_passed, reason = self.__evaluate_size_condition_for_brush(
+                torrents_size=self._task_store.seeding_size, add_torrent_size=torrent.size)
             self.__log_brush_conditions(passed=size_condition_passed, reason=reason, torrent=torrent)
             if not size_condition_passed:
                 continue
 
             # 判断能否通过刷流条件
             condition_passed, reason = self.__evaluate_conditions_for_brush(torrent=torrent,
-                                                                            torrent_tasks=torrent_tasks)
+                                                                            torrent_tasks=self._task_store)
             self.__log_brush_conditions(passed=condition_passed, reason=reason, torrent=torrent)
             if not condition_passed:
                 continue
 
             # 添加下载任务
             hash_string = self.__download(torrent=torrent)
+            # 下载器中的种子可能已发生变化，快照失效
+            self._downloader_snapshot.invalidate()
             if not hash_string:
                 logger.warn(f"{torrent.title} 添加刷流任务失败！")
                 continue
@@ -2128,11 +2764,8 @@ class BrushFlow(_PluginBase):
                 "hash": hash_string,
                 "data": torrent_task
             })
-            torrent_tasks[hash_string] = torrent_task
-
-            # 统计数据
-            torrents_size += torrent.size
-            statistic_info["count"] += 1
+            # 保存任务的同时会更新保种体积及统计数据
+            self._task_store.upsert(hash_string, torrent_task)
             logger.info(f"站点 {siteinfo.name}，新增刷流种子下载：{torrent.title}|{torrent.description}")
             self.__send_add_message(torrent)
 
@@ -2147,9 +2780,8 @@ class BrushFlow(_PluginBase):
 
         # 如果没有明确指定增加的种子大小，则检查配置中是否有种子大小下限，如果有，使用这个大小作为增加的种子大小
         preset_condition = False
-        if not add_torrent_size and brush_config.size:
-            size_limits = [float(size) * 1024 ** 3 for size in brush_config.size.split("-")]
-            add_torrent_size = size_limits[0]  # 使用配置的种子大小下限
+        if not add_torrent_size and brush_config.size_range:
+            add_torrent_size = brush_config.size_range[0]  # 使用配置的种子大小下限
             preset_condition = True
 
         total_size = self.__bytes_to_gb(torrents_size + add_torrent_size)  # 预计总做种体积
@@ -2216,7 +2848,7 @@ class BrushFlow(_PluginBase):
 
         return True, None
 
-    def __evaluate_conditions_for_brush(self, torrent, torrent_tasks) -> Tuple[bool, Optional[str]]:
+    def __evaluate_conditions_for_brush(self, torrent, torrent_tasks: BrushTaskStore) -> Tuple[bool, Optional[str]]:
         """
         过滤不符合条件的种子
         """
@@ -2224,83 +2856,21 @@ class BrushFlow(_PluginBase):
 
         # 排除重复种子
         # 默认根据标题和站点名称进行排除
-        task_key = f"{torrent.site_name}{torrent.title}"
-        if any(task_key == f"{task.get('site_name')}{task.get('title')}" for task in torrent_tasks.values()):
+        if torrent_tasks.contains_title(site_name=torrent.site_name, title=torrent.title):
             return False, "重复种子"
 
         # 部分站点标题会上新时携带后缀，这里进一步根据种子详情地址进行排除
-        if torrent.page_url:
-            task_page_url = f"{torrent.site_name}{torrent.page_url}"
-            if any(task_page_url == f"{task.get('site_name')}{task.get('page_url')}" for task in
-                   torrent_tasks.values()):
-                return False, "重复种子"
+        if torrent.page_url and torrent_tasks.contains_page_url(site_name=torrent.site_name,
+                                                                page_url=torrent.page_url):
+            return False, "重复种子"
 
         # 不同站点如果遇到相同种子，判断前一个种子是否已经在做种，否则排除处理
-        if torrent.title:
-            if any(torrent.site_name != f"{task.get('site_name')}" and torrent.title == f"{task.get('title')}"
-                   and not task.get("seed_time") for task in torrent_tasks.values()):
-                return False, "其他站点存在尚未下载完成的相同种子"
-
-        # 促销条件
-        if brush_config.freeleech and torrent.downloadvolumefactor != 0:
-            return False, "非免费种子"
-        if brush_config.freeleech == "2xfree" and torrent.uploadvolumefactor != 2:
-            return False, "非双倍上传种子"
+        if torrent.title and torrent_tasks.contains_title_in_other_site(site_name=torrent.site_name,
+                                                                        title=torrent.title):
+            return False, "其他站点存在尚未下载完成的相同种子"
 
-        # H&R
-        if brush_config.hr == "yes" and torrent.hit_and_run:
-            return False, "存在H&R"
-
-        # 包含规则
-        if brush_config.include and not (
-                re.search(brush_config.include, torrent.title, re.I) or re.search(brush_config.include,
-                                                                                  torrent.description, re.I)):
-            return False, "不符合包含规则"
-
-        # 排除规则
-        if brush_config.exclude and (
-                re.search(brush_config.exclude, torrent.title, re.I) or re.search(brush_config.exclude,
-                                                                                  torrent.description, re.I)):
-            return False, "符合排除规则"
-
-        # 种子大小（GB）
-        if brush_config.size:
-            sizes = [float(size) * 1024 ** 3 for size in brush_config.size.split("-")]
-            if len(sizes) == 1 and torrent.size < sizes[0]:
-                return False, f"种子大小 {self.__bytes_to_gb(torrent.size):.1f} GB，不符合条件"
-            elif len(sizes) > 1 and not sizes[0] <= torrent.size <= sizes[1]:
-                return False, f"种子大小 {self.__bytes_to_gb(torrent.size):.1f} GB，不在指定范围内"
-
-        # 做种人数
-        if brush_config.seeder:
-            seeders_range = [float(n) for n in brush_config.seeder.split("-")]
-            # 检查是否仅指定了一个数字，即做种人数需要小于等于该数字
-            if len(seeders_range) == 1:
-                # 当做种人数大于该数字时，不符合条件
-                if torrent.seeders > seeders_range[0]:
-                    return False, f"做种人数 {torrent.seeders}，超过单个指定值"
-            # 如果指定了一个范围
-            elif len(seeders_range) > 1:
-                # 检查做种人数是否在指定的范围内（包括边界）
-                if not (seeders_range[0] <= torrent.seeders <= seeders_range[1]):
-                    return False, f"做种人数 {torrent.seeders}，不在指定范围内"
-
-        # 发布时间
-        pubdate_minutes = self.__get_pubminutes(torrent.pubdate)
-        # 已支持独立站点配置，取消单独适配站点时区逻辑，可通过配置项「pubtime」自行适配
-        # pubdate_minutes = self.__adjust_site_pubminutes(pubdate_minutes, torrent)
-        if brush_config.pubtime:
-            pubtimes = [float(n) for n in brush_config.pubtime.split("-")]
-            if len(pubtimes) == 1:
-                # 单个值：选择发布时间小于等于该值的种子
-                if pubdate_minutes > pubtimes[0]:
-                    return False, f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不符合条件"
-            else:
-                # 范围值：选择发布时间在范围内的种子
-                if not (pubtimes[0] <= pubdate_minutes <= pubtimes[1]):
-                    return False, f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不在指定范围内"
-
-        return True, None
+        # 促销、H&R、包含排除规则、种子大小、做种人数、发布时间等条件已按站点配置预编译
+        return brush_config.evaluate_brush_rules(torrent)
 
     @staticmethod
     def __log_brush_conditions(passed: bool, reason: str, torrent: Any = None):
@@ -2328,27 +2898,26 @@ class BrushFlow(_PluginBase):
 
         with lock:
             logger.info("开始检查刷流下载任务 ...")
-            torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
-            unmanaged_tasks: Dict[str, dict] = self.get_data("unmanaged") or {}
+            task_store = self._task_store
 
             downloader = self.__get_downloader(brush_config.downloader)
             if not downloader:
                 logger.warn("无法获取下载器实例，将在下个时间周期重试")
                 return
 
-            seeding_torrents, error = downloader.get_torrents()
-            if error:
+            seeding_torrents = self.__get_downloader_torrents()
+            if seeding_torrents is None:
                 logger.warn("连接下载器出错，将在下个时间周期重试")
                 return
 
             seeding_torrents_dict = {self.__get_hash(torrent): torrent for torrent in seeding_torrents}
 
             # 检查种子刷流标签变更情况
-            self.__update_seeding_tasks_based_on_tags(torrent_tasks=torrent_tasks, unmanaged_tasks=unmanaged_tasks,
-                                                      seeding_torrents_dict=seeding_torrents_dict)
+            self.__update_seeding_tasks_based_on_tags(seeding_torrents_dict=seeding_torrents_dict)
 
-            torrent_check_hashes = list(torrent_tasks.keys())
-            if not torrent_tasks or not torrent_check_hashes:
+            torrent_check_hashes = task_store.keys()
+            if not torrent_check_hashes:
+                task_store.flush()
                 logger.info("没有需要检查的刷流下载任务")
                 return
 
@@ -2357,11 +2926,14 @@ class BrushFlow(_PluginBase):
             # 获取到当前所有做种数据中需要被检查的种子数据
             check_torrents = [seeding_torrents_dict[th] for th in torrent_check_hashes if th in seeding_torrents_dict]
 
+            # 将种子信息一次性转换为列式快照，后续状态更新及删除条件计算均基于该快照
+            snapshot = TorrentSnapshot([self.__get_torrent_info(torrent) for torrent in check_torrents])
+
             # 先更新刷流任务的最新状态，上下传，分享率
-            self.__update_torrent_tasks_state(torrents=check_torrents, torrent_tasks=torrent_tasks)
+            self.__update_torrent_tasks_state(snapshot=snapshot)
 
             # 更新刷流任务列表中在下载器中删除的种子为删除状态
-            self.__update_undeleted_torrents_missing_in_downloader(torrent_tasks, torrent_check_hashes, check_torrents)
+            self.__update_undeleted_torrents_missing_in_downloader(torrent_check_hashes, check_torrents)
 
             # 根据配置的标签进行种子排除
             if check_torrents:
@@ -2394,13 +2966,15 @@ class BrushFlow(_PluginBase):
                 if brush_config.proxy_delete and brush_config.delete_size_range:
                     logger.info("已开启动态删种，按系统默认动态删种条件开始检查任务")
                     proxy_delete_hashes = self.__delete_torrent_for_proxy(torrents=check_torrents,
-                                                                          torrent_tasks=torrent_tasks) or []
+                                                                          torrent_tasks=task_store,
+                                                                          snapshot=snapshot) or []
                     need_delete_hashes.extend(proxy_delete_hashes)
                 # 否则均认为是没有开启动态删种
                 else:
                     logger.info("没有开启动态删种，按用户设置删种条件开始检查任务")
                     not_proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=check_torrents,
-                                                                                            torrent_tasks=torrent_tasks) or []
+                                                                                            torrent_tasks=task_store,
+                                                                                            snapshot=snapshot) or []
                     need_delete_hashes.extend(not_proxy_delete_hashes)
 
                 if need_delete_hashes:
@@ -2408,43 +2982,38 @@ class BrushFlow(_PluginBase):
                     if brush_config.downloader == "qbittorrent":
                         self.__qb_torrents_reannounce(torrent_hashes=need_delete_hashes)
                     # 删除种子
-                    if downloader.delete_torrents(ids=need_delete_hashes, delete_file=True):
+                    deleted = downloader.delete_torrents(ids=need_delete_hashes, delete_file=True)
+                    # 下载器中的种子已发生变化，快照失效
+                    self._downloader_snapshot.invalidate()
+                    if deleted:
                         for torrent_hash in need_delete_hashes:
-                            torrent_tasks[torrent_hash]["deleted"] = True
-                            torrent_tasks[torrent_hash]["deleted_time"] = time.time()
+                            task_store.update(torrent_hash, deleted=True, deleted_time=time.time())
 
             # 归档数据
-            self.__auto_archive_tasks(torrent_tasks=torrent_tasks)
+            self.__auto_archive_tasks()
 
-            self.__update_and_save_statistic_info(torrent_tasks)
+            self.__log_statistic_info()
 
-            self.save_data("torrents", torrent_tasks)
+            changed_count = task_store.flush()
+            logger.info(f"刷流下载任务检查完成，本次变更任务数 {changed_count}")
 
-            logger.info("刷流下载任务检查完成")
-
-    def __update_torrent_tasks_state(self, torrents: List[Any], torrent_tasks: Dict[str, dict]):
+    def __update_torrent_tasks_state(self, snapshot: TorrentSnapshot):
         """
         更新刷流任务的最新状态，上下传，分享率
         """
-        for torrent in torrents:
-            torrent_hash = self.__get_hash(torrent)
-            torrent_task = torrent_tasks.get(torrent_hash, None)
+        for torrent_hash, torrent_info in zip(snapshot.hashes, snapshot.infos):
             # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
-            if not torrent_task:
+            if torrent_hash not in self._task_store:
                 continue
 
-            torrent_info = self.__get_torrent_info(torrent)
-
             # 更新上传量、下载量
-            torrent_task.update({
-                "downloaded": torrent_info.get("downloaded"),
-                "uploaded": torrent_info.get("uploaded"),
-                "ratio": torrent_info.get("ratio"),
-                "seeding_time": torrent_info.get("seeding_time"),
-            })
+            self._task_store.update(torrent_hash,
+                                    downloaded=torrent_info.get("downloaded"),
+                                    uploaded=torrent_info.get("uploaded"),
+                                    ratio=torrent_info.get("ratio"),
+                                    seeding_time=torrent_info.get("seeding_time"))
 
-    def __update_seeding_tasks_based_on_tags(self, torrent_tasks: Dict[str, dict], unmanaged_tasks: Dict[str, dict],
-                                             seeding_torrents_dict: Dict[str, Any]):
+    def __update_seeding_tasks_based_on_tags(self, seeding_torrents_dict: Dict[str, Any]):
         brush_config = self.__get_brush_config()
 
         if brush_config.downloader_monitor:
@@ -2457,54 +3026,50 @@ class BrushFlow(_PluginBase):
             logger.info("同步种子刷流标签记录目前仅支持qbittorrent")
             return
 
+        task_store = self._task_store
         # 初始化汇总信息
         added_tasks = []
         reset_tasks = []
         removed_tasks = []
-        # 基于 seeding_torrents_dict 的信息更新或添加到 torrent_tasks
+        # 基于 seeding_torrents_dict 的信息更新或添加到刷流任务
         for torrent_hash, torrent in seeding_torrents_dict.items():
             tags = self.__get_label(torrent=torrent)
             # 判断是否包含刷流标签
             if brush_config.brush_tag in tags:
                 # 如果包含刷流标签又不在刷流任务中，则需要加入管理
-                if torrent_hash not in torrent_tasks:
-                    # 检查该种子是否在 unmanaged_tasks 中
-                    if torrent_hash in unmanaged_tasks:
-                        # 如果在 unmanaged_tasks 中，移除并转移到 torrent_tasks
-                        torrent_task = unmanaged_tasks.pop(torrent_hash)
-                        torrent_tasks[torrent_hash] = torrent_task
+                if torrent_hash not in task_store:
+                    # 检查该种子是否在未托管任务中
+                    if task_store.is_unmanaged(torrent_hash):
+                        # 如果在未托管任务中，移除并转移到刷流任务
+                        torrent_task = task_store.manage(torrent_hash)
                         added_tasks.append(torrent_task)
                         logger.info(f"站点 {torrent_task.get('site_name')}，"
                                     f"刷流任务种子再次加入：{torrent_task.get('title')}|{torrent_task.get('description')}")
                     else:
                         # 否则，创建一个新的任务
                         torrent_task = self.__convert_torrent_info_to_task(torrent)
-                        torrent_tasks[torrent_hash] = torrent_task
+                        task_store.upsert(torrent_hash, torrent_task)
                         added_tasks.append(torrent_task)
                         logger.info(f"站点 {torrent_task.get('site_name')}，"
                                     f"刷流任务种子加入：{torrent_task.get('title')}|{torrent_task.get('description')}")
                 # 包含刷流标签又在刷流任务中，这里额外处理一个特殊逻辑，就是种子在刷流任务中可能被标记删除但实际上又还在下载器中，这里进行重置
                 else:
-                    torrent_task = torrent_tasks[torrent_hash]
+                    torrent_task = task_store[torrent_hash]
                     if torrent_task.get("deleted"):
-                        torrent_task["deleted"] = False
+                        task_store.update(torrent_hash, deleted=False)
                         reset_tasks.append(torrent_task)
                         logger.info(
                             f"站点 {torrent_task.get('site_name')}，在下载器中找到已标记删除的刷流任务对应的种子信息，"
                             f"更新刷流任务状态为正常：{torrent_task.get('title')}|{torrent_task.get('description')}")
             else:
                 # 不包含刷流标签但又在刷流任务中，则移除管理
-                if torrent_hash in torrent_tasks:
-                    # 如果种子不符合刷流条件但在 torrent_tasks 中，移除并加入 unmanaged_tasks
-                    torrent_task = torrent_tasks.pop(torrent_hash)
-                    unmanaged_tasks[torrent_hash] = torrent_task
+                if torrent_hash in task_store:
+                    # 如果种子不符合刷流条件但在刷流任务中，移除并加入未托管任务
+                    torrent_task = task_store.unmanage(torrent_hash)
                     removed_tasks.append(torrent_task)
                     logger.info(f"站点 {torrent_task.get('site_name')}，"
                                 f"刷流任务种子移除：{torrent_task.get('title')}|{torrent_task.get('description')}")
 
-        self.save_data("torrents", torrent_tasks)
-        self.save_data("unmanaged", unmanaged_tasks)
-
         # 发送汇总消息
         if added_tasks:
             self.__log_and_send_torrent_task_update_message(title="【刷流任务种子加入】", status="纳入刷流管理",
@@ -2517,7 +3082,7 @@ class BrushFlow(_PluginBase):
                                                             reason="在下载器中找到已标记删除的刷流任务对应的种子信息",
                                                             torrent_tasks=reset_tasks)
 
-    def __group_torrents_by_proxy_delete(self, torrents: List[Any], torrent_tasks: Dict[str, dict]):
+    def __group_torrents_by_proxy_delete(self, torrents: List[Any], torrent_tasks: BrushTaskStore):
         """
         根据是否启用动态删种进行分组
         """
@@ -2542,90 +3107,186 @@ class BrushFlow(_PluginBase):
 
         return proxy_delete_torrents, not_proxy_delete_torrents
 
-    def __evaluate_conditions_for_delete(self, site_name: str, torrent_info: dict, torrent_task: dict) \
-            -> Tuple[bool, str]:
-        """
-        评估删除条件并返回是否应删除种子及其原因
-        """
-        brush_config = self.__get_brush_config(sitename=site_name)
-
-        reason = "未能满足设置的删除条件"
-
-        # 当配置了H&R做种时间/分享率时，则H&R种子只有达到预期行为时，才会进行删除，如果没有配置H&R做种时间/分享率，则普通种子的删除规则也适用于H&R种子
-        # 判断是否为H&R种子并且是否配置了特定的H&R条件
-        hit_and_run = torrent_task.get("hit_and_run", False)
-        hr_specific_conditions_configured = hit_and_run and (brush_config.hr_seed_time or brush_config.seed_ratio)
-        if hr_specific_conditions_configured:
-            if (brush_config.hr_seed_time and torrent_info.get("seeding_time")
-                    >= float(brush_config.hr_seed_time) * 3600):
-                return True, (f"H&R种子，做种时间 {torrent_info.get('seeding_time') / 3600:.1f} 小时，"
-                              f"大于 {brush_config.hr_seed_time} 小时")
-            if brush_config.seed_ratio and torrent_info.get("ratio") >= float(brush_config.seed_ratio):
-                return True, f"H&R种子，分享率 {torrent_info.get('ratio'):.2f}，大于 {brush_config.seed_ratio}"
-            return False, "H&R种子，未能满足设置的H&R删除条件"
-
-        # 处理其他场景，1. 不是H&R种子；2. 是H&R种子但没有特定条件配置
-        reason = reason if not hit_and_run else "H&R种子（未设置H&R条件），未能满足设置的删除条件"
-        if brush_config.seed_time and torrent_info.get("seeding_time") >= float(brush_config.seed_time) * 3600:
-            reason = f"做种时间 {torrent_info.get('seeding_time') / 3600:.1f} 小时，大于 {brush_config.seed_time} 小时"
-        elif brush_config.seed_ratio and torrent_info.get("ratio") >= float(brush_config.seed_ratio):
-            reason = f"分享率 {torrent_info.get('ratio'):.2f}，大于 {brush_config.seed_ratio}"
-        elif brush_config.seed_size and torrent_info.get("uploaded") >= float(brush_config.seed_size) * 1024 ** 3:
-            reason = f"上传量 {torrent_info.get('uploaded') / 1024 ** 3:.1f} GB，大于 {brush_config.seed_size} GB"
-        elif brush_config.download_time and torrent_info.get("downloaded") < torrent_info.get(
-                "total_size") and torrent_info.get("dltime") >= float(brush_config.download_time) * 3600:
-            reason = f"下载耗时 {torrent_info.get('dltime') / 3600:.1f} 小时，大于 {brush_config.download_time} 小时"
-        elif brush_config.seed_avgspeed and torrent_info.get("avg_upspeed") <= float(
-                brush_config.seed_avgspeed) * 1024 and torrent_info.get("seeding_time") >= 30 * 60:
-            reason = f"平均上传速度 {torrent_info.get('avg_upspeed') / 1024:.1f} KB/s，低于 {brush_config.seed_avgspeed} KB/s"
-        elif brush_config.seed_inactivetime and torrent_info.get("iatime") >= float(
-                brush_config.seed_inactivetime) * 60:
-            reason = f"未活动时间 {torrent_info.get('iatime') / 60:.0f} 分钟，大于 {brush_config.seed_inactivetime} 分钟"
-        else:
-            return False, reason
+    def __evaluate_conditions_for_delete(self, snapshot: TorrentSnapshot, torrent_hashes: List[str],
+                                         torrent_tasks: BrushTaskStore) -> Dict[str, Tuple[bool, str]]:
+        """
+        按列批量评估删除条件，返回种子Hash与是否应删除种子及其原因的映射
+        """
+        results: Dict[str, Tuple[bool, str]] = {}
+
+        # 按站点配置分组，同一分组内的种子共用相同的删除阈值
+        groups: Dict[int, Tuple[BrushConfig, List[int], List[int]]] = {}
+        site_groups: Dict[str, Tuple[BrushConfig, List[int], List[int]]] = {}
+        for torrent_hash in torrent_hashes:
+            i = snapshot.index.get(torrent_hash)
+            torrent_task = torrent_tasks.get(torrent_hash)
+            if i is None or not torrent_task:
+                continue
+            site_name = torrent_task.get("site_name", "")
+            group = site_groups.get(site_name)
+            if group is None:
+                brush_config = self.__get_brush_config(sitename=site_name)
+                group = site_groups[site_name] = groups.setdefault(id(brush_config), (brush_config, [], []))
+            group[2 if torrent_task.get("hit_and_run", False) else 1].append(i)
+
+        for brush_config, normal_rows, hr_rows in groups.values():
+            # 当配置了H&R做种时间/分享率时，则H&R种子只有达到预期行为时，才会进行删除，如果没有配置H&R做种时间/分享率，则普通种子的删除规则也适用于H&R种子
+            if hr_rows and (brush_config.hr_seed_time or brush_config.seed_ratio):
+                self.__evaluate_delete_rules(snapshot=snapshot, rows=hr_rows,
+                                             rules=self.__get_hr_delete_rules(snapshot, brush_config),
+                                             default_reason="H&R种子，未能满足设置的H&R删除条件",
+                                             results=results)
+            elif hr_rows:
+                # H&R种子但没有特定条件配置
+                self.__evaluate_delete_rules(snapshot=snapshot, rows=hr_rows,
+                                             rules=self.__get_delete_rules(snapshot, brush_config),
+                                             default_reason="H&R种子（未设置H&R条件），未能满足设置的删除条件",
+                                             results=results, prefix="H&R种子（未设置H&R条件），")
+            if normal_rows:
+                self.__evaluate_delete_rules(snapshot=snapshot, rows=normal_rows,
+                                             rules=self.__get_delete_rules(snapshot, brush_config),
+                                             default_reason="未能满足设置的删除条件",
+                                             results=results)
+
+        return results
+
+    def __evaluate_proxy_pre_conditions_for_delete(self, snapshot: TorrentSnapshot, torrent_hashes: List[str],
+                                                   torrent_tasks: BrushTaskStore) -> Dict[str, Tuple[bool, str]]:
+        """
+        按列批量评估动态删除前置条件，返回种子Hash与是否应删除种子及其原因的映射
+        """
+        results: Dict[str, Tuple[bool, str]] = {}
+        groups: Dict[int, Tuple[BrushConfig, List[int]]] = {}
+        site_groups: Dict[str, Tuple[BrushConfig, List[int]]] = {}
+        for torrent_hash in torrent_hashes:
+            i = snapshot.index.get(torrent_hash)
+            torrent_task = torrent_tasks.get(torrent_hash)
+            if i is None or not torrent_task:
+                continue
+            site_name = torrent_task.get("site_name", "")
+            group = site_groups.get(site_name)
+            if group is None:
+                brush_config = self.__get_brush_config(sitename=site_name)
+                group = site_groups[site_name] = groups.setdefault(id(brush_config), (brush_config, []))
+            group[1].append(i)
+
+        for brush_config, rows in groups.values():
+            rules = [rule for rule in self.__get_delete_rules(snapshot, brush_config) if rule[0] == "download_time"]
+            self.__evaluate_delete_rules(snapshot=snapshot, rows=rows, rules=rules,
+                                         default_reason="未能满足动态删除设置的前置删除条件",
+                                         results=results)
 
-        return True, reason if not hit_and_run else "H&R种子（未设置H&R条件），" + reason
+        return results
 
-    def __evaluate_proxy_pre_conditions_for_delete(self, site_name: str, torrent_info: dict) -> Tuple[bool, str]:
+    @staticmethod
+    def __get_hr_delete_rules(snapshot: TorrentSnapshot, brush_config: BrushConfig) -> List[tuple]:
         """
-        评估动态删除前置条件并返回是否应删除种子及其原因
+        获取H&R种子的删除规则，规则按优先级排列，每条规则为（配置项，批量判断函数，原因生成函数）
         """
-        brush_config = self.__get_brush_config(sitename=site_name)
-
-        reason = "未能满足动态删除设置的前置删除条件"
+        seeding_time = snapshot.column("seeding_time")
+        ratio = snapshot.column("ratio")
+        rules = []
+        if brush_config.hr_seed_time:
+            hr_seed_time = float(brush_config.hr_seed_time) * 3600
+            rules.append(("hr_seed_time",
+                          lambda rows: [seeding_time[i] >= hr_seed_time for i in rows],
+                          lambda i: f"H&R种子，做种时间 {seeding_time[i] / 3600:.1f} 小时，"
+                                    f"大于 {brush_config.hr_seed_time} 小时"))
+        if brush_config.seed_ratio:
+            seed_ratio = float(brush_config.seed_ratio)
+            rules.append(("seed_ratio",
+                          lambda rows: [ratio[i] >= seed_ratio for i in rows],
+                          lambda i: f"H&R种子，分享率 {ratio[i]:.2f}，大于 {brush_config.seed_ratio}"))
+        return rules
 
-        if brush_config.download_time and torrent_info.get("downloaded") < torrent_info.get(
-                "total_size") and torrent_info.get("dltime") >= float(brush_config.download_time) * 3600:
-            reason = f"下载耗时 {torrent_info.get('dltime') / 3600:.1f} 小时，大于 {brush_config.download_time} 小时"
-        else:
-            return False, reason
+    @staticmethod
+    def __get_delete_rules(snapshot: TorrentSnapshot, brush_config: BrushConfig) -> List[tuple]:
+        """
+        获取普通种子的删除规则，规则按优先级排列，每条规则为（配置项，批量判断函数，原因生成函数）
+        """
+        seeding_time = snapshot.column("seeding_time")
+        ratio = snapshot.column("ratio")
+        uploaded = snapshot.column("uploaded")
+        downloaded = snapshot.column("downloaded")
+        total_size = snapshot.column("total_size")
+        dltime = snapshot.column("dltime")
+        avg_upspeed = snapshot.column("avg_upspeed")
+        iatime = snapshot.column("iatime")
+        rules = []
+        if brush_config.seed_time:
+            seed_time = float(brush_config.seed_time) * 3600
+            rules.append(("seed_time",
+                          lambda rows: [seeding_time[i] >= seed_time for i in rows],
+                          lambda i: f"做种时间 {seeding_time[i] / 3600:.1f} 小时，大于 {brush_config.seed_time} 小时"))
+        if brush_config.seed_ratio:
+            seed_ratio = float(brush_config.seed_ratio)
+            rules.append(("seed_ratio",
+                          lambda rows: [ratio[i] >= seed_ratio for i in rows],
+                          lambda i: f"分享率 {ratio[i]:.2f}，大于 {brush_config.seed_ratio}"))
+        if brush_config.seed_size:
+            seed_size = float(brush_config.seed_size) * 1024 ** 3
+            rules.append(("seed_size",
+                          lambda rows: [uploaded[i] >= seed_size for i in rows],
+                          lambda i: f"上传量 {uploaded[i] / 1024 ** 3:.1f} GB，大于 {brush_config.seed_size} GB"))
+        if brush_config.download_time:
+            download_time = float(brush_config.download_time) * 3600
+            rules.append(("download_time",
+                          lambda rows: [downloaded[i] < total_size[i] and dltime[i] >= download_time for i in rows],
+                          lambda i: f"下载耗时 {dltime[i] / 3600:.1f} 小时，大于 {brush_config.download_time} 小时"))
+        if brush_config.seed_avgspeed:
+            seed_avgspeed = float(brush_config.seed_avgspeed) * 1024
+            rules.append(("seed_avgspeed",
+                          lambda rows: [avg_upspeed[i] <= seed_avgspeed and seeding_time[i] >= 30 * 60 for i in rows],
+                          lambda i: f"平均上传速度 {avg_upspeed[i] / 1024:.1f} KB/s，"
+                                    f"低于 {brush_config.seed_avgspeed} KB/s"))
+        if brush_config.seed_inactivetime:
+            seed_inactivetime = float(brush_config.seed_inactivetime) * 60
+            rules.append(("seed_inactivetime",
+                          lambda rows: [iatime[i] >= seed_inactivetime for i in rows],
+                          lambda i: f"未活动时间 {iatime[i] / 60:.0f} 分钟，大于 {brush_config.seed_inactivetime} 分钟"))
+        return rules
 
-        return True, reason
+    @staticmethod
+    def __evaluate_delete_rules(snapshot: TorrentSnapshot, rows: List[int], rules: List[tuple],
+                                default_reason: str, results: Dict[str, Tuple[bool, str]], prefix: str = ""):
+        """
+        依次对尚未命中的种子批量应用删除规则，命中的种子记录首个命中规则的原因
+        """
+        pending = rows
+        for _, check, message in rules:
+            if not pending:
+                break
+            remaining = []
+            for i, hit in zip(pending, check(pending)):
+                if hit:
+                    results[snapshot.hashes[i]] = (True, prefix + message(i))
+                else:
+                    remaining.append(i)
+            pending = remaining
+        for i in pending:
+            results[snapshot.hashes[i]] = (False, default_reason)
 
-    def __delete_torrent_for_evaluate_conditions(self, torrents: List[Any], torrent_tasks: Dict[str, dict],
-                                                 proxy_delete: bool = False) -> List:
+    def __delete_torrent_for_evaluate_conditions(self, torrents: List[Any], torrent_tasks: BrushTaskStore,
+                                                 snapshot: TorrentSnapshot, proxy_delete: bool = False) -> List:
         """
         根据条件删除种子并获取已删除列表
         """
-        brush_config = self.__get_brush_config()
         delete_hashes = []
 
-        for torrent in torrents:
-            torrent_hash = self.__get_hash(torrent)
-            torrent_task = torrent_tasks.get(torrent_hash, None)
+        torrent_hashes = [self.__get_hash(torrent) for torrent in torrents]
+        results = self.__evaluate_conditions_for_delete(snapshot=snapshot, torrent_hashes=torrent_hashes,
+                                                        torrent_tasks=torrent_tasks)
+
+        for torrent_hash in torrent_hashes:
             # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
-            if not torrent_task:
+            if torrent_hash not in results:
                 continue
+            torrent_task = torrent_tasks.get(torrent_hash)
             site_name = torrent_task.get("site_name", "")
             torrent_title = torrent_task.get("title", "")
             torrent_desc = torrent_task.get("description", "")
 
-            torrent_info = self.__get_torrent_info(torrent)
-
-            # 删除种子的具体实现可能会根据实际情况略有不同
-            should_delete, reason = self.__evaluate_conditions_for_delete(site_name=site_name,
-                                                                          torrent_info=torrent_info,
-                                                                          torrent_task=torrent_task)
+            should_delete, reason = results[torrent_hash]
             if should_delete:
                 delete_hashes.append(torrent_hash)
                 reason = "触发动态删除阈值，" + reason if proxy_delete else reason
@@ -2638,33 +3299,30 @@ class BrushFlow(_PluginBase):
         return delete_hashes
 
     def __delete_torrent_for_evaluate_proxy_pre_conditions(self, torrents: List[Any],
-                                                           torrent_tasks: Dict[str, dict]) -> List:
+                                                           torrent_tasks: BrushTaskStore,
+                                                           snapshot: TorrentSnapshot) -> List:
         """
         根据动态删除前置条件排除H&R种子后删除种子并获取已删除列表
         """
-        brush_config = self.__get_brush_config()
         delete_hashes = []
 
-        for torrent in torrents:
-            torrent_hash = self.__get_hash(torrent)
-            torrent_task = torrent_tasks.get(torrent_hash, None)
-            # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
-            if not torrent_task:
-                continue
+        # 如果是H&R种子，前置条件中不进行处理
+        torrent_hashes = [torrent_hash for torrent_hash in (self.__get_hash(torrent) for torrent in torrents)
+                          if torrent_hash in torrent_tasks
+                          and not torrent_tasks.get(torrent_hash).get('hit_and_run', False)]
+        results = self.__evaluate_proxy_pre_conditions_for_delete(snapshot=snapshot, torrent_hashes=torrent_hashes,
+                                                                  torrent_tasks=torrent_tasks)
 
-            # 如果是H&R种子，前置条件中不进行处理
-            if torrent_task.get('hit_and_run', False):
+        for torrent_hash in torrent_hashes:
+            # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
+            if torrent_hash not in results:
                 continue
-
+            torrent_task = torrent_tasks.get(torrent_hash)
             site_name = torrent_task.get("site_name", "")
             torrent_title = torrent_task.get("title", "")
             torrent_desc = torrent_task.get("description", "")
 
-            torrent_info = self.__get_torrent_info(torrent)
-
-            # 删除种子的具体实现可能会根据实际情况略有不同
-            should_delete, reason = self.__evaluate_proxy_pre_conditions_for_delete(site_name=site_name,
-                                                                                    torrent_info=torrent_info)
+            should_delete, reason = results[torrent_hash]
             if should_delete:
                 delete_hashes.append(torrent_hash)
                 self.__send_delete_message(site_name=site_name, torrent_title=torrent_title, torrent_desc=torrent_desc,
@@ -2675,7 +3333,8 @@ class BrushFlow(_PluginBase):
 
         return delete_hashes
 
-    def __delete_torrent_for_proxy(self, torrents: List[Any], torrent_tasks: Dict[str, dict]) -> List:
+    def __delete_torrent_for_proxy(self, torrents: List[Any], torrent_tasks: BrushTaskStore,
+                                   snapshot: TorrentSnapshot) -> List:
         """
         动态删除种子，删除规则如下；
         - 不管做种体积是否超过设定的动态删除阈值，默认优先执行排除H&R种子后满足「下载超时时间」的种子
@@ -2691,22 +3350,20 @@ class BrushFlow(_PluginBase):
         if not (brush_config.proxy_delete and brush_config.delete_size_range):
             return []
 
-        # 获取种子信息Map
-        torrent_info_map = {self.__get_hash(torrent): self.__get_torrent_info(torrent=torrent) for torrent in torrents}
-
         # 计算当前总做种体积
-        total_torrent_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
+        total_torrent_size = torrent_tasks.seeding_size
 
         logger.info(
             f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，正在准备计算满足动态前置删除条件的种子")
 
         # 执行排除H&R种子后满足前置删除条件的种子
         pre_delete_hashes = self.__delete_torrent_for_evaluate_proxy_pre_conditions(torrents=torrents,
-                                                                                    torrent_tasks=torrent_tasks) or []
+                                                                                    torrent_tasks=torrent_tasks,
+                                                                                    snapshot=snapshot) or []
 
         # 如果存在前置删除种子，这里进行额外判断，总做种体积排除前置删除种子的体积
         if pre_delete_hashes:
-            pre_delete_total_size = sum(torrent_info_map[self.__get_hash(torrent)].get("total_size", 0)
+            pre_delete_total_size = sum(snapshot.get(self.__get_hash(torrent)).get("total_size", 0)
                                         for torrent in torrents if self.__get_hash(torrent) in pre_delete_hashes)
             total_torrent_size = total_torrent_size - pre_delete_total_size
             torrents = [torrent for torrent in torrents if self.__get_hash(torrent) not in pre_delete_hashes]
@@ -2744,20 +3401,22 @@ class BrushFlow(_PluginBase):
         logger.info(f"托管种子数 {len(proxy_delete_torrents)}，未托管种子数 {len(not_proxy_delete_torrents)}")
         if not_proxy_delete_torrents:
             not_proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=not_proxy_delete_torrents,
-                                                                                    torrent_tasks=torrent_tasks) or []
+                                                                                    torrent_tasks=torrent_tasks,
+                                                                                    snapshot=snapshot) or []
             need_delete_hashes.extend(not_proxy_delete_hashes)
             total_torrent_size -= sum(
-                torrent_info_map[self.__get_hash(torrent)].get("total_size", 0) for torrent in not_proxy_delete_torrents
+                snapshot.get(self.__get_hash(torrent)).get("total_size", 0) for torrent in not_proxy_delete_torrents
                 if self.__get_hash(torrent) in not_proxy_delete_hashes)
 
         # 如果删除非托管种子后仍未达到最小体积要求，则处理托管种子
         if total_torrent_size > min_size and proxy_delete_torrents:
             proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=proxy_delete_torrents,
                                                                                 torrent_tasks=torrent_tasks,
+                                                                                snapshot=snapshot,
                                                                                 proxy_delete=True) or []
             need_delete_hashes.extend(proxy_delete_hashes)
             total_torrent_size -= sum(
-                torrent_info_map[self.__get_hash(torrent)].get("total_size", 0) for torrent in proxy_delete_torrents if
+                snapshot.get(self.__get_hash(torrent)).get("total_size", 0) for torrent in proxy_delete_torrents if
                 self.__get_hash(torrent) in proxy_delete_hashes)
 
         # 在完成初始删除步骤后，如果总体积仍然超过最小阈值，则进一步找到已完成种子并排除HR种子后按做种时间正序进行删除
@@ -2769,7 +3428,7 @@ class BrushFlow(_PluginBase):
             downloader = self.__get_downloader(brush_config.downloader)
             completed_torrents = downloader.get_completed_torrents(ids=remaining_hashes)
             remaining_hashes = {self.__get_hash(torrent) for torrent in completed_torrents}
-            remaining_torrents = [(_hash, torrent_info_map[_hash]) for _hash in remaining_hashes]
+            remaining_torrents = [(_hash, snapshot.get(_hash)) for _hash in remaining_hashes if _hash in snapshot]
 
             # 准备一个列表，用于存放满足条件的种子，即非HR种子且有明确做种时间
             filtered_torrents = [(_hash, info['seeding_time']) for _hash, info in remaining_torrents if
@@ -2781,7 +3440,7 @@ class BrushFlow(_PluginBase):
                 if total_torrent_size <= min_size:
                     break
                 torrent_task = torrent_tasks.get(torrent_hash, None)
-                torrent_info = torrent_info_map.get(torrent_hash, None)
+                torrent_info = snapshot.get(torrent_hash)
                 if not torrent_task or not torrent_info:
                     continue
 
@@ -2815,7 +3474,7 @@ class BrushFlow(_PluginBase):
         # 返回所有需要删除的种子的哈希列表
         return need_delete_hashes
 
-    def __update_undeleted_torrents_missing_in_downloader(self, torrent_tasks, torrent_check_hashes, torrents):
+    def __update_undeleted_torrents_missing_in_downloader(self, torrent_check_hashes, torrents):
         """
         处理已经被删除，但是任务记录中还没有被标记删除的种子
         """
@@ -2830,7 +3489,8 @@ class BrushFlow(_PluginBase):
         # 先通过获取的全量种子，判断已经被删除，但是任务记录中还没有被标记删除的种子
         torrent_all_hashes = self.__get_all_hashes(torrents)
         missing_hashes = [hash_value for hash_value in torrent_check_hashes if hash_value not in torrent_all_hashes]
-        undeleted_hashes = [hash_value for hash_value in missing_hashes if not torrent_tasks[hash_value].get("deleted")]
+        task_store = self._task_store
+        undeleted_hashes = [hash_value for hash_value in missing_hashes if not task_store[hash_value].get("deleted")]
 
         if not undeleted_hashes:
             return
@@ -2839,10 +3499,9 @@ class BrushFlow(_PluginBase):
         delete_tasks = []
         for hash_value in undeleted_hashes:
             # 获取对应的任务信息
-            torrent_task = torrent_tasks[hash_value]
+            torrent_task = task_store[hash_value]
             # 标记为已删除
-            torrent_task["deleted"] = True
-            torrent_task["deleted_time"] = time.time()
+            task_store.update(hash_value, deleted=True, deleted_time=time.time())
             # 处理日志相关内容
             delete_tasks.append(torrent_task)
             site_name = torrent_task.get("site_name", "")
@@ -2889,54 +3548,18 @@ class BrushFlow(_PluginBase):
 
     # endregion
 
-    def __update_and_save_statistic_info(self, torrent_tasks):
+    def __log_statistic_info(self):
         """
-        更新并保存统计信息
+        记录统计信息，统计数据由任务存储增量维护
         """
-        total_count, total_uploaded, total_downloaded, total_deleted = 0, 0, 0, 0
-        active_uploaded, active_downloaded, active_count, total_unarchived = 0, 0, 0, 0
-
         statistic_info = self.__get_statistic_info()
-        archived_tasks = self.get_data("archived") or {}
-        combined_tasks = {**torrent_tasks, **archived_tasks}
-
-        for task in combined_tasks.values():
-            if task.get("deleted", False):
-                total_deleted += 1
-            total_downloaded += task.get("downloaded", 0)
-            total_uploaded += task.get("uploaded", 0)
-
-        # 计算torrent_tasks中未标记为删除的活跃任务的统计信息，及待归档的任务数
-        for task in torrent_tasks.values():
-            if not task.get("deleted", False):
-                active_uploaded += task.get("uploaded", 0)
-                active_downloaded += task.get("downloaded", 0)
-                active_count += 1
-            else:
-                total_unarchived += 1
-
-        # 更新统计信息
-        total_count = len(combined_tasks)
-        statistic_info.update({
-            "uploaded": total_uploaded,
-            "downloaded": total_downloaded,
-            "deleted": total_deleted,
-            "unarchived": total_unarchived,
-            "count": total_count,
-            "active": active_count,
-            "active_uploaded": active_uploaded,
-            "active_downloaded": active_downloaded
-        })
-
-        logger.info(f"刷流任务统计数据，总任务数：{total_count}，活跃任务数：{active_count}，已删除：{total_deleted}，"
-                    f"待归档：{total_unarchived}，"
-                    f"活跃上传量：{StringUtils.str_filesize(active_uploaded)}，"
-                    f"活跃下载量：{StringUtils.str_filesize(active_downloaded)}，"
-                    f"总上传量：{StringUtils.str_filesize(total_uploaded)}，"
-                    f"总下载量：{StringUtils.str_filesize(total_downloaded)}")
-
-        self.save_data("statistic", statistic_info)
-        self.save_data("torrents", torrent_tasks)
+        logger.info(f"刷流任务统计数据，总任务数：{statistic_info.get('count')}，"
+                    f"活跃任务数：{statistic_info.get('active')}，已删除：{statistic_info.get('deleted')}，"
+                    f"待归档：{statistic_info.get('unarchived')}，"
+                    f"活跃上传量：{StringUtils.str_filesize(statistic_info.get('active_uploaded'))}，"
+                    f"活跃下载量：{StringUtils.str_filesize(statistic_info.get('active_downloaded'))}，"
+                    f"总上传量：{StringUtils.str_filesize(statistic_info.get('uploaded'))}，"
+                    f"总下载量：{StringUtils.str_filesize(statistic_info.get('downloaded'))}")
 
     def __get_brush_config(self, sitename: str = None) -> BrushConfig:
         """
@@ -2969,7 +3592,9 @@ class BrushFlow(_PluginBase):
             "seed_inactivetime": "未活动时间",
             "up_speed": "单任务上传限速",
             "dl_speed": "单任务下载限速",
-            "auto_archive_days": "自动清理记录天数"
+            "auto_archive_days": "自动清理记录天数",
+            "brush_threads": "站点并发数",
+            "brush_timeout": "站点获取超时时间"
         }
 
         config_range_number_attr_to_desc = {
@@ -3055,6 +3680,8 @@ class BrushFlow(_PluginBase):
             "qb_category": brush_config.qb_category,
             "auto_qb_category": brush_config.auto_qb_category,
             "qb_first_last_piece": brush_config.qb_first_last_piece,
+            "brush_threads": brush_config.brush_threads,
+            "brush_timeout": brush_config.brush_timeout,
             "enable_site_config": brush_config.enable_site_config,
             "site_config": brush_config.site_config,
             "_tabs": self._tabs
@@ -3070,6 +3697,7 @@ class BrushFlow(_PluginBase):
         brush_config = self.__get_brush_config()
         self.qb = Qbittorrent()
         self.tr = Transmission()
+        self._downloader_snapshot.invalidate()
 
         if brush_config.downloader == "qbittorrent":
             if self.qb.is_inactive():
@@ -3631,16 +4259,32 @@ class BrushFlow(_PluginBase):
         """
         获取任务中的种子总大小
         """
-        # 读取种子记录
-        task_info = self.get_data("torrents") or {}
-        if not task_info:
-            return 0
-        total_size = sum([task.get("size") or 0 for task in task_info.values()])
-        return total_size
+        return sum(task.get("size") or 0 for task in self._task_store.values())
+
+    def __get_downloader_torrents(self) -> Optional[List[Any]]:
+        """
+        获取下载器中的全部种子，优先使用快照缓存，获取失败时返回None
+        """
+
+        def load_torrents():
+            brush_config = self.__get_brush_config()
+            downloader = self.__get_downloader(brush_config.downloader)
+            if not downloader:
+                return None
+            torrents, error = downloader.get_torrents()
+            return None if error else torrents
+
+        return self._downloader_snapshot.get("torrents", load_torrents)
 
     def __get_downloader_info(self) -> schemas.DownloaderInfo:
         """
-        获取下载器实时信息（所有下载器）
+        获取下载器实时信息（所有下载器），优先使用快照缓存
+        """
+        return self._downloader_snapshot.get("transfer", self.__load_downloader_info)
+
+    def __load_downloader_info(self) -> schemas.DownloaderInfo:
+        """
+        从下载器获取实时信息（所有下载器）
         """
         ret_info = schemas.DownloaderInfo()
 
@@ -3666,15 +4310,18 @@ class BrushFlow(_PluginBase):
 
     def __get_downloading_count(self) -> int:
         """
-        获取正在下载的任务数量
+        获取正在下载的任务数量，优先使用快照缓存
         """
-        try:
+
+        def load_downloading_torrents():
             brush_config = self.__get_brush_config()
             downloader = self.__get_downloader(brush_config.downloader)
             if not downloader:
-                return 0
+                return None
+            return downloader.get_downloading_torrents(tags=brush_config.brush_tag)
 
-            torrents = downloader.get_downloading_torrents(tags=brush_config.brush_tag)
+        try:
+            torrents = self._downloader_snapshot.get("downloading", load_downloading_torrents)
             if torrents is None:
                 logger.warn("获取下载数量失败，可能是下载器连接发生异常")
                 return 0
@@ -3684,22 +4331,6 @@ class BrushFlow(_PluginBase):
             logger.error(f"获取下载数量发生异常: {e}")
             return 0
 
-    @staticmethod
-    def __get_pubminutes(pubdate: str) -> float:
-        """
-        将字符串转换为时间，并计算与当前时间差）（分钟）
-        """
-        try:
-            if not pubdate:
-                return 0
-            pubdate = pubdate.replace("T", " ").replace("Z", "")
-            pubdate = datetime.strptime(pubdate, "%Y-%m-%d %H:%M:%S")
-            now = datetime.now()
-            return (now - pubdate).total_seconds() // 60
-        except Exception as e:
-            logger.error(f"发布时间 {pubdate} 获取分钟失败，错误详情: {e}")
-            return 0
-
     @staticmethod
     def __adjust_site_pubminutes(pub_minutes: float, torrent: TorrentInfo) -> float:
         """
@@ -3858,14 +4489,7 @@ class BrushFlow(_PluginBase):
         except ValueError:
             return False
 
-    @staticmethod
-    def __calculate_seeding_torrents_size(torrent_tasks: Dict[str, dict]) -> float:
-        """
-        计算保种种子体积
-        """
-        return sum(task.get("size", 0) for task in torrent_tasks.values() if not task.get("deleted", False))
-
-    def __auto_archive_tasks(self, torrent_tasks: Dict[str, dict]) -> None:
+    def __auto_archive_tasks(self) -> None:
         """
        自动归档已经删除的种子数据
        """
@@ -3873,92 +4497,56 @@ class BrushFlow(_PluginBase):
             logger.info("自动归档记录天数小于等于0，取消自动归档")
             return
 
-        # 用于存储已删除的数据
-        archived_tasks: Dict[str, dict] = self.get_data("archived") or {}
-
         current_time = time.time()
         archive_threshold_seconds = self._brush_config.auto_archive_days * 86400  # 将天数转换为秒数
 
-        # 准备一个列表，记录所有需要从原始数据中删除的键
-        keys_to_delete = set()
+        # 准备一个列表，记录所有需要归档的键
+        keys_to_archive = []
 
         # 遍历所有 torrent 条目
-        for key, value in torrent_tasks.items():
+        for key, value in self._task_store.items():
             deleted_time = value.get("deleted_time")
             # 场景 1: 检查任务是否已被标记为删除且超出保留天数
             if (value.get("deleted") and isinstance(deleted_time, (int, float)) and
                     current_time - deleted_time > archive_threshold_seconds):
-                keys_to_delete.add(key)
-                archived_tasks[key] = value
+                keys_to_archive.append(key)
                 continue
 
             # 场景 2: 检查没有明确删除时间的历史数据
             if value.get("deleted") and deleted_time is None:
-                keys_to_delete.add(key)
-                archived_tasks[key] = value
+                keys_to_archive.append(key)
                 continue
 
-        # 从原始字典中移除已删除的条目
-        for key in keys_to_delete:
-            del torrent_tasks[key]
-
-        self.save_data("archived", archived_tasks)
+        # 从活跃任务中移至归档任务
+        self._task_store.archive(keys_to_archive)
 
     def __archive_tasks(self):
         """
         归档已经删除的种子数据
         """
-        torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
-
-        # 用于存储已删除的数据
-        archived_tasks: Dict[str, dict] = self.get_data("archived") or {}
-
-        # 准备一个列表，记录所有需要从原始数据中删除的键
-        keys_to_delete = set()
-
-        # 遍历所有 torrent 条目
-        for key, value in torrent_tasks.items():
-            # 检查是否标记为已删除
-            if value.get("deleted"):
-                # 如果是，加入到归档字典中
-                archived_tasks[key] = value
-                # 记录键，稍后删除
-                keys_to_delete.add(key)
-
-        # 从原始字典中移除已删除的条目
-        for key in keys_to_delete:
-            del torrent_tasks[key]
-
-        self.save_data("archived", archived_tasks)
-        self.save_data("torrents", torrent_tasks)
-        # 归档需要更新一下统计数据
-        self.__update_and_save_statistic_info(torrent_tasks=torrent_tasks)
+        with lock:
+            # 记录所有标记为已删除的键
+            keys_to_archive = [key for key, value in self._task_store.items() if value.get("deleted")]
+            # 从活跃任务中移至归档任务
+            self._task_store.archive(keys_to_archive)
+            self._task_store.flush()
+            # 归档后输出一下统计数据
+            self.__log_statistic_info()
 
     def __clear_tasks(self):
         """
         清除统计数据
         彻底重置所有刷流数据，如当前还存在正在做种的刷流任务，待定时检查任务执行后，会自动纳入刷流管理
         """
-        self.save_data("torrents", {})
-        self.save_data("archived", {})
-        self.save_data("unmanaged", {})
-        self.save_data("statistic", {})
+        with lock:
+            self._task_store.clear()
+            self._task_store.flush()
 
     def __get_statistic_info(self) -> Dict[str, int]:
         """
         获取统计数据
         """
-        statistic_info = self.get_data("statistic") or {
-            "count": 0,
-            "deleted": 0,
-            "uploaded": 0,
-            "downloaded": 0,
-            "unarchived": 0,
-            "active": 0,
-            "active_uploaded": 0,
-            "active_downloaded": 0
-        }
-        return statistic_info
+        return self._task_store.statistic
 
     @staticmethod
     def __is_valid_time_range(time_range: str) -> bool:
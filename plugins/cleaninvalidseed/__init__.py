@@ -1,7 +1,10 @@
 import glob
 import os
+import re
 import shutil
 import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -20,6 +23,43 @@ from app.log import logger
 from app.schemas import NotificationType
 
 
+class ContentPathIndex(object):
+    """
+    做种文件路径索引，判断路径是否包含在任一做种文件路径中，结果与逐个子串匹配一致
+    """
+    _separator_pattern = re.compile(r"[/\\]")
+
+    def __init__(self, content_paths):
+        self._content_paths = [path for path in content_paths if path]
+        # 每个做种路径从开头及每个分隔符处开始的后缀，以分隔符开头的路径只能从这些位置匹配
+        suffixes = set()
+        for content_path in self._content_paths:
+            suffixes.add(content_path)
+            for match in self._separator_pattern.finditer(content_path):
+                suffixes.add(content_path[match.start():])
+        self._suffixes = sorted(suffixes)
+
+    def __has_prefix(self, prefix: str) -> bool:
+        """
+        是否存在以prefix开头的后缀
+        """
+        index = bisect_left(self._suffixes, prefix)
+        return index < len(self._suffixes) and self._suffixes[index].startswith(prefix)
+
+    def contains(self, path: str) -> bool:
+        """
+        路径是否包含在任一做种文件路径中
+        """
+        if not path:
+            return bool(self._content_paths)
+        if self.__has_prefix(path):
+            return True
+        if path[0] in "/\\":
+            return False
+        # 非分隔符开头的路径可能出现在任意位置，逐个匹配
+        return any(path in content_path for content_path in self._content_paths)
+
+
 class CleanInvalidSeed(_PluginBase):
     # 插件名称
     plugin_name = "清理QB无效做种"
@@ -28,7 +68,7 @@ class CleanInvalidSeed(_PluginBase):
     # 插件图标
     plugin_icon = "clean_a.png"
     # 插件版本
-    plugin_version = "2.2"
+    plugin_version = "2.4"
     # 插件作者
     plugin_author = "DzAvril"
     # 作者主页
@@ -66,6 +106,8 @@ class CleanInvalidSeed(_PluginBase):
         "err torrent banned",
     ]
     _custom_error_msg = ""
+    # 并发获取tracker的线程数
+    _tracker_threads = 8
 
     def init_plugin(self, config: dict = None):
         # 停止现有任务
@@ -313,15 +355,14 @@ class CleanInvalidSeed(_PluginBase):
             self._custom_error_msg.split("\n") if self._custom_error_msg else []
         )
         error_msgs = self._error_msg + custom_msgs
-        # 第一轮筛选出所有未工作的种子
+        # 一次性获取所有种子的tracker，避免重复请求
+        torrent_trackers = self.__get_torrent_trackers(all_torrents)
+        # 第一轮筛选出所有未工作的种子，同时统计正常工作的tracker
         for torrent in all_torrents:
-            trackers = torrent.trackers
+            trackers = torrent_trackers.get(torrent.get("hash")) or []
             is_invalid = True
             is_tracker_working = False
-            for tracker in trackers:
-                if tracker.get("tier") == -1:
-                    continue
-                tracker_domian = StringUtils.get_url_netloc((tracker.get("url")))[1]
+            for tracker_domian, tracker in trackers:
                 # 有一个tracker工作即为有效做种
                 if (tracker.get("status") == 2) or (tracker.get("status") == 3):
                     is_tracker_working = True
@@ -350,12 +391,11 @@ class CleanInvalidSeed(_PluginBase):
         # 将invalid_torrents基本信息保存起来，在种子被删除后依然可以打印这些信息
         invalid_torrent_tuple_list = []
         deleted_torrent_tuple_list = []
+        # 需要标记或删除的种子hash，最后批量处理
+        handle_hashes = []
         for torrent in temp_invalid_torrents:
-            trackers = torrent.trackers
-            for tracker in trackers:
-                if tracker.get("tier") == -1:
-                    continue
-                tracker_domian = StringUtils.get_url_netloc((tracker.get("url")))[1]
+            trackers = torrent_trackers.get(torrent.get("hash")) or []
+            for tracker_domian, tracker in trackers:
                 if tracker_domian in working_tracker_set:
                     # tracker是正常的，说明该种子是无效的
                     invalid_torrent_tuple_list.append(
@@ -382,12 +422,7 @@ class CleanInvalidSeed(_PluginBase):
                                 is_excluded = True
                                 invalid_torrents_exclude_labels.append(torrent)
                         if not is_excluded:
-                            if self._label_only:
-                                # 仅标记
-                                self._qb.set_torrents_tag(ids=torrent.get("hash"), tags=[self._label if self._label != "" else "无效做种"])
-                            else:
-                                # 只删除种子不删除文件，以防其它站点辅种
-                                self._qb.delete_torrents(False, torrent.get("hash"))
+                            handle_hashes.append(torrent.get("hash"))
                             # 标记已处理种子信息
                             deleted_torrent_tuple_list.append(
                                     (
@@ -400,6 +435,13 @@ class CleanInvalidSeed(_PluginBase):
                                     )
                                 )
                     break
+        if handle_hashes:
+            if self._label_only:
+                # 仅标记
+                self._qb.set_torrents_tag(ids=handle_hashes, tags=[self._label if self._label != "" else "无效做种"])
+            else:
+                # 只删除种子不删除文件，以防其它站点辅种
+                self._qb.delete_torrents(False, handle_hashes)
         invalid_msg = f"检测到{len(invalid_torrent_tuple_list)}个失效做种\n"
         tracker_not_working_msg = f"检测到{len(tracker_not_working_torrents)}个tracker未工作做种，请检查种子状态\n"
 
@@ -418,34 +460,22 @@ class CleanInvalidSeed(_PluginBase):
 
         for index in range(len(tracker_not_working_torrents)):
             torrent = tracker_not_working_torrents[index]
-            trackers = torrent.trackers
             tracker_msg = ""
-            for tracker in trackers:
-                if tracker.get("tier") == -1:
-                    continue
-                tracker_domian = StringUtils.get_url_netloc((tracker.get("url")))[1]
+            for tracker_domian, tracker in torrent_trackers.get(torrent.get("hash")) or []:
                 tracker_msg += f" {tracker_domian}：{tracker.msg} "
             tracker_not_working_msg += f"{index + 1}. {torrent.name}，分类：{torrent.category}，标签：{torrent.tags}, 大小：{StringUtils.str_filesize(torrent.size)}，Trackers: {tracker_msg}\n"
 
         for index in range(len(invalid_torrents_exclude_categories)):
             torrent = invalid_torrents_exclude_categories[index]
-            trackers = torrent.trackers
             tracker_msg = ""
-            for tracker in trackers:
-                if tracker.get("tier") == -1:
-                    continue
-                tracker_domian = StringUtils.get_url_netloc((tracker.get("url")))[1]
+            for tracker_domian, tracker in torrent_trackers.get(torrent.get("hash")) or []:
                 tracker_msg += f" {tracker_domian}：{tracker.msg} "
             exclude_categories_msg += f"{index + 1}. {torrent.name}，分类：{torrent.category}，标签：{torrent.tags}, 大小：{StringUtils.str_filesize(torrent.size)}，Trackers: {tracker_msg}\n"
 
         for index in range(len(invalid_torrents_exclude_labels)):
             torrent = invalid_torrents_exclude_labels[index]
-            trackers = torrent.trackers
             tracker_msg = ""
-            for tracker in trackers:
-                if tracker.get("tier") == -1:
-                    continue
-                tracker_domian = StringUtils.get_url_netloc((tracker.get("url")))[1]
+            for tracker_domian, tracker in torrent_trackers.get(torrent.get("hash")) or []:
                 tracker_msg += f" {tracker_domian}：{tracker.msg} "
             exclude_labels_msg += f"{index + 1}. {torrent.name}，分类：{torrent.category}，标签：{torrent.tags}, 大小：{StringUtils.str_filesize(torrent.size)}，Trackers: {tracker_msg}\n"
 
@@ -501,6 +531,28 @@ class CleanInvalidSeed(_PluginBase):
         if self._detect_invalid_files:
             self.detect_invalid_files()
 
+    def __get_torrent_trackers(self, torrents: list) -> Dict[str, List[Tuple[str, Any]]]:
+        """
+        并发获取所有种子的tracker，每个种子只请求一次，并预先解析tracker域名
+        :return: 种子hash -> [(tracker域名, tracker)]，已排除tier为-1的tracker
+        """
+
+        def __get_trackers(torrent):
+            try:
+                trackers = torrent.trackers
+            except Exception as e:
+                logger.error(f"获取种子 {torrent.name} 的tracker失败：{str(e)}")
+                return torrent.get("hash"), []
+            return torrent.get("hash"), [
+                (StringUtils.get_url_netloc((tracker.get("url")))[1], tracker)
+                for tracker in trackers if tracker.get("tier") != -1
+            ]
+
+        if not torrents:
+            return {}
+        with ThreadPoolExecutor(max_workers=self._tracker_threads) as executor:
+            return dict(executor.map(__get_trackers, torrents))
+
     def detect_invalid_files(self):
         logger.info("开始检测未做种的无效源文件")
         all_torrents = self.get_all_torrents()
@@ -524,9 +576,7 @@ class CleanInvalidSeed(_PluginBase):
             source_path_map[mp_path] = qb_path
             source_paths.append(mp_path)
         # 所有做种源文件路径
-        content_path_set = set()
-        for torrent in all_torrents:
-            content_path_set.add(torrent.content_path)
+        content_path_index = ContentPathIndex(set(torrent.content_path for torrent in all_torrents))
 
         message = "检测未做种无效源文件：\n"
         for source_path_str in source_paths:
@@ -557,14 +607,7 @@ class CleanInvalidSeed(_PluginBase):
                 qb_path = (str(source_file)).replace(
                     source_path_str, source_path_map[source_path_str]
                 )
-                # todo: 优化性能
-                is_exist = False
-                for content_path in content_path_set:
-                    if qb_path in content_path:
-                        is_exist = True
-                        break
-
-                if not is_exist:
+                if not content_path_index.contains(qb_path):
                     deleted_file_cnt += 1
                     message += f"{deleted_file_cnt}. {str(source_file)}\n"
                     total_size += self.get_size(source_file)
@@ -1,10 +1,12 @@
 import hashlib
+import json
 import os
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
-from threading import Event
+from threading import Event, Lock
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import pytz
@@ -139,10 +141,12 @@ class CrossSeedHelper(object):
     @staticmethod
     def get_target_torrent(
             site: CSSiteConfig,
-            pieces_hash_set: List[str]
+            pieces_hash_set: List[str],
+            session: Optional[requests.Session] = None
     ) -> Tuple[Optional[List[TorInfo]], Optional[str]]:
         """
         返回pieces_hash对应的种子信息，包括站点id,pieces_hash,种子id
+        :param session: 同一站点复用的会话，保持长连接
         """
         headers = {
             "Content-Type": "application/json",
@@ -152,7 +156,7 @@ class CrossSeedHelper(object):
         data = {"passkey": site.passkey, "pieces_hash": pieces_hash_set}
         remote_torrent_infos = []
         try:
-            response = requests.post(
+            response = (session or requests).post(
                 site.get_api_url(),
                 headers=headers,
                 json=data,
@@ -172,6 +176,89 @@ class CrossSeedHelper(object):
         return remote_torrent_infos, None
 
 
+class TorrentIndex(object):
+    """
+    本地种子文件索引，按种子文件路径、修改时间、大小缓存info_hash、pieces_hash及announce，
+    文件未变化时不再重新读取和计算
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = Lock()
+        # 种子文件路径 -> [修改时间(ns), 大小, info_hash, pieces_hash, announce]
+        self._entries: Dict[str, list] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """
+        从文件加载索引
+        """
+        with self._lock:
+            self._entries = {}
+            self._dirty = False
+            if not self._path.exists():
+                return
+            try:
+                self._entries = json.loads(self._path.read_text(encoding="utf-8")) or {}
+            except Exception as e:
+                logger.error(f"加载种子文件索引失败：{str(e)}")
+
+    def save(self) -> bool:
+        """
+        有变化时写入文件
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            content = json.dumps(self._entries, separators=(',', ':'))
+            self._dirty = False
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_suffix(".tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, self._path)
+            return True
+        except Exception as e:
+            logger.error(f"保存种子文件索引失败：{str(e)}")
+            return False
+
+    def get(self, torrent_path: str, stat: os.stat_result) -> Optional[TorInfo]:
+        """
+        获取未变化的种子文件信息
+        """
+        entry = self._entries.get(torrent_path)
+        if not entry or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            return None
+        tor_info = TorInfo.local(torrent_path=torrent_path, info_hash=entry[2], pieces_hash=entry[3])
+        tor_info.torrent_announce = entry[4]
+        return tor_info
+
+    def put(self, torrent_path: str, stat: os.stat_result, tor_info: TorInfo):
+        """
+        记录种子文件信息
+        """
+        with self._lock:
+            self._entries[torrent_path] = [stat.st_mtime_ns, stat.st_size, tor_info.info_hash,
+                                           tor_info.pieces_hash, tor_info.torrent_announce]
+            self._dirty = True
+
+    def retain(self, torrent_paths: set) -> int:
+        """
+        只保留本次使用到的种子文件，返回清理数量
+        """
+        with self._lock:
+            removed = [key for key in self._entries if key not in torrent_paths]
+            for key in removed:
+                del self._entries[key]
+            if removed:
+                self._dirty = True
+        return len(removed)
+
+    def __len__(self):
+        return len(self._entries)
+
+
 class CrossSeed(_PluginBase):
     # 插件名称
     plugin_name = "青蛙辅种助手"
@@ -180,7 +267,7 @@ class CrossSeed(_PluginBase):
     # 插件图标
     plugin_icon = "qingwa.png"
     # 插件版本
-    plugin_version = "2.4"
+    plugin_version = "2.6"
     # 插件作者
     plugin_author = "233@qingwa"
     # 作者主页
@@ -226,6 +313,18 @@ class CrossSeed(_PluginBase):
     _permanent_error_caches = []
     _torrentpaths = []
     _site_cs_infos = []
+    # 本地种子文件索引
+    _torrent_index = None
+    # 同时查询的站点数
+    _query_threads = 5
+    # 建立索引的进程数，需解析的种子较多时使用多进程，默认不启用
+    _index_processes = 0
+    # 需解析的种子数超过该值时使用多进程
+    _index_process_threshold = 200
+    # 不使用多进程时解析种子文件的线程数
+    _index_threads = 4
+    # 多进程解析每批种子文件的超时时间（秒）
+    _index_process_timeout = 300
     # 辅种计数
     total = 0
     realtotal = 0
@@ -238,6 +337,7 @@ class CrossSeed(_PluginBase):
         self.sites = SitesHelper()
         self.siteoper = SiteOper()
         self.torrent = TorrentHelper()
+        self._torrent_index = TorrentIndex(self.get_data_path() / "torrent_index.json")
         # 读取配置
         if config:
             self._enabled = config.get("enabled")
@@ -253,6 +353,14 @@ class CrossSeed(_PluginBase):
             self._nolabels = config.get("nolabels")
             self._nopaths = config.get("nopaths")
             self._clearcache = config.get("clearcache")
+            try:
+                self._index_processes = max(int(config.get("index_processes")), 0)
+            except (TypeError, ValueError):
+                self._index_processes = 0
+            try:
+                self._query_threads = max(int(config.get("query_threads")), 1)
+            except (TypeError, ValueError):
+                self._query_threads = 5
             self._permanent_error_caches = [] if self._clearcache else config.get("permanent_error_caches") or []
             self._error_caches = [] if self._clearcache else config.get("error_caches") or []
             self._success_caches = [] if self._clearcache else config.get("success_caches") or []
@@ -567,7 +675,7 @@ class CrossSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 12
+                                    'md': 6
                                 },
                                 'content': [
                                     {
@@ -579,6 +687,40 @@ class CrossSeed(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'index_processes',
+                                            'label': '建立索引进程数',
+                                            'placeholder': '首次读取大量种子文件时使用的进程数，默认0为使用多线程'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'query_threads',
+                                            'label': '站点查询并发数',
+                                            'placeholder': '同时查询的站点数，默认5，站点限制并发时调低'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -717,7 +859,9 @@ class CrossSeed(_PluginBase):
             "torrentpath": "",
             "sites": [],
             "nopaths": "",
-            "nolabels": ""
+            "nolabels": "",
+            "index_processes": 0,
+            "query_threads": 5
         }
 
     def get_page(self) -> List[dict]:
@@ -736,6 +880,8 @@ class CrossSeed(_PluginBase):
             "notify": self._notify,
             "nolabels": self._nolabels,
             "nopaths": self._nopaths,
+            "index_processes": self._index_processes,
+            "query_threads": self._query_threads,
             "success_caches": self._success_caches,
             "error_caches": self._error_caches,
             "permanent_error_caches": self._permanent_error_caches
@@ -765,6 +911,10 @@ class CrossSeed(_PluginBase):
         self.exist = 0
         self.fail = 0
         self.cached = 0
+        # 本次使用到的种子文件
+        seen_paths = set()
+        # 是否所有下载器都获取成功，获取失败时不清理索引
+        all_scanned = True
         # 扫描下载器辅种
         for idx, downloader in enumerate(self._downloaders):
             logger.info(f"开始扫描下载器 {downloader} ...")
@@ -774,9 +924,13 @@ class CrossSeed(_PluginBase):
             if torrents:
                 logger.info(f"下载器 {downloader} 已完成种子数：{len(torrents)}")
             else:
+                if torrents is None:
+                    all_scanned = False
                 logger.info(f"下载器 {downloader} 没有已完成种子")
                 continue
             hash_strs = []
+            # 需要读取种子文件的种子
+            candidates = []
             for torrent in torrents:
                 if self._event.is_set():
                     logger.info(f"辅种服务停止")
@@ -787,32 +941,43 @@ class CrossSeed(_PluginBase):
                     logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
                     continue
                 save_path = self.__get_save_path(torrent, downloader)
+
+                if self._nopaths and save_path:
+                    # 过滤不需要转移的路径
+                    nopath_skip = False
+                    for nopath in self._nopaths.split('\n'):
+                        if os.path.normpath(save_path).startswith(os.path.normpath(nopath)):
+                            logger.info(f"种子 {hash_str} 保存路径 {save_path} 不需要辅种，跳过 ...")
+                            nopath_skip = True
+                            break
+                    if nopath_skip:
+                        continue
+
+                # 获取种子标签
+                torrent_labels = self.__get_label(torrent, downloader)
+                if torrent_labels and self._nolabels:
+                    is_skip = False
+                    for label in self._nolabels.split(','):
+                        if label in torrent_labels:
+                            logger.info(f"种子 {hash_str} 含有不辅种标签 {label}，跳过 ...")
+                            is_skip = True
+                            break
+                    if is_skip:
+                        continue
+
                 # 获取种子文件路径
                 torrent_path = Path(self._torrentpaths[idx]) / f"{hash_str}.torrent"
-                torrent_info = None
-                if not torrent_path.exists():
-                    if False and downloader == "qbittorrent":
-                        # qb开启SQLite功能后将不再以hash命名的方式保存torrent文件
-                        # TODO 导出功能需要qb4.5.0以上版本才支持
-                        logger.warn(f"QB种子文件不存在：{torrent_path} 尝试远程导出种子")
-                        try:
-                            torrent_data = torrent.export()
-                            torrent_info, err = TorInfo.from_data(torrent_data)
-                        except Exception as e:
-                            err = str(e)
-                        if not torrent_info:
-                            logger.error(f"尝试远程导出种子 {hash_str} 出错 {err}")
-                            continue
-                    else:
-                        logger.error(f"种子文件不存在：{torrent_path}")
-                        continue
+                candidates.append((torrent, hash_str, save_path, str(torrent_path)))
+
+            # 读取种子文件具体信息，未变化的种子文件直接使用索引
+            torrent_infos = self.__get_local_torrent_infos([item[3] for item in candidates])
+            seen_paths.update(torrent_infos.keys())
 
-                # 读取种子文件具体信息
+            for torrent, hash_str, save_path, torrent_path in candidates:
+                torrent_info, err = torrent_infos.get(torrent_path) or (None, "种子文件不存在")
                 if not torrent_info:
-                    torrent_info, err = self.cross_helper.get_local_torrent_info(torrent_path)
-                    if not torrent_info:
-                        logger.error(f"未能读取到种子文件具体信息：{torrent_path} {err}")
-                        continue
+                    logger.error(f"未能读取到种子文件具体信息：{torrent_path} {err}")
+                    continue
 
                 # 用站点+pieces_hash记录该站点是否已经在该下载器中,需要从tracker补充站点名字
                 tracker_urls = set()
@@ -841,28 +1006,6 @@ class CrossSeed(_PluginBase):
                         if site_info:
                             torrent_info.site_name = site_info.get("name")
 
-                if self._nopaths and save_path:
-                    # 过滤不需要转移的路径
-                    nopath_skip = False
-                    for nopath in self._nopaths.split('\n'):
-                        if os.path.normpath(save_path).startswith(os.path.normpath(nopath)):
-                            logger.info(f"种子 {hash_str} 保存路径 {save_path} 不需要辅种，跳过 ...")
-                            nopath_skip = True
-                            break
-                    if nopath_skip:
-                        continue
-
-                # 获取种子标签
-                torrent_labels = self.__get_label(torrent, downloader)
-                if torrent_labels and self._nolabels:
-                    is_skip = False
-                    for label in self._nolabels.split(','):
-                        if label in torrent_labels:
-                            logger.info(f"种子 {hash_str} 含有不辅种标签 {label}，跳过 ...")
-                            is_skip = True
-                            break
-                    if is_skip:
-                        continue
                 hash_strs.append({
                     "hash": hash_str,
                     "save_path": save_path,
@@ -874,6 +1017,12 @@ class CrossSeed(_PluginBase):
                 self.check_recheck()
             else:
                 logger.info(f"没有需要辅种的种子")
+        # 清理已不存在的种子文件并保存索引
+        if all_scanned:
+            removed = self._torrent_index.retain(seen_paths)
+            if removed:
+                logger.info(f"已从种子文件索引中清理 {removed} 个失效记录")
+        self._torrent_index.save()
         # 保存缓存
         self.__update_config()
         # 发送消息
@@ -891,6 +1040,77 @@ class CrossSeed(_PluginBase):
                 )
         logger.info("辅种任务执行完成")
 
+    def __get_local_torrent_infos(self, torrent_paths: List[str]) -> Dict[str, Tuple[Optional[TorInfo], str]]:
+        """
+        批量读取种子文件信息，未变化的种子文件从索引中获取，其余重新解析并更新索引
+        :return: 种子文件路径 -> (种子信息, 错误信息)，不存在的种子文件不返回
+        """
+        results: Dict[str, Tuple[Optional[TorInfo], str]] = {}
+        # 需要解析的种子文件及其状态
+        pending: Dict[str, os.stat_result] = {}
+        for torrent_path in torrent_paths:
+            try:
+                stat = os.stat(torrent_path)
+            except OSError:
+                logger.error(f"种子文件不存在：{torrent_path}")
+                continue
+            tor_info = self._torrent_index.get(torrent_path, stat)
+            if tor_info:
+                results[torrent_path] = (tor_info, "")
+            else:
+                pending[torrent_path] = stat
+        if not pending:
+            return results
+
+        logger.info(f"种子文件索引命中 {len(results)} 个，需要解析 {len(pending)} 个 ...")
+        start_time = time.time()
+        parsed = self.__parse_torrent_files(list(pending.keys()))
+        for (torrent_path, stat), (tor_info, err) in zip(pending.items(), parsed):
+            results[torrent_path] = (tor_info, err)
+            if tor_info:
+                self._torrent_index.put(torrent_path, stat, tor_info)
+        logger.info(f"解析种子文件完成，耗时 {time.time() - start_time:.1f} 秒，索引种子数：{len(self._torrent_index)}")
+        return results
+
+    def __parse_torrent_files(self, torrent_paths: List[str]) -> List[Tuple[Optional[TorInfo], str]]:
+        """
+        并行解析种子文件，按批提交以便响应停止事件，停止时只返回已解析的部分
+        默认使用多线程；开启多进程时（仅在首次建立索引等大量解析的情况下使用），
+        进程池出错或超时后改用多线程解析剩余文件
+        """
+        use_processes = self._index_processes > 1 and len(torrent_paths) >= self._index_process_threshold
+        if use_processes:
+            workers = self._index_processes
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            workers = self._index_threads
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="CrossSeed-Index")
+        batch_size = workers * 16
+        parsed: List[Tuple[Optional[TorInfo], str]] = []
+        try:
+            for i in range(0, len(torrent_paths), batch_size):
+                if self._event.is_set():
+                    break
+                batch = torrent_paths[i:i + batch_size]
+                if not use_processes:
+                    parsed.extend(executor.map(CrossSeedHelper.get_local_torrent_info, batch))
+                    continue
+                try:
+                    parsed.extend(executor.map(CrossSeedHelper.get_local_torrent_info, batch,
+                                               timeout=self._index_process_timeout,
+                                               chunksize=max(len(batch) // workers, 1)))
+                except Exception as e:
+                    # 子进程卡住时不等待其退出
+                    logger.warn(f"多进程解析种子文件失败，改为多线程解析：{str(e) or type(e).__name__}")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    use_processes = False
+                    workers = self._index_threads
+                    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="CrossSeed-Index")
+                    parsed.extend(executor.map(CrossSeedHelper.get_local_torrent_info, batch))
+        finally:
+            executor.shutdown(cancel_futures=True)
+        return parsed
+
     def check_recheck(self):
         """
         定时检查下载器中种子是否校验完成，校验完成且完整的自动开始辅种
@@ -954,25 +1174,55 @@ class CrossSeed(_PluginBase):
         logger.info(f"去重后，总共需要辅种查询的种子数：{len(pieces_hash_set)}")
         pieces_hashes = list(pieces_hash_set)
 
-        # 分站点逐个批次辅种
-        # 逐个站点查询可辅种数据
-        chunk_size = 100
+        # 检查站点是否已经停用
+        site_configs = []
         for site_config in self._site_cs_infos:
-            # 检查站点是否已经停用
             db_site = self.siteoper.get(site_config.id)
             if db_site and not db_site.is_active:
                 logger.info(f"站点{site_config.name}已停用，跳过辅种")
                 continue
-            remote_tors: List[TorInfo] = []
-            total_size = len(pieces_hashes)
-            for i in range(0, len(pieces_hashes), chunk_size):
+            site_configs.append(site_config)
+        if not site_configs:
+            return
+
+        # 各站点并行查询可辅种数据，站点内按请求间隔逐批查询，查询完成的站点先辅种
+        executor = ThreadPoolExecutor(max_workers=min(len(site_configs), self._query_threads),
+                                      thread_name_prefix="CrossSeed-Query")
+        try:
+            futures = {executor.submit(self.__query_site_torrents, site_config, pieces_hashes): site_config
+                       for site_config in site_configs}
+            for future in as_completed(futures):
                 if self._event.is_set():
                     logger.info(f"辅种服务停止")
                     return
+                site_config = futures[future]
+                remote_tors = future.result()
+                self.__seed_site_torrents(site_config=site_config,
+                                          remote_tors=remote_tors,
+                                          site_pieces_hash_set=site_pieces_hash_set,
+                                          save_paths=save_paths,
+                                          downloader=downloader)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        logger.info(f"下载器 {downloader} 辅种完成")
+
+    def __query_site_torrents(self, site_config: CSSiteConfig, pieces_hashes: List[str]) -> List[TorInfo]:
+        """
+        分批查询站点可辅种的种子，同一站点复用会话
+        """
+        chunk_size = 100
+        remote_tors: List[TorInfo] = []
+        total_size = len(pieces_hashes)
+        with requests.Session() as session:
+            for i in range(0, len(pieces_hashes), chunk_size):
+                if self._event.is_set():
+                    logger.info(f"辅种服务停止")
+                    break
                 # 切片操作
                 chunk = pieces_hashes[i:i + chunk_size]
                 # 处理分组
-                chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk)
+                chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk, session=session)
                 if not chunk_tors and err_msg:
                     logger.info(
                         f"查询站点{site_config.name}可辅种的信息出错 {err_msg},进度={i + 1}/{total_size}"
@@ -982,44 +1232,48 @@ class CrossSeed(_PluginBase):
                         f"站点{site_config.name}本批次的可辅种/查询数={len(chunk_tors)}/{len(chunk)},进度={i + 1}/{total_size}"
                     )
                     remote_tors = remote_tors + chunk_tors
+        return remote_tors
 
-            logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{len(remote_tors)}")
-
-            # 去除已经下载过的种子
-            local_cnt = 0
-            not_local_tors = []
-            for tor_info in remote_tors:
-                if (
-                        tor_info
-                        and tor_info.site_name
-                        and tor_info.pieces_hash
-                        and tor_info.get_name_pieces_tag() in site_pieces_hash_set
-                ):
-                    local_cnt = local_cnt + 1
-                else:
-                    not_local_tors.append(tor_info)
-            logger.info(f"站点{site_config.name}正在做种或已经辅种过的种子数为{local_cnt}")
-
-            for tor_info in not_local_tors:
-                if self._event.is_set():
-                    logger.info(f"辅种服务停止")
-                    return
-                if not tor_info:
-                    continue
-                if not tor_info.torrent_id or not tor_info.pieces_hash:
-                    continue
-                if tor_info.get_name_id_tag() in self._success_caches:
-                    logger.info(f"{tor_info.get_name_id_tag()} 已处理过辅种，跳过 ...")
-                    continue
-                if tor_info.get_name_id_tag() in self._error_caches or tor_info.get_name_id_tag() in self._permanent_error_caches:
-                    logger.info(f"种子 {tor_info.get_name_id_tag()} 辅种失败且已缓存，跳过 ...")
-                    continue
-                # 添加任务
-                self.__download_torrent(tor=tor_info, site_config=site_config,
-                                        downloader=downloader,
-                                        save_path=save_paths.get(tor_info.pieces_hash))
-
-        logger.info(f"下载器 {downloader} 辅种完成")
+    def __seed_site_torrents(self, site_config: CSSiteConfig, remote_tors: List[TorInfo],
+                             site_pieces_hash_set: set, save_paths: dict, downloader: str):
+        """
+        辅种站点返回的可辅种种子
+        """
+        logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{len(remote_tors)}")
+
+        # 去除已经下载过的种子
+        local_cnt = 0
+        not_local_tors = []
+        for tor_info in remote_tors:
+            if (
+                    tor_info
+                    and tor_info.site_name
+                    and tor_info.pieces_hash
+                    and tor_info.get_name_pieces_tag() in site_pieces_hash_set
+            ):
+                local_cnt = local_cnt + 1
+            else:
+                not_local_tors.append(tor_info)
+        logger.info(f"站点{site_config.name}正在做种或已经辅种过的种子数为{local_cnt}")
+
+        for tor_info in not_local_tors:
+            if self._event.is_set():
+                logger.info(f"辅种服务停止")
+                return
+            if not tor_info:
+                continue
+            if not tor_info.torrent_id or not tor_info.pieces_hash:
+                continue
+            if tor_info.get_name_id_tag() in self._success_caches:
+                logger.info(f"{tor_info.get_name_id_tag()} 已处理过辅种，跳过 ...")
+                continue
+            if tor_info.get_name_id_tag() in self._error_caches or tor_info.get_name_id_tag() in self._permanent_error_caches:
+                logger.info(f"种子 {tor_info.get_name_id_tag()} 辅种失败且已缓存，跳过 ...")
+                continue
+            # 添加任务
+            self.__download_torrent(tor=tor_info, site_config=site_config,
+                                    downloader=downloader,
+                                    save_path=save_paths.get(tor_info.pieces_hash))
 
     def __download(self, downloader: str, content: Union[bytes, str],
                    save_path: str) -> Optional[str]:
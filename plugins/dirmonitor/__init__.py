@@ -1,16 +1,21 @@
 import datetime
+import os
 import re
 import shutil
 import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Callable
 
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
+from sqlalchemy.orm import Session
 from watchdog.observers.polling import PollingObserver
 
 from app import schemas
@@ -21,7 +26,9 @@ from app.core.config import settings
 from app.core.context import MediaInfo
 from app.core.event import eventmanager, Event
 from app.core.metainfo import MetaInfoPath
+from app.db import db_query
 from app.db.downloadhistory_oper import DownloadHistoryOper
+from app.db.models.transferhistory import TransferHistory
 from app.db.transferhistory_oper import TransferHistoryOper
 from app.log import logger
 from app.plugins import _PluginBase
@@ -33,6 +40,291 @@ from app.utils.system import SystemUtils
 lock = threading.Lock()
 
 
+class KeyedLock(object):
+    """
+    按键加锁，相同键的操作串行执行，不同键的操作并行执行
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 键 -> [锁, 引用数]
+        self._locks: Dict[str, list] = {}
+
+    @contextmanager
+    def hold(self, key: Any):
+        with self._lock:
+            item = self._locks.setdefault(key, [threading.Lock(), 0])
+            item[1] += 1
+        item[0].acquire()
+        try:
+            yield
+        finally:
+            item[0].release()
+            with self._lock:
+                item[1] -= 1
+                if item[1] <= 0:
+                    self._locks.pop(key, None)
+
+
+class PathFilter(object):
+    """
+    路径过滤器，回收站及隐藏文件、排除关键词、整理屏蔽词预编译为一个正则，媒体文件扩展名预存为集合
+    """
+    # 回收站及隐藏的文件
+    _ignore_keywords = ["/@Recycle/", "/#recycle/", r"/\.", "/@eaDir"]
+    # 反向引用无法合并到一个正则中
+    _backref_pattern = re.compile(r"\\[1-9]|\(\?P=")
+
+    def __init__(self, exclude_keywords: str = "", transfer_exclude_words: Optional[List[str]] = None,
+                 extensions: Optional[List[str]] = None):
+        """
+        :param exclude_keywords: 排除关键词，每行一个
+        :param transfer_exclude_words: 整理屏蔽词，忽略大小写
+        :param extensions: 媒体文件扩展名，为空时不过滤扩展名
+        """
+        self._exclude_keywords = [keyword for keyword in (exclude_keywords or "").split("\n") if keyword]
+        self._extensions = frozenset(ext.casefold() for ext in extensions) if extensions else None
+        self._transfer_exclude_words = None
+        # 合并后的正则
+        self._pattern: Optional[re.Pattern] = None
+        # 全部关键字 (类型, 关键字, 正则)
+        self._patterns: List[Tuple[str, str, re.Pattern]] = []
+        # 无法合并的关键字
+        self._extra_patterns: List[Tuple[str, str, re.Pattern]] = []
+        self.update(transfer_exclude_words)
+
+    def update(self, transfer_exclude_words: Optional[List[str]] = None):
+        """
+        整理屏蔽词变化时重新编译
+        """
+        words = tuple(word for word in (transfer_exclude_words or []) if word)
+        if words == self._transfer_exclude_words:
+            return
+        self._transfer_exclude_words = words
+
+        items = [("ignore", keyword, 0) for keyword in self._ignore_keywords] \
+            + [("exclude", keyword, 0) for keyword in self._exclude_keywords] \
+            + [("transfer_exclude", word, re.IGNORECASE) for word in words]
+        parts = []
+        patterns = []
+        extra_patterns = []
+        for kind, keyword, flags in items:
+            try:
+                pattern = re.compile(keyword, flags)
+            except re.error:
+                logger.warn(f"关键字 {keyword} 不是有效的正则表达式，按普通文本匹配")
+                pattern = re.compile(re.escape(keyword), flags)
+            patterns.append((kind, keyword, pattern))
+            if self._backref_pattern.search(pattern.pattern):
+                extra_patterns.append((kind, keyword, pattern))
+                continue
+            # 使用非捕获分组，命名分组会明显降低匹配速度
+            parts.append(f"(?i:{pattern.pattern})" if flags else f"(?:{pattern.pattern})")
+        self._patterns = patterns
+        try:
+            self._pattern = re.compile("|".join(parts)) if parts else None
+            self._extra_patterns = extra_patterns
+        except re.error:
+            # 含全局标志、重名分组等无法合并时逐个匹配
+            self._pattern = None
+            self._extra_patterns = patterns
+
+    def match(self, path: str) -> Optional[Tuple[str, str]]:
+        """
+        匹配路径，命中时返回类型（ignore/exclude/transfer_exclude）及关键字
+        """
+        if self._pattern and self._pattern.search(path):
+            # 命中后再查找具体的关键字
+            for kind, keyword, pattern in self._patterns:
+                if pattern.search(path):
+                    return kind, keyword
+        for kind, keyword, pattern in self._extra_patterns:
+            if pattern.search(path):
+                return kind, keyword
+        return None
+
+    def is_media(self, suffix: str) -> bool:
+        """
+        是否媒体文件扩展名
+        """
+        if self._extensions is None:
+            return True
+        return suffix.casefold() in self._extensions
+
+
+class RecognizeCache(object):
+    """
+    识别结果缓存，同一发布的文件共用一次识别，超时后失效
+    """
+
+    def __init__(self, ttl: float = 600):
+        """
+        :param ttl: 缓存有效期（秒）
+        """
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # 同一键只识别一次，其它线程等待识别结果
+        self._key_lock = KeyedLock()
+        # 键 -> [过期时间, 识别结果]
+        self._cache: Dict[tuple, list] = {}
+        # 上次取出统计以来的命中次数
+        self.hits = 0
+        # 上次取出统计以来的未命中次数
+        self.misses = 0
+
+    def get(self, key: tuple, func: Callable[[], Any]) -> Any:
+        """
+        获取缓存，不存在或已过期时调用func识别并缓存，识别结果为空时不缓存
+        """
+        with self._key_lock.hold(key):
+            with self._lock:
+                item = self._cache.get(key)
+                if item and item[0] > time.monotonic():
+                    self.hits += 1
+                    return item[1]
+                self.misses += 1
+            value = func()
+            if value:
+                with self._lock:
+                    self._cache[key] = [time.monotonic() + self._ttl, value]
+            return value
+
+    def take_stats(self) -> Tuple[int, int]:
+        """
+        取出上次取出以来的命中及未命中次数，并重新计数
+        """
+        with self._lock:
+            stats = (self.hits, self.misses)
+            self.hits = self.misses = 0
+        return stats
+
+    def expire(self):
+        """
+        清理过期缓存
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key, item in self._cache.items() if item[0] <= now]:
+                self._cache.pop(key, None)
+
+
+class FileEventQueue(object):
+    """
+    文件事件去抖队列，同一路径的重复事件合并，文件大小稳定后交由线程池处理
+    """
+
+    def __init__(self, handler: Callable[[str, str], None], max_workers: int = 4,
+                 debounce: float = 3, interval: float = 1):
+        """
+        :param handler: 处理函数，参数为事件文件路径、监控目录
+        :param max_workers: 最大并行处理数
+        :param debounce: 去抖时间，文件在该时间内无新事件且大小不变时才处理
+        :param interval: 检查队列的间隔
+        """
+        self._handler = handler
+        self._max_workers = max(max_workers, 1)
+        self._debounce = debounce
+        self._interval = interval
+        self._lock = threading.Lock()
+        # 事件文件路径 -> [监控目录, 最后事件时间, 文件大小]
+        self._pending: Dict[str, list] = {}
+        # 正在处理的事件文件路径
+        self._running = set()
+        self._event = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                            thread_name_prefix="DirMonitor")
+        self._thread = threading.Thread(target=self.__dispatch, name="DirMonitor-Queue", daemon=True)
+        self._thread.start()
+
+    def put(self, event_path: str, mon_path: str):
+        """
+        添加文件事件，已在队列中的路径只刷新事件时间
+        """
+        with self._lock:
+            item = self._pending.get(event_path)
+            if item:
+                item[0] = mon_path
+                item[1] = time.monotonic()
+            else:
+                self._pending[event_path] = [mon_path, time.monotonic(), None]
+
+    def __ready(self) -> List[Tuple[str, str]]:
+        """
+        取出已稳定的文件事件，正在处理的路径等处理完成后再取
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [(event_path, item[1]) for event_path, item in self._pending.items()
+                          if event_path not in self._running and now - item[1] >= self._debounce]
+        if not candidates:
+            return []
+        # 获取文件大小不加锁，避免远程目录阻塞事件入队
+        sizes = {}
+        for event_path, _ in candidates:
+            try:
+                sizes[event_path] = os.stat(event_path).st_size
+            except OSError:
+                sizes[event_path] = None
+        ready = []
+        with self._lock:
+            for event_path, event_time in candidates:
+                item = self._pending.get(event_path)
+                if not item or item[1] != event_time:
+                    # 期间有新的事件
+                    continue
+                size = sizes.get(event_path)
+                if size is None:
+                    # 文件已不存在
+                    self._pending.pop(event_path, None)
+                    continue
+                if size != item[2]:
+                    # 文件仍在写入，等待下一个去抖周期
+                    item[1] = now
+                    item[2] = size
+                    continue
+                if len(self._running) >= self._max_workers:
+                    break
+                self._pending.pop(event_path, None)
+                self._running.add(event_path)
+                ready.append((event_path, item[0]))
+        return ready
+
+    def __dispatch(self):
+        """
+        定时检查队列，提交已稳定的文件事件
+        """
+        while not self._event.wait(self._interval):
+            for event_path, mon_path in self.__ready():
+                try:
+                    self._executor.submit(self.__run, event_path, mon_path)
+                except RuntimeError:
+                    return
+
+    def __run(self, event_path: str, mon_path: str):
+        """
+        处理单个文件事件
+        """
+        try:
+            self._handler(event_path, mon_path)
+        except Exception as e:
+            logger.error(f"{event_path} 处理出错：{str(e)}")
+        finally:
+            with self._lock:
+                self._running.discard(event_path)
+
+    def stop(self):
+        """
+        停止队列，等待正在处理的文件完成，丢弃未处理的事件
+        """
+        self._event.set()
+        self._thread.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            if self._pending:
+                logger.info(f"目录监控队列停止，丢弃 {len(self._pending)} 个未处理事件")
+            self._pending.clear()
+
+
 class FileMonitorHandler(FileSystemEventHandler):
     """
     目录监控响应类
@@ -60,7 +352,7 @@ class DirMonitor(_PluginBase):
     # 插件图标
     plugin_icon = "directory.png"
     # 插件版本
-    plugin_version = "2.4"
+    plugin_version = "2.8"
     # 插件作者
     plugin_author = "jxxghp"
     # 作者主页
@@ -93,6 +385,20 @@ class DirMonitor(_PluginBase):
     _monitor_dirs = ""
     _exclude_keywords = ""
     _interval: int = 10
+    # 整理线程数
+    _threads: int = 4
+    # 文件事件去抖时间（秒）
+    _debounce: int = 3
+    # 文件事件队列
+    _queue: Optional[FileEventQueue] = None
+    # 媒体锁，同一媒体同一季串行整理
+    _media_lock = KeyedLock()
+    # 路径过滤器
+    _path_filter: Optional[PathFilter] = None
+    # 识别缓存有效期（秒）
+    _recognize_ttl: int = 600
+    # 识别缓存
+    _recognize_cache: Optional[RecognizeCache] = None
     # 存储源目录与目的目录关系
     _dirconf: Dict[str, Optional[Path]] = {}
     # 存储源目录转移方式
@@ -100,6 +406,14 @@ class DirMonitor(_PluginBase):
     _medias = {}
     # 退出事件
     _event = threading.Event()
+    # 全量同步锁，避免同时运行多个全量同步
+    _sync_lock = threading.Lock()
+    # 全量同步断点锁
+    _checkpoint_lock = threading.Lock()
+    # 全量同步断点数据键
+    _checkpoint_key = "sync_checkpoint"
+    # 全量同步断点保存间隔（秒）
+    _checkpoint_interval = 30
 
     def init_plugin(self, config: dict = None):
         self.transferhis = TransferHistoryOper()
@@ -110,6 +424,7 @@ class DirMonitor(_PluginBase):
         # 清空配置
         self._dirconf = {}
         self._transferconf = {}
+        self._recognize_cache = RecognizeCache(ttl=self._recognize_ttl)
 
         # 读取配置
         if config:
@@ -124,6 +439,16 @@ class DirMonitor(_PluginBase):
             self._cron = config.get("cron")
             self._size = config.get("size") or 0
             self._scrape = config.get("scrape") or False
+            try:
+                self._threads = int(config.get("threads") or 4)
+            except ValueError:
+                self._threads = 4
+
+        # 路径过滤器
+        self._path_filter = PathFilter(exclude_keywords=self._exclude_keywords,
+                                       transfer_exclude_words=self.systemconfig.get(
+                                           SystemConfigKey.TransferExcludeWords),
+                                       extensions=settings.RMT_MEDIAEXT)
 
         # 停止现有任务
         self.stop_service()
@@ -133,6 +458,11 @@ class DirMonitor(_PluginBase):
             self._scheduler = BackgroundScheduler(timezone=settings.TZ)
             # 追加入库消息统一发送服务
             self._scheduler.add_job(self.send_msg, trigger='interval', seconds=15)
+            # 文件事件队列
+            if self._enabled:
+                self._queue = FileEventQueue(handler=self.__handle_queue_file,
+                                             max_workers=self._threads,
+                                             debounce=self._debounce)
 
             # 读取目录配置
             monitor_dirs = self._monitor_dirs.split("\n")
@@ -242,7 +572,8 @@ class DirMonitor(_PluginBase):
             "interval": self._interval,
             "cron": self._cron,
             "size": self._size,
-            "scrape": self._scrape
+            "scrape": self._scrape,
+            "threads": self._threads
         })
 
     @eventmanager.register(EventType.PluginAction)
@@ -264,15 +595,134 @@ class DirMonitor(_PluginBase):
 
     def sync_all(self):
         """
-        立即运行一次，全量同步目录中所有文件
+        立即运行一次，全量同步目录中所有文件，各监控目录并行扫描，中断后从断点继续
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            logger.info("全量同步监控目录正在运行中，跳过本次同步")
+            return
+        try:
+            logger.info("开始全量同步监控目录 ...")
+            mon_paths = list(self._dirconf.keys())
+            if not mon_paths:
+                return
+            # 读取断点，已不在监控目录中的断点丢弃
+            checkpoint = self.get_data(self._checkpoint_key) or {}
+            checkpoint = {mon_path: last for mon_path, last in checkpoint.items() if mon_path in mon_paths}
+            with ThreadPoolExecutor(max_workers=min(len(mon_paths), max(self._threads, 1)),
+                                    thread_name_prefix="DirMonitor-Sync") as executor:
+                futures = [executor.submit(self.__sync_dir, mon_path, checkpoint) for mon_path in mon_paths]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"全量同步监控目录出错：{str(e)} - {traceback.format_exc()}")
+            if self._event.is_set():
+                logger.info("全量同步监控目录已中断，下次同步将从断点继续")
+            else:
+                logger.info("全量同步监控目录完成！")
+        finally:
+            self._sync_lock.release()
+
+    def __sync_dir(self, mon_path: str, checkpoint: Dict[str, str]):
         """
-        logger.info("开始全量同步监控目录 ...")
-        # 遍历所有监控目录
-        for mon_path in self._dirconf.keys():
-            # 遍历目录下所有文件
-            for file_path in SystemUtils.list_files(Path(mon_path), settings.RMT_MEDIAEXT):
-                self.__handle_file(event_path=str(file_path), mon_path=mon_path)
-        logger.info("全量同步监控目录完成！")
+        全量同步一个监控目录，按路径顺序处理并定时保存断点
+        :param mon_path: 监控目录
+        :param checkpoint: 监控目录 -> 最后处理完成的文件，各监控目录共用
+        """
+        files = self.__scan_files(mon_path)
+        if self._event.is_set():
+            return
+        # 已整理过的文件一次性查询
+        transferred = self.__get_transferred_srcs(mon_path)
+        last = checkpoint.get(mon_path)
+        if last:
+            logger.info(f"{mon_path} 从断点 {last} 继续同步")
+        logger.info(f"{mon_path} 共扫描到 {len(files)} 个媒体文件，已整理 {len(transferred)} 个")
+
+        handled = 0
+        last_save = time.monotonic()
+        for file_path in files:
+            if self._event.is_set():
+                break
+            if last and file_path <= last:
+                continue
+            if not self.__is_transferred(file_path, transferred):
+                self.__handle_file(event_path=file_path, mon_path=mon_path)
+                handled += 1
+            last = file_path
+            if time.monotonic() - last_save > self._checkpoint_interval:
+                self.__save_checkpoint(checkpoint, mon_path, last)
+                last_save = time.monotonic()
+
+        if self._event.is_set():
+            self.__save_checkpoint(checkpoint, mon_path, last)
+        else:
+            # 同步完成，清除断点
+            self.__save_checkpoint(checkpoint, mon_path, None)
+        logger.info(f"{mon_path} 全量同步处理 {handled} 个文件")
+
+    def __scan_files(self, mon_path: str) -> List[str]:
+        """
+        扫描监控目录下的所有媒体文件，按路径排序
+        """
+        files = []
+        dirs = [str(Path(mon_path))]
+        while dirs:
+            if self._event.is_set():
+                return []
+            current = dirs.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                dirs.append(entry.path)
+                            elif entry.is_file() and self._path_filter.is_media(os.path.splitext(entry.name)[1]):
+                                files.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.warn(f"扫描目录 {current} 失败：{str(e)}")
+        files.sort()
+        return files
+
+    @staticmethod
+    def __is_transferred(file_path: str, transferred: set) -> bool:
+        """
+        是否已整理过，蓝光原盘按BDMV前面的目录判断
+        """
+        if file_path in transferred:
+            return True
+        if re.search(r"BDMV[/\\]STREAM", file_path, re.IGNORECASE):
+            return str(Path(file_path[:file_path.find("BDMV")])) in transferred
+        return False
+
+    @db_query
+    def __get_transferred_srcs(self, mon_path: str, db: Session = None) -> set:
+        """
+        查询监控目录下已整理过的源文件
+        """
+        try:
+            result = (
+                db.query(TransferHistory.src)
+                .filter(TransferHistory.src.like(f"{Path(mon_path)}%"))
+                .all()
+            )
+            return {src for src, in result if src}
+        except Exception as e:
+            logger.error(f"查询 {mon_path} 整理历史失败：{str(e)}")
+            return set()
+
+    def __save_checkpoint(self, checkpoint: Dict[str, str], mon_path: str, last: Optional[str]):
+        """
+        保存全量同步断点
+        """
+        with self._checkpoint_lock:
+            if last:
+                checkpoint[mon_path] = last
+            else:
+                checkpoint.pop(mon_path, None)
+            self.save_data(self._checkpoint_key, dict(checkpoint))
 
     def event_handler(self, event, mon_path: str, text: str, event_path: str):
         """
@@ -285,7 +735,19 @@ class DirMonitor(_PluginBase):
         if not event.is_directory:
             # 文件发生变化
             logger.debug("文件%s：%s" % (text, event_path))
-            self.__handle_file(event_path=event_path, mon_path=mon_path)
+            if self._queue:
+                # 加入队列，文件稳定后由线程池处理
+                self._queue.put(event_path=event_path, mon_path=mon_path)
+            else:
+                self.__handle_file(event_path=event_path, mon_path=mon_path)
+
+    def __handle_queue_file(self, event_path: str, mon_path: str):
+        """
+        处理队列中的文件事件
+        """
+        if self._event.is_set():
+            return
+        self.__handle_file(event_path=event_path, mon_path=mon_path)
 
     def __handle_file(self, event_path: str, mon_path: str):
         """
@@ -297,131 +759,115 @@ class DirMonitor(_PluginBase):
         try:
             if not file_path.exists():
                 return
-            # 全程加锁
-            with lock:
-                transfer_history = self.transferhis.get_by_src(event_path)
-                if transfer_history:
-                    logger.debug("文件已处理过：%s" % event_path)
-                    return
+            transfer_history = self.transferhis.get_by_src(event_path)
+            if transfer_history:
+                logger.debug("文件已处理过：%s" % event_path)
+                return
 
-                # 回收站及隐藏的文件不处理
-                if event_path.find('/@Recycle/') != -1 \
-                        or event_path.find('/#recycle/') != -1 \
-                        or event_path.find('/.') != -1 \
-                        or event_path.find('/@eaDir') != -1:
+            # 整理屏蔽词变化时重新编译
+            self._path_filter.update(self.systemconfig.get(SystemConfigKey.TransferExcludeWords))
+            # 回收站及隐藏的文件、命中过滤关键字、整理屏蔽词不处理
+            matched = self._path_filter.match(event_path)
+            if matched:
+                kind, keyword = matched
+                if kind == "ignore":
                     logger.debug(f"{event_path} 是回收站或隐藏的文件")
-                    return
-
-                # 命中过滤关键字不处理
-                if self._exclude_keywords:
-                    for keyword in self._exclude_keywords.split("\n"):
-                        if keyword and re.findall(keyword, event_path):
-                            logger.info(f"{event_path} 命中过滤关键字 {keyword}，不处理")
-                            return
-
-                # 整理屏蔽词不处理
-                transfer_exclude_words = self.systemconfig.get(SystemConfigKey.TransferExcludeWords)
-                if transfer_exclude_words:
-                    for keyword in transfer_exclude_words:
-                        if not keyword:
-                            continue
-                        if keyword and re.search(r"%s" % keyword, event_path, re.IGNORECASE):
-                            logger.info(f"{event_path} 命中整理屏蔽词 {keyword}，不处理")
-                            return
-
-                # 不是媒体文件不处理
-                if file_path.suffix.casefold() not in map(str.casefold, settings.RMT_MEDIAEXT):
-                    logger.debug(f"{event_path} 不是媒体文件")
-                    return
+                elif kind == "exclude":
+                    logger.info(f"{event_path} 命中过滤关键字 {keyword}，不处理")
+                else:
+                    logger.info(f"{event_path} 命中整理屏蔽词 {keyword}，不处理")
+                return
 
-                # 判断是不是蓝光目录
-                bluray_flag = False
-                if re.search(r"BDMV[/\\]STREAM", event_path, re.IGNORECASE):
-                    bluray_flag = True
-                    # 截取BDMV前面的路径
-                    blurray_dir = event_path[:event_path.find("BDMV")]
-                    file_path = Path(blurray_dir)
-                    logger.info(f"{event_path} 是蓝光目录，更正文件路径为：{str(file_path)}")
+            # 不是媒体文件不处理
+            if not self._path_filter.is_media(file_path.suffix):
+                logger.debug(f"{event_path} 不是媒体文件")
+                return
 
-                # 查询历史记录，已转移的不处理
-                if self.transferhis.get_by_src(str(file_path)):
-                    logger.info(f"{file_path} 已整理过")
-                    return
+            # 判断是不是蓝光目录
+            bluray_flag = False
+            if re.search(r"BDMV[/\\]STREAM", event_path, re.IGNORECASE):
+                bluray_flag = True
+                # 截取BDMV前面的路径
+                blurray_dir = event_path[:event_path.find("BDMV")]
+                file_path = Path(blurray_dir)
+                logger.info(f"{event_path} 是蓝光目录，更正文件路径为：{str(file_path)}")
+
+            # 查询历史记录，已转移的不处理
+            if self.transferhis.get_by_src(str(file_path)):
+                logger.info(f"{file_path} 已整理过")
+                return
 
-                # 元数据
-                file_meta = MetaInfoPath(file_path)
-                if not file_meta.name:
-                    logger.error(f"{file_path.name} 无法识别有效信息")
-                    return
+            # 元数据
+            file_meta = MetaInfoPath(file_path)
+            if not file_meta.name:
+                logger.error(f"{file_path.name} 无法识别有效信息")
+                return
 
-                # 判断文件大小
-                if self._size and float(self._size) > 0 and file_path.stat().st_size < float(self._size) * 1024 ** 3:
-                    logger.info(f"{file_path} 文件大小小于监控文件大小，不处理")
-                    return
+            # 判断文件大小
+            if self._size and float(self._size) > 0 and file_path.stat().st_size < float(self._size) * 1024 ** 3:
+                logger.info(f"{file_path} 文件大小小于监控文件大小，不处理")
+                return
 
-                # 查询转移目的目录
-                target: Path = self._dirconf.get(mon_path)
-                # 查询转移方式
-                transfer_type = self._transferconf.get(mon_path)
-
-                # 根据父路径获取下载历史
-                download_history = None
-                if bluray_flag:
-                    # 蓝光原盘，按目录名查询
-                    # FIXME 理论上DownloadHistory表中的path应该是全路径，但实际表中登记的数据只有目录名，暂按目录名查询
-                    download_history = self.downloadhis.get_by_path(file_path.name)
-                else:
-                    # 按文件全路径查询
-                    download_file = self.downloadhis.get_file_by_fullpath(str(file_path))
-                    if download_file:
-                        download_history = self.downloadhis.get_by_hash(download_file.download_hash)
-
-                # 识别媒体信息
-                if download_history and download_history.tmdbid:
-                    mediainfo: MediaInfo = self.mediaChain.recognize_media(mtype=MediaType(download_history.type),
-                                                                           tmdbid=download_history.tmdbid,
-                                                                           doubanid=download_history.doubanid)
-                else:
-                    mediainfo: MediaInfo = self.mediaChain.recognize_by_meta(file_meta)
-                if not mediainfo:
-                    logger.warn(f'未识别到媒体信息，标题：{file_meta.name}')
-                    # 新增转移成功历史记录
-                    his = self.transferhis.add_fail(
-                        src_path=file_path,
-                        mode=transfer_type,
-                        meta=file_meta
+            # 查询转移目的目录
+            target: Path = self._dirconf.get(mon_path)
+            # 查询转移方式
+            transfer_type = self._transferconf.get(mon_path)
+
+            # 根据父路径获取下载历史
+            download_history = None
+            if bluray_flag:
+                # 蓝光原盘，按目录名查询
+                # FIXME 理论上DownloadHistory表中的path应该是全路径，但实际表中登记的数据只有目录名，暂按目录名查询
+                download_history = self.downloadhis.get_by_path(file_path.name)
+            else:
+                # 按文件全路径查询
+                download_file = self.downloadhis.get_file_by_fullpath(str(file_path))
+                if download_file:
+                    download_history = self.downloadhis.get_by_hash(download_file.download_hash)
+
+            # 识别媒体信息
+            mediainfo: MediaInfo = self.__recognize(file_path=file_path,
+                                                    file_meta=file_meta,
+                                                    download_history=download_history)
+            if not mediainfo:
+                logger.warn(f'未识别到媒体信息，标题：{file_meta.name}')
+                # 新增转移成功历史记录
+                his = self.transferhis.add_fail(
+                    src_path=file_path,
+                    mode=transfer_type,
+                    meta=file_meta
+                )
+                if self._notify:
+                    self.post_message(
+                        mtype=NotificationType.Manual,
+                        title=f"{file_path.name} 未识别到媒体信息，无法入库！\n"
+                              f"回复：```\n/redo {his.id} [tmdbid]|[类型]\n``` 手动识别转移。"
                     )
-                    if self._notify:
-                        self.post_message(
-                            mtype=NotificationType.Manual,
-                            title=f"{file_path.name} 未识别到媒体信息，无法入库！\n"
-                                  f"回复：```\n/redo {his.id} [tmdbid]|[类型]\n``` 手动识别转移。"
-                        )
+                return
+            logger.info(f"{file_path.name} 识别为：{mediainfo.type.value} {mediainfo.title_year}")
+
+            # 获取集数据
+            if mediainfo.type == MediaType.TV:
+                season = file_meta.begin_season or 1
+                episodes_info = self._recognize_cache.get(
+                    ("episodes", mediainfo.tmdb_id, season),
+                    lambda: self.tmdbchain.tmdb_episodes(tmdbid=mediainfo.tmdb_id, season=season))
+            else:
+                episodes_info = None
+
+            # 获取下载Hash
+            download_hash = None
+            if download_history:
+                download_hash = download_history.download_hash
+
+            # 同一媒体同一季串行整理，不同媒体并行整理
+            with self._media_lock.hold(f"{mediainfo.type.value}-{mediainfo.tmdb_id or mediainfo.title_year}"
+                                       f"-{file_meta.begin_season or 1}"):
+                # 蓝光原盘多个文件对应同一目录，全量同步也可能同时处理同一文件，加锁后再次检查
+                if self.transferhis.get_by_src(str(file_path)):
+                    logger.info(f"{file_path} 已整理过")
                     return
 
-                # 如果未开启新增已入库媒体是否跟随TMDB信息变化则根据tmdbid查询之前的title
-                if not settings.SCRAP_FOLLOW_TMDB:
-                    transfer_history = self.transferhis.get_by_type_tmdbid(tmdbid=mediainfo.tmdb_id,
-                                                                           mtype=mediainfo.type.value)
-                    if transfer_history:
-                        mediainfo.title = transfer_history.title
-                logger.info(f"{file_path.name} 识别为：{mediainfo.type.value} {mediainfo.title_year}")
-
-                # 更新媒体图片
-                self.chain.obtain_images(mediainfo=mediainfo)
-
-                # 获取集数据
-                if mediainfo.type == MediaType.TV:
-                    episodes_info = self.tmdbchain.tmdb_episodes(tmdbid=mediainfo.tmdb_id,
-                                                                 season=file_meta.begin_season or 1)
-                else:
-                    episodes_info = None
-
-                # 获取下载Hash
-                download_hash = None
-                if download_history:
-                    download_hash = download_history.download_hash
-
                 # 转移
                 transferinfo: TransferInfo = self.chain.transfer(mediainfo=mediainfo,
                                                                  path=file_path,
@@ -501,48 +947,49 @@ class DirMonitor(_PluginBase):
                 }
                 """
                 # 发送消息汇总
-                media_list = self._medias.get(mediainfo.title_year + " " + file_meta.season) or {}
-                if media_list:
-                    media_files = media_list.get("files") or []
-                    if media_files:
-                        file_exists = False
-                        for file in media_files:
-                            if str(file_path) == file.get("path"):
-                                file_exists = True
-                                break
-                        if not file_exists:
-                            media_files.append({
-                                "path": str(file_path),
-                                "mediainfo": mediainfo,
-                                "file_meta": file_meta,
-                                "transferinfo": transferinfo
-                            })
+                with lock:
+                    media_list = self._medias.get(mediainfo.title_year + " " + file_meta.season) or {}
+                    if media_list:
+                        media_files = media_list.get("files") or []
+                        if media_files:
+                            file_exists = False
+                            for file in media_files:
+                                if str(file_path) == file.get("path"):
+                                    file_exists = True
+                                    break
+                            if not file_exists:
+                                media_files.append({
+                                    "path": str(file_path),
+                                    "mediainfo": mediainfo,
+                                    "file_meta": file_meta,
+                                    "transferinfo": transferinfo
+                                })
+                        else:
+                            media_files = [
+                                {
+                                    "path": str(file_path),
+                                    "mediainfo": mediainfo,
+                                    "file_meta": file_meta,
+                                    "transferinfo": transferinfo
+                                }
+                            ]
+                        media_list = {
+                            "files": media_files,
+                            "time": datetime.datetime.now()
+                        }
                     else:
-                        media_files = [
-                            {
-                                "path": str(file_path),
-                                "mediainfo": mediainfo,
-                                "file_meta": file_meta,
-                                "transferinfo": transferinfo
-                            }
-                        ]
-                    media_list = {
-                        "files": media_files,
-                        "time": datetime.datetime.now()
-                    }
-                else:
-                    media_list = {
-                        "files": [
-                            {
-                                "path": str(file_path),
-                                "mediainfo": mediainfo,
-                                "file_meta": file_meta,
-                                "transferinfo": transferinfo
-                            }
-                        ],
-                        "time": datetime.datetime.now()
-                    }
-                self._medias[mediainfo.title_year + " " + file_meta.season] = media_list
+                        media_list = {
+                            "files": [
+                                {
+                                    "path": str(file_path),
+                                    "mediainfo": mediainfo,
+                                    "file_meta": file_meta,
+                                    "transferinfo": transferinfo
+                                }
+                            ],
+                            "time": datetime.datetime.now()
+                        }
+                    self._medias[mediainfo.title_year + " " + file_meta.season] = media_list
 
                 # 广播事件
                 self.eventmanager.send_event(EventType.TransferComplete, {
@@ -565,69 +1012,116 @@ class DirMonitor(_PluginBase):
         except Exception as e:
             logger.error("目录监控发生错误：%s - %s" % (str(e), traceback.format_exc()))
 
+    def __recognize(self, file_path: Path, file_meta: Any, download_history: Any) -> Optional[MediaInfo]:
+        """
+        识别媒体信息并更新媒体图片，同一发布的文件共用缓存的识别结果
+        """
+        if download_history and download_history.tmdbid:
+            key = ("download", download_history.type, download_history.tmdbid, download_history.doubanid)
+        else:
+            key = ("meta", str(file_path.parent), file_meta.name, file_meta.year,
+                   file_meta.type, file_meta.begin_season)
+
+        def recognize_media() -> Optional[MediaInfo]:
+            if download_history and download_history.tmdbid:
+                mediainfo: MediaInfo = self.mediaChain.recognize_media(mtype=MediaType(download_history.type),
+                                                                       tmdbid=download_history.tmdbid,
+                                                                       doubanid=download_history.doubanid)
+            else:
+                mediainfo: MediaInfo = self.mediaChain.recognize_by_meta(file_meta)
+            if not mediainfo:
+                return None
+
+            # 如果未开启新增已入库媒体是否跟随TMDB信息变化则根据tmdbid查询之前的title
+            if not settings.SCRAP_FOLLOW_TMDB:
+                transfer_history = self.transferhis.get_by_type_tmdbid(tmdbid=mediainfo.tmdb_id,
+                                                                       mtype=mediainfo.type.value)
+                if transfer_history:
+                    mediainfo.title = transfer_history.title
+
+            # 更新媒体图片
+            self.chain.obtain_images(mediainfo=mediainfo)
+            return mediainfo
+
+        return self._recognize_cache.get(key, recognize_media)
+
     def send_msg(self):
         """
         定时检查是否有媒体处理完，发送统一消息
         """
+        # 清理过期的识别缓存
+        if self._recognize_cache:
+            self._recognize_cache.expire()
+
         if not self._medias or not self._medias.keys():
             return
 
-        # 遍历检查是否已刮削完，发送消息
-        for medis_title_year_season in list(self._medias.keys()):
-            media_list = self._medias.get(medis_title_year_season)
-            logger.info(f"开始处理媒体 {medis_title_year_season} 消息")
+        # 遍历检查是否已刮削完，取出需要发送消息的媒体
+        send_medias = []
+        with lock:
+            for medis_title_year_season in list(self._medias.keys()):
+                media_list = self._medias.get(medis_title_year_season)
+                logger.info(f"开始处理媒体 {medis_title_year_season} 消息")
 
-            if not media_list:
-                continue
+                if not media_list:
+                    continue
 
-            # 获取最后更新时间
-            last_update_time = media_list.get("time")
-            media_files = media_list.get("files")
-            if not last_update_time or not media_files:
-                continue
+                # 获取最后更新时间
+                last_update_time = media_list.get("time")
+                media_files = media_list.get("files")
+                if not last_update_time or not media_files:
+                    continue
+
+                mediainfo = media_files[0].get("mediainfo")
+                # 判断剧集最后更新时间距现在是已超过10秒或者电影，发送消息
+                if (datetime.datetime.now() - last_update_time).total_seconds() > int(self._interval) \
+                        or mediainfo.type == MediaType.MOVIE:
+                    send_medias.append(media_list)
+                    # 移出key，锁外发送消息
+                    del self._medias[medis_title_year_season]
+
+        if send_medias and self._recognize_cache:
+            hits, misses = self._recognize_cache.take_stats()
+            logger.info(f"本次发送 {len(send_medias)} 个媒体消息，识别缓存命中 {hits} 次，未命中 {misses} 次")
 
+        for media_list in send_medias:
+            media_files = media_list.get("files")
             transferinfo = media_files[0].get("transferinfo")
             file_meta = media_files[0].get("file_meta")
             mediainfo = media_files[0].get("mediainfo")
-            # 判断剧集最后更新时间距现在是已超过10秒或者电影，发送消息
-            if (datetime.datetime.now() - last_update_time).total_seconds() > int(self._interval) \
-                    or mediainfo.type == MediaType.MOVIE:
-                # 发送通知
-                if self._notify:
-
-                    # 汇总处理文件总大小
-                    total_size = 0
-                    file_count = 0
-
-                    # 剧集汇总
-                    episodes = []
-                    for file in media_files:
-                        transferinfo = file.get("transferinfo")
-                        total_size += transferinfo.total_size
-                        file_count += 1
-
-                        file_meta = file.get("file_meta")
-                        if file_meta and file_meta.begin_episode:
-                            episodes.append(file_meta.begin_episode)
-
-                    transferinfo.total_size = total_size
-                    # 汇总处理文件数量
-                    transferinfo.file_count = file_count
-
-                    # 剧集季集信息 S01 E01-E04 || S01 E01、E02、E04
-                    season_episode = None
-                    # 处理文件多，说明是剧集，显示季入库消息
-                    if mediainfo.type == MediaType.TV:
-                        # 季集文本
-                        season_episode = f"{file_meta.season} {StringUtils.format_ep(episodes)}"
-                    # 发送消息
-                    self.transferchian.send_transfer_message(meta=file_meta,
-                                                             mediainfo=mediainfo,
-                                                             transferinfo=transferinfo,
-                                                             season_episode=season_episode)
-                # 发送完消息，移出key
-                del self._medias[medis_title_year_season]
-                continue
+            # 发送通知
+            if self._notify:
+
+                # 汇总处理文件总大小
+                total_size = 0
+                file_count = 0
+
+                # 剧集汇总
+                episodes = []
+                for file in media_files:
+                    transferinfo = file.get("transferinfo")
+                    total_size += transferinfo.total_size
+                    file_count += 1
+
+                    file_meta = file.get("file_meta")
+                    if file_meta and file_meta.begin_episode:
+                        episodes.append(file_meta.begin_episode)
+
+                transferinfo.total_size = total_size
+                # 汇总处理文件数量
+                transferinfo.file_count = file_count
+
+                # 剧集季集信息 S01 E01-E04 || S01 E01、E02、E04
+                season_episode = None
+                # 处理文件多，说明是剧集，显示季入库消息
+                if mediainfo.type == MediaType.TV:
+                    # 季集文本
+                    season_episode = f"{file_meta.season} {StringUtils.format_ep(episodes)}"
+                # 发送消息
+                self.transferchian.send_transfer_message(meta=file_meta,
+                                                         mediainfo=mediainfo,
+                                                         transferinfo=transferinfo,
+                                                         season_episode=season_episode)
 
     def get_state(self) -> bool:
         return self._enabled
@@ -866,6 +1360,28 @@ class DirMonitor(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'threads',
+                                            'label': '整理线程数',
+                                            'placeholder': '4'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
                     {
                         'component': 'VRow',
                         'content': [
@@ -950,6 +1466,7 @@ class DirMonitor(_PluginBase):
                                             'type': 'info',
                                             'variant': 'tonal',
                                             'text': '入库消息延迟默认10s，如网络较慢可酌情调大，有助于发送统一入库消息。'
+                                                    '文件大小稳定后才会开始整理，不同媒体按整理线程数并行整理，同一媒体同一季依次整理。'
                                         }
                                     }
                                 ]
@@ -990,7 +1507,8 @@ class DirMonitor(_PluginBase):
             "interval": 10,
             "cron": "",
             "size": 0,
-            "scrape": True
+            "scrape": True,
+            "threads": 4
         }
 
     def get_page(self) -> List[dict]:
@@ -1008,6 +1526,9 @@ class DirMonitor(_PluginBase):
                 except Exception as e:
                     print(str(e))
         self._observer = []
+        if self._queue:
+            self._queue.stop()
+            self._queue = None
         if self._scheduler:
             self._scheduler.remove_all_jobs()
             if self._scheduler.running:
@@ -1,8 +1,14 @@
+import hashlib
+import json
 import os
 import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from threading import Event
-from typing import Any, List, Dict, Tuple, Optional
+from pathlib import Path
+from threading import Event, Lock, Condition
+from typing import Any, List, Dict, Tuple, Optional, Callable
 
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -26,6 +32,279 @@ from app.utils.http import RequestUtils
 from app.utils.string import StringUtils
 
 
+class TokenBucket(object):
+    """
+    令牌桶，控制单个站点的请求速率
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        :param rate: 每秒生成的令牌数，小于等于0时不限速
+        :param capacity: 令牌桶容量，即允许的突发请求数
+        """
+        self._rate = rate
+        self._capacity = max(capacity, 1)
+        self._tokens = self._capacity
+        self._timestamp = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self, event: Event = None) -> bool:
+        """
+        获取一个令牌，令牌不足时等待，退出事件触发时返回False
+        """
+        if self._rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._timestamp) * self._rate)
+                self._timestamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_seconds = (1 - self._tokens) / self._rate
+            if event:
+                if event.wait(wait_seconds):
+                    return False
+            else:
+                time.sleep(wait_seconds)
+
+
+class SiteDispatcher(object):
+    """
+    按站点分发任务，同一站点的任务串行执行并受令牌桶限速，不同站点的任务并行执行
+    """
+
+    def __init__(self, max_workers: int, rate: float, capacity: float = 1, event: Event = None):
+        """
+        :param max_workers: 最大并行站点数
+        :param rate: 单站点每秒允许的请求数
+        :param capacity: 单站点允许的突发请求数
+        :param event: 退出事件，触发后未执行的任务将被丢弃
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1),
+                                            thread_name_prefix="IYUUAutoSeed")
+        self._rate = rate
+        self._capacity = capacity
+        self._event = event or Event()
+        self._queues: Dict[str, deque] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._running = set()
+        self._lock = Lock()
+        self._idle = Condition(self._lock)
+        self._pending = 0
+        # 已提交任务数
+        self.submitted = 0
+        # 已完成任务数
+        self.finished = 0
+
+    def submit(self, key: str, func: Callable, *args, **kwargs):
+        """
+        提交任务到站点队列
+        """
+        with self._lock:
+            self._queues.setdefault(key, deque()).append((func, args, kwargs))
+            self._pending += 1
+            self.submitted += 1
+            if key in self._running:
+                return
+            self._running.add(key)
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(rate=self._rate, capacity=self._capacity)
+        self._executor.submit(self.__drain, key)
+
+    def __drain(self, key: str):
+        """
+        依次执行站点队列中的任务，队列清空后退出
+        """
+        bucket = self._buckets.get(key)
+        while True:
+            with self._lock:
+                queue = self._queues.get(key)
+                if not queue:
+                    self._running.discard(key)
+                    return
+                func, args, kwargs = queue.popleft()
+            try:
+                if not self._event.is_set() and bucket.acquire(self._event):
+                    func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"站点 {key} 辅种任务执行出错：{str(e)}")
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    self.finished += 1
+                    self._idle.notify_all()
+
+    def join(self):
+        """
+        等待全部任务完成并关闭线程池
+        """
+        with self._lock:
+            self._idle.wait_for(lambda: self._pending <= 0)
+        self._executor.shutdown(wait=True)
+
+
+class SeedIndex(object):
+    """
+    辅种索引，持久化到插件数据目录
+    queried: 下载器种子hash -> [最后查询时间, 查询结果指纹]
+    states: 辅种种子hash -> [处理状态, 记录时间]
+    """
+    # 辅种成功
+    SUCCESS = "success"
+    # 辅种失败，可重试
+    ERROR = "error"
+    # 辅种失败，种子已不存在等无法重试的情况
+    PERMANENT = "permanent"
+    # 辅种成功及无法重试的记录保留时间（秒）
+    STATE_KEEP_SECONDS = 180 * 24 * 3600
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = Lock()
+        self._queried: Dict[str, list] = {}
+        self._states: Dict[str, list] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """
+        从文件加载索引
+        """
+        with self._lock:
+            self._queried, self._states = {}, {}
+            self._dirty = False
+            if not self._path.exists():
+                return
+            try:
+                data = json.loads(self._path.read_text(encoding="utf-8")) or {}
+                self._queried = data.get("queried") or {}
+                self._states = data.get("states") or {}
+            except Exception as e:
+                logger.error(f"加载辅种索引失败：{str(e)}")
+
+    def save(self) -> bool:
+        """
+        有变化时写入文件
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            content = json.dumps({
+                "queried": self._queried,
+                "states": self._states
+            }, separators=(',', ':'))
+            self._dirty = False
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_suffix(".tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, self._path)
+            return True
+        except Exception as e:
+            logger.error(f"保存辅种索引失败：{str(e)}")
+            return False
+
+    def clear(self):
+        """
+        清空索引
+        """
+        with self._lock:
+            self._queried, self._states = {}, {}
+            self._dirty = True
+
+    def migrate(self, success_caches: list = None, error_caches: list = None,
+                permanent_error_caches: list = None) -> int:
+        """
+        迁移旧版本保存在配置中的辅种缓存
+        """
+        count = 0
+        for caches, state in ((success_caches, self.SUCCESS),
+                              (error_caches, self.ERROR),
+                              (permanent_error_caches, self.PERMANENT)):
+            for info_hash in caches or []:
+                if info_hash and not self.get_state(info_hash):
+                    self.set_state(info_hash, state)
+                    count += 1
+        return count
+
+    def get_state(self, info_hash: str) -> Optional[str]:
+        """
+        获取辅种种子的处理状态
+        """
+        state = self._states.get(info_hash)
+        return state[0] if state else None
+
+    def set_state(self, info_hash: str, state: str):
+        """
+        记录辅种种子的处理状态
+        """
+        with self._lock:
+            self._states[info_hash] = [state, int(time.time())]
+            self._dirty = True
+
+    def is_failed(self, info_hash: str) -> bool:
+        """
+        是否辅种失败且已缓存
+        """
+        return self.get_state(info_hash) in (self.ERROR, self.PERMANENT)
+
+    def is_stale(self, torrent_hash: str, interval: int) -> bool:
+        """
+        下载器种子是否需要重新查询：从未查询过或距上次查询已超过间隔（秒），间隔为0时总是查询
+        """
+        if interval <= 0:
+            return True
+        queried = self._queried.get(torrent_hash)
+        return not queried or time.time() - queried[0] >= interval
+
+    def mark_queried(self, torrent_hash: str, fingerprint: str) -> bool:
+        """
+        记录下载器种子的查询时间及结果指纹，返回结果是否有变化
+        """
+        with self._lock:
+            queried = self._queried.get(torrent_hash)
+            self._queried[torrent_hash] = [int(time.time()), fingerprint]
+            self._dirty = True
+        return not queried or queried[1] != fingerprint
+
+    def prune(self, interval: int) -> int:
+        """
+        清理过期记录：查询记录及可重试的失败记录超过查询间隔后清理，间隔为0时保留；
+        辅种成功及无法重试的记录保留 STATE_KEEP_SECONDS，过期的种子下次运行时会重新查询
+        """
+        now = time.time()
+        expire_time = now - interval if interval > 0 else 0
+        state_expire_time = now - self.STATE_KEEP_SECONDS
+        with self._lock:
+            queried = {k: v for k, v in self._queried.items() if v[0] >= expire_time}
+            states = {k: v for k, v in self._states.items()
+                      if v[1] >= (expire_time if v[0] == self.ERROR else state_expire_time)}
+            count = len(self._queried) - len(queried) + len(self._states) - len(states)
+            if count:
+                self._queried, self._states = queried, states
+                self._dirty = True
+        return count
+
+    @staticmethod
+    def fingerprint(seed_info: Optional[dict]) -> str:
+        """
+        计算IYUU查询结果指纹，无可辅种数据时为空
+        """
+        seed_torrents = (seed_info or {}).get("torrent") or []
+        if not isinstance(seed_torrents, list):
+            seed_torrents = [seed_torrents]
+        seeds = sorted(f"{seed.get('sid')}:{seed.get('info_hash')}"
+                       for seed in seed_torrents if isinstance(seed, dict))
+        if not seeds:
+            return ""
+        return hashlib.sha1(",".join(seeds).encode("utf-8")).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self._queried)
+
+
 class IYUUAutoSeed(_PluginBase):
     # 插件名称
     plugin_name = "IYUU自动辅种"
@@ -34,7 +313,7 @@ class IYUUAutoSeed(_PluginBase):
     # 插件图标
     plugin_icon = "IYUU.png"
     # 插件版本
-    plugin_version = "1.9.11"
+    plugin_version = "1.9.13"
     # 插件作者
     plugin_author = "jxxghp"
     # 作者主页
@@ -70,6 +349,18 @@ class IYUUAutoSeed(_PluginBase):
     _addhosttotag = False
     _size = None
     _clearcache = False
+    # IYUU查询并发数
+    _query_threads = 3
+    # 站点下载并发数
+    _download_threads = 5
+    # 单站点每分钟下载种子数
+    _site_rate = 20
+    # 单次查询的种子数
+    _chunk_size = 200
+    # 计数器及校验任务锁
+    _lock = Lock()
+    # 下载器操作锁
+    _downloader_lock = Lock()
     # 退出事件
     _event = Event()
     # 种子链接xpaths
@@ -82,12 +373,10 @@ class IYUUAutoSeed(_PluginBase):
     # 待校全种子hash清单
     _recheck_torrents = {}
     _is_recheck_running = False
-    # 辅种缓存，出错的种子不再重复辅种，可清除
-    _error_caches = []
-    # 辅种缓存，辅种成功的种子，可清除
-    _success_caches = []
-    # 辅种缓存，出错的种子不再重复辅种，且无法清除。种子被删除404等情况
-    _permanent_error_caches = []
+    # 辅种索引，记录查询过的种子及辅种成功、失败的种子，可清除
+    _seed_index = None
+    # 重新查询间隔（天），未到期且无变化的种子不再提交IYUU查询
+    _requery_days = 7
     # 辅种计数
     total = 0
     realtotal = 0
@@ -95,11 +384,15 @@ class IYUUAutoSeed(_PluginBase):
     exist = 0
     fail = 0
     cached = 0
+    queried = 0
+    skipped = 0
+    processed = 0
 
     def init_plugin(self, config: dict = None):
         self.sites = SitesHelper()
         self.siteoper = SiteOper()
         self.torrent = TorrentHelper()
+        self._seed_index = SeedIndex(self.get_data_path() / "seed_index.json")
         # 读取配置
         if config:
             self._enabled = config.get("enabled")
@@ -117,9 +410,20 @@ class IYUUAutoSeed(_PluginBase):
             self._addhosttotag = config.get("addhosttotag")
             self._size = float(config.get("size")) if config.get("size") else 0
             self._clearcache = config.get("clearcache")
-            self._permanent_error_caches = [] if self._clearcache else config.get("permanent_error_caches") or []
-            self._error_caches = [] if self._clearcache else config.get("error_caches") or []
-            self._success_caches = [] if self._clearcache else config.get("success_caches") or []
+            self._query_threads = self.__get_int(config.get("query_threads"), 3)
+            self._download_threads = self.__get_int(config.get("download_threads"), 5)
+            self._site_rate = self.__get_int(config.get("site_rate"), 20)
+            self._requery_days = self.__get_int(config.get("requery_days"), 7)
+            if self._clearcache:
+                self._seed_index.clear()
+            else:
+                # 迁移旧版本保存在配置中的缓存
+                migrated = self._seed_index.migrate(success_caches=config.get("success_caches"),
+                                                    error_caches=config.get("error_caches"),
+                                                    permanent_error_caches=config.get("permanent_error_caches"))
+                if migrated:
+                    logger.info(f"已迁移 {migrated} 条辅种缓存到辅种索引")
+            self._seed_index.save()
 
             # 过滤掉已删除的站点
             all_sites = [site.id for site in self.siteoper.list_order_by_pri()] + [site.get("id") for site in
@@ -491,6 +795,80 @@ class IYUUAutoSeed(_PluginBase):
                                 ]
                             }
                         ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'query_threads',
+                                            'label': 'IYUU查询并发数',
+                                            'placeholder': '同时查询的分组数，默认3'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'download_threads',
+                                            'label': '站点并发数',
+                                            'placeholder': '同时下载种子的站点数，默认5'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'site_rate',
+                                            'label': '单站点每分钟下载数',
+                                            'placeholder': '单个站点每分钟最多下载的种子数，0为不限制'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'requery_days',
+                                            'label': '重新查询间隔(天)',
+                                            'placeholder': '已查询过的种子在间隔内不再查询，可重试的失败缓存超过间隔后自动清除，'
+                                                           '0为每次都查询且失败缓存保留至清除缓存；辅种成功及无法重试的记录保留180天'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
                     }
                 ]
             }
@@ -509,7 +887,11 @@ class IYUUAutoSeed(_PluginBase):
             "nolabels": "",
             "labelsafterseed": "",
             "categoryafterseed": "",
-            "size": ""
+            "size": "",
+            "query_threads": 3,
+            "download_threads": 5,
+            "site_rate": 20,
+            "requery_days": 7
         }
 
     def get_page(self) -> List[dict]:
@@ -532,9 +914,10 @@ class IYUUAutoSeed(_PluginBase):
             "categoryafterseed": self._categoryafterseed,
             "addhosttotag": self._addhosttotag,
             "size": self._size,
-            "success_caches": self._success_caches,
-            "error_caches": self._error_caches,
-            "permanent_error_caches": self._permanent_error_caches
+            "query_threads": self._query_threads,
+            "download_threads": self._download_threads,
+            "site_rate": self._site_rate,
+            "requery_days": self._requery_days
         })
 
     def __get_downloader(self, dtype: str):
@@ -563,6 +946,16 @@ class IYUUAutoSeed(_PluginBase):
         self.exist = 0
         self.fail = 0
         self.cached = 0
+        self.queried = 0
+        self.skipped = 0
+        self.processed = 0
+        start_time = time.monotonic()
+        # 重新查询间隔（秒）
+        requery_interval = self._requery_days * 24 * 3600
+        # 清理过期的索引记录
+        pruned = self._seed_index.prune(requery_interval)
+        if pruned:
+            logger.info(f"已清理 {pruned} 条过期的辅种索引记录")
         # 扫描下载器辅种
         for downloader in self._downloaders:
             logger.info(f"开始扫描下载器 {downloader} ...")
@@ -575,13 +968,14 @@ class IYUUAutoSeed(_PluginBase):
                 logger.info(f"下载器 {downloader} 没有已完成种子")
                 continue
             hash_strs = []
+            skipped = 0
             for torrent in torrents:
                 if self._event.is_set():
                     logger.info(f"辅种服务停止")
                     return
                 # 获取种子hash
                 hash_str = self.__get_hash(torrent, downloader)
-                if hash_str in self._error_caches or hash_str in self._permanent_error_caches:
+                if self._seed_index.is_failed(hash_str):
                     logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
                     continue
                 save_path = self.__get_save_path(torrent, downloader)
@@ -615,41 +1009,52 @@ class IYUUAutoSeed(_PluginBase):
                     logger.info(f"种子 {hash_str} 大小:{torrent_size:.2f}GB，小于设定 {self._size}GB，跳过 ...")
                     continue
 
+                # 未到重新查询时间
+                if not self._seed_index.is_stale(hash_str, requery_interval):
+                    skipped += 1
+                    continue
+
                 hash_strs.append({
                     "hash": hash_str,
                     "save_path": save_path
                 })
+            if skipped:
+                self.skipped += skipped
+                logger.info(f"{skipped} 个种子未到重新查询时间，跳过 ...")
             if hash_strs:
                 logger.info(f"总共需要辅种的种子数：{len(hash_strs)}")
-                # 分组处理，减少IYUU Api请求次数
-                chunk_size = 200
-                for i in range(0, len(hash_strs), chunk_size):
-                    # 切片操作
-                    chunk = hash_strs[i:i + chunk_size]
-                    # 处理分组
-                    self.__seed_torrents(hash_strs=chunk,
-                                         downloader=downloader)
+                self.__seed_torrents(hash_strs=hash_strs,
+                                     downloader=downloader)
                 # 触发校验检查
                 self.check_recheck()
             else:
                 logger.info(f"没有需要辅种的种子")
 
         # 保存缓存
-        self.__update_config()
+        self._seed_index.save()
+        # 耗时及吞吐量
+        elapsed = max(time.monotonic() - start_time, 0.001)
+        throughput = f"耗时：{elapsed:.0f} 秒，" \
+                     f"查询 {self.queried / elapsed:.1f} 个/秒，" \
+                     f"下载 {self.processed * 60 / elapsed:.1f} 个/分钟"
         # 发送消息
         if self._notify:
             if self.success or self.fail:
                 self.post_message(
                     mtype=NotificationType.SiteMessage,
                     title="【IYUU自动辅种任务完成】",
-                    text=f"服务器返回可辅种总数：{self.total}\n"
+                    text=f"查询种子数：{self.queried}\n"
+                         f"未到期跳过查询：{self.skipped}\n"
+                         f"服务器返回可辅种总数：{self.total}\n"
                          f"实际可辅种数：{self.realtotal}\n"
+                         f"已处理：{self.processed}\n"
                          f"已存在：{self.exist}\n"
                          f"成功：{self.success}\n"
                          f"失败：{self.fail}\n"
-                         f"{self.cached} 条失败记录已加入缓存"
+                         f"{self.cached} 条失败记录已加入缓存\n"
+                         f"{throughput}"
                 )
-        logger.info("辅种任务执行完成")
+        logger.info(f"辅种任务执行完成，{throughput}")
 
     def check_recheck(self):
         """
@@ -694,29 +1099,111 @@ class IYUUAutoSeed(_PluginBase):
 
     def __seed_torrents(self, hash_strs: list, downloader: str):
         """
-        执行一批种子的辅种
+        执行下载器的辅种：分组并发查询IYUU，查询结果按站点分发到限速队列中并发下载
         """
         if not hash_strs:
             return
-        logger.info(f"下载器 {downloader} 开始查询辅种，数量：{len(hash_strs)} ...")
         # 下载器中的Hashs
-        hashs = [item.get("hash") for item in hash_strs]
+        hashs = set(item.get("hash") for item in hash_strs)
         # 每个Hash的保存目录
         save_paths = {}
         for item in hash_strs:
             save_paths[item.get("hash")] = item.get("save_path")
-        # 查询可辅种数据
-        seed_list, msg = self.iyuuhelper.get_seed_info(hashs)
+        # 分组处理，减少IYUU Api请求次数
+        chunks = [[item.get("hash") for item in hash_strs[i:i + self._chunk_size]]
+                  for i in range(0, len(hash_strs), self._chunk_size)]
+        # 并发查询前先汇报站点，避免各线程重复请求
+        self.iyuuhelper.prepare()
+        # 每个Hash本次辅种成功的种子
+        success_torrents: Dict[str, List[str]] = {}
+        # 本次已分发的种子，避免重复下载
+        dispatched = set()
+        # 每个Hash的查询结果指纹
+        fingerprints: Dict[str, str] = {}
+        # 辅种失败但可重试的Hash，不记录查询时间
+        retry_hashs = set()
+        dispatcher = SiteDispatcher(max_workers=self._download_threads,
+                                    rate=self._site_rate / 60,
+                                    event=self._event)
+        executor = ThreadPoolExecutor(max_workers=max(self._query_threads, 1),
+                                      thread_name_prefix="IYUUAutoSeed-Query")
+        try:
+            futures = {executor.submit(self.__query_seed_info, chunk, downloader): chunk for chunk in chunks}
+            for index, future in enumerate(as_completed(futures)):
+                if self._event.is_set():
+                    logger.info(f"辅种服务停止")
+                    break
+                seed_list = future.result()
+                if seed_list is not None:
+                    for torrent_hash in futures[future]:
+                        fingerprints[torrent_hash] = SeedIndex.fingerprint(seed_list.get(torrent_hash))
+                if seed_list:
+                    self.__dispatch_seeds(seed_list=seed_list,
+                                          hashs=hashs,
+                                          save_paths=save_paths,
+                                          downloader=downloader,
+                                          dispatcher=dispatcher,
+                                          dispatched=dispatched,
+                                          success_torrents=success_torrents,
+                                          retry_hashs=retry_hashs)
+                logger.info(f"下载器 {downloader} 查询进度：{index + 1}/{len(chunks)}，"
+                            f"已分发下载：{dispatcher.submitted}，已完成下载：{dispatcher.finished}")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            dispatcher.join()
+            with self._lock:
+                self.processed += dispatcher.finished
+
+        # 记录查询结果，中途停止时不记录，下次重新查询
+        if not self._event.is_set():
+            changed = 0
+            for torrent_hash, fingerprint in fingerprints.items():
+                if torrent_hash in retry_hashs:
+                    continue
+                if self._seed_index.mark_queried(torrent_hash, fingerprint):
+                    changed += 1
+            logger.info(f"下载器 {downloader} 查询结果有变化的种子数：{changed}/{len(fingerprints)}")
+            self._seed_index.save()
+
+        # 辅种成功的去重放入历史
+        for current_hash, torrents in success_torrents.items():
+            if torrents:
+                self.__save_history(current_hash=current_hash,
+                                    downloader=downloader,
+                                    success_torrents=torrents)
+
+        logger.info(f"下载器 {downloader} 辅种完成")
+
+    def __query_seed_info(self, hashs: list, downloader: str) -> Optional[dict]:
+        """
+        查询一组种子的可辅种数据
+        """
+        if self._event.is_set():
+            return None
+        logger.info(f"下载器 {downloader} 开始查询辅种，数量：{len(hashs)} ...")
+        try:
+            seed_list, msg = self.iyuuhelper.get_seed_info(hashs)
+        except Exception as e:
+            logger.error(f"IYUU查询辅种出错：{str(e)}")
+            return None
+        with self._lock:
+            self.queried += len(hashs)
         if not isinstance(seed_list, dict):
             # 判断辅种异常是否是由于Token未认证导致的，由于没有解决接口，只能从返回值来判断
             if self._token and msg == '请求缺少token':
                 logger.warn(f'IYUU辅种失败，疑似站点未绑定插件配置不完整，请先检查是否完成站点绑定！{msg}')
             else:
                 logger.warn(f"当前种子列表没有可辅种的站点：{msg}")
-            return
-        else:
-            logger.info(f"IYUU返回可辅种数：{len(seed_list)}")
-        # 遍历
+            return None
+        logger.info(f"IYUU返回可辅种数：{len(seed_list)}")
+        return seed_list
+
+    def __dispatch_seeds(self, seed_list: dict, hashs: set, save_paths: dict, downloader: str,
+                         dispatcher: SiteDispatcher, dispatched: set, success_torrents: Dict[str, List[str]],
+                         retry_hashs: set):
+        """
+        过滤可辅种数据并按站点分发下载任务
+        """
         for current_hash, seed_info in seed_list.items():
             if not seed_info:
                 continue
@@ -724,10 +1211,9 @@ class IYUUAutoSeed(_PluginBase):
             if not isinstance(seed_torrents, list):
                 seed_torrents = [seed_torrents]
 
-            # 本次辅种成功的种子
-            success_torrents = []
-
             for seed in seed_torrents:
+                if self._event.is_set():
+                    return
                 if not seed:
                     continue
                 if not isinstance(seed, dict):
@@ -737,26 +1223,61 @@ class IYUUAutoSeed(_PluginBase):
                 if seed.get("info_hash") in hashs:
                     logger.info(f"{seed.get('info_hash')} 已在下载器中，跳过 ...")
                     continue
-                if seed.get("info_hash") in self._success_caches:
+                seed_state = self._seed_index.get_state(seed.get("info_hash"))
+                if seed_state == SeedIndex.SUCCESS:
                     logger.info(f"{seed.get('info_hash')} 已处理过辅种，跳过 ...")
                     continue
-                if seed.get("info_hash") in self._error_caches or seed.get("info_hash") in self._permanent_error_caches:
+                if seed_state in (SeedIndex.ERROR, SeedIndex.PERMANENT):
                     logger.info(f"种子 {seed.get('info_hash')} 辅种失败且已缓存，跳过 ...")
                     continue
-                # 添加任务
-                success = self.__download_torrent(seed=seed,
-                                                  downloader=downloader,
-                                                  save_path=save_paths.get(current_hash))
-                if success:
-                    success_torrents.append(seed.get("info_hash"))
-
-            # 辅种成功的去重放入历史
-            if len(success_torrents) > 0:
-                self.__save_history(current_hash=current_hash,
-                                    downloader=downloader,
-                                    success_torrents=success_torrents)
-
-        logger.info(f"下载器 {downloader} 辅种完成")
+                if seed.get("info_hash") in dispatched:
+                    logger.info(f"{seed.get('info_hash')} 已在下载队列中，跳过 ...")
+                    continue
+                # 检查站点及下载器
+                seed_site = self.__get_seed_site(seed=seed, downloader=downloader)
+                if not seed_site:
+                    continue
+                site_info, site_domain, download_page = seed_site
+                dispatched.add(seed.get("info_hash"))
+                # 添加任务到站点队列
+                dispatcher.submit(site_domain,
+                                  self.__download_seed,
+                                  current_hash=current_hash,
+                                  seed=seed,
+                                  downloader=downloader,
+                                  save_path=save_paths.get(current_hash),
+                                  site_info=site_info,
+                                  site_domain=site_domain,
+                                  download_page=download_page,
+                                  success_torrents=success_torrents,
+                                  retry_hashs=retry_hashs)
+
+    def __download_seed(self, current_hash: str, seed: dict, downloader: str, save_path: str,
+                        site_info: dict, site_domain: str, download_page: str,
+                        success_torrents: Dict[str, List[str]], retry_hashs: set):
+        """
+        站点队列中执行下载，并记录辅种成功的种子及可重试的Hash
+        """
+        success = self.__download_torrent(seed=seed,
+                                          downloader=downloader,
+                                          save_path=save_path,
+                                          site_info=site_info,
+                                          site_domain=site_domain,
+                                          download_page=download_page)
+        with self._lock:
+            if success:
+                success_torrents.setdefault(current_hash, []).append(seed.get("info_hash"))
+            elif not self._seed_index.get_state(seed.get("info_hash")):
+                # 站点流控等未缓存的失败，下次运行时重新查询
+                retry_hashs.add(current_hash)
+
+    def __incr(self, *names: str):
+        """
+        计数器加一
+        """
+        with self._lock:
+            for name in names:
+                setattr(self, name, getattr(self, name) + 1)
 
     def __save_history(self, current_hash: str, downloader: str, success_torrents: []):
         """
@@ -857,56 +1378,64 @@ class IYUUAutoSeed(_PluginBase):
         logger.error(f"不支持的下载器：{downloader}")
         return None
 
-    def __download_torrent(self, seed: dict, downloader: str, save_path: str):
+    def __get_seed_site(self, seed: dict, downloader: str) -> Optional[Tuple[dict, str, str]]:
         """
-        下载种子
-        torrent: {
-                    "sid": 3,
-                    "torrent_id": 377467,
-                    "info_hash": "a444850638e7a6f6220e2efdde94099c53358159"
-                }
+        查询种子对应的站点信息，并检查是否已在下载器中
+        :return: 站点信息、站点域名、下载地址模板
         """
-
-        def __is_special_site(url):
-            """
-            判断是否为特殊站点（是否需要添加https）
-            """
-            if "hdsky.me" in url:
-                return False
-            return True
-
-        self.total += 1
+        self.__incr("total")
         # 获取种子站点及下载地址模板
         site_url, download_page = self.iyuuhelper.get_torrent_url(seed.get("sid"))
         if not site_url or not download_page:
             # 加入缓存
-            self._error_caches.append(seed.get("info_hash"))
-            self.fail += 1
-            self.cached += 1
-            return False
+            self._seed_index.set_state(seed.get("info_hash"), SeedIndex.ERROR)
+            self.__incr("fail", "cached")
+            return None
         # 查询站点
         site_domain = StringUtils.get_url_domain(site_url)
         # 站点信息
         site_info = self.sites.get_indexer(site_domain)
         if not site_info or not site_info.get('url'):
             logger.debug(f"没有维护种子对应的站点：{site_url}")
-            return False
+            return None
         if self._sites and site_info.get('id') not in self._sites:
             logger.info("当前站点不在选择的辅种站点范围，跳过 ...")
-            return False
-        self.realtotal += 1
+            return None
+        self.__incr("realtotal")
         # 查询hash值是否已经在下载器中
         downloader_obj = self.__get_downloader(downloader)
-        torrent_info, _ = downloader_obj.get_torrents(ids=[seed.get("info_hash")])
+        with self._downloader_lock:
+            torrent_info, _ = downloader_obj.get_torrents(ids=[seed.get("info_hash")])
         if torrent_info:
             logger.info(f"{seed.get('info_hash')} 已在下载器中，跳过 ...")
-            self.exist += 1
-            return False
+            self.__incr("exist")
+            return None
+        return site_info, site_domain, download_page
+
+    def __download_torrent(self, seed: dict, downloader: str, save_path: str,
+                           site_info: dict, site_domain: str, download_page: str):
+        """
+        下载种子
+        torrent: {
+                    "sid": 3,
+                    "torrent_id": 377467,
+                    "info_hash": "a444850638e7a6f6220e2efdde94099c53358159"
+                }
+        """
+
+        def __is_special_site(url):
+            """
+            判断是否为特殊站点（是否需要添加https）
+            """
+            if "hdsky.me" in url:
+                return False
+            return True
+
         # 站点流控
         check, checkmsg = self.sites.check(site_domain)
         if check:
             logger.warn(checkmsg)
-            self.fail += 1
+            self.__incr("fail")
             return False
         # 下载种子
         torrent_url = self.__get_download_url(seed=seed,
@@ -914,9 +1443,8 @@ class IYUUAutoSeed(_PluginBase):
                                               base_url=download_page)
         if not torrent_url:
             # 加入失败缓存
-            self._error_caches.append(seed.get("info_hash"))
-            self.fail += 1
-            self.cached += 1
+            self._seed_index.set_state(seed.get("info_hash"), SeedIndex.ERROR)
+            self.__incr("fail", "cached")
             return False
         # 强制使用Https
         if __is_special_site(torrent_url):
@@ -932,29 +1460,31 @@ class IYUUAutoSeed(_PluginBase):
             proxy=site_info.get("proxy"))
         if not content:
             # 下载失败
-            self.fail += 1
+            self.__incr("fail")
             # 加入失败缓存
             if error_msg and ('无法打开链接' in error_msg or '触发站点流控' in error_msg):
-                self._error_caches.append(seed.get("info_hash"))
+                self._seed_index.set_state(seed.get("info_hash"), SeedIndex.ERROR)
             else:
                 # 种子不存在的情况
-                self._permanent_error_caches.append(seed.get("info_hash"))
+                self._seed_index.set_state(seed.get("info_hash"), SeedIndex.PERMANENT)
             logger.error(f"下载种子文件失败：{torrent_url}")
             return False
         # 添加下载，辅种任务默认暂停
         logger.info(f"添加下载任务：{torrent_url} ...")
-        download_id = self.__download(downloader=downloader,
-                                      content=content,
-                                      save_path=save_path,
-                                      site_name=site_info.get("name"))
+        downloader_obj = self.__get_downloader(downloader)
+        with self._downloader_lock:
+            download_id = self.__download(downloader=downloader,
+                                          content=content,
+                                          save_path=save_path,
+                                          site_name=site_info.get("name"))
         if not download_id:
             # 下载失败
-            self.fail += 1
+            self.__incr("fail")
             # 加入失败缓存
-            self._error_caches.append(seed.get("info_hash"))
+            self._seed_index.set_state(seed.get("info_hash"), SeedIndex.ERROR)
             return False
         else:
-            self.success += 1
+            self.__incr("success")
             if self._skipverify:
                 # 跳过校验
                 logger.info(f"{download_id} 跳过校验，请自行检查...")
@@ -965,19 +1495,31 @@ class IYUUAutoSeed(_PluginBase):
             else:
                 # 追加校验任务
                 logger.info(f"添加校验检查任务：{download_id} ...")
-                if not self._recheck_torrents.get(downloader):
-                    self._recheck_torrents[downloader] = []
-                self._recheck_torrents[downloader].append(download_id)
+                with self._lock:
+                    if not self._recheck_torrents.get(downloader):
+                        self._recheck_torrents[downloader] = []
+                    self._recheck_torrents[downloader].append(download_id)
                 # TR会自动校验
                 if downloader == "qbittorrent":
                     # 开始校验种子
-                    downloader_obj.recheck_torrents(ids=[download_id])
+                    with self._downloader_lock:
+                        downloader_obj.recheck_torrents(ids=[download_id])
             # 下载成功
             logger.info(f"成功添加辅种下载，站点：{site_info.get('name')}，种子链接：{torrent_url}")
             # 成功也加入缓存，有一些改了路径校验不通过的，手动删除后，下一次又会辅上
-            self._success_caches.append(seed.get("info_hash"))
+            self._seed_index.set_state(seed.get("info_hash"), SeedIndex.SUCCESS)
             return True
 
+    @staticmethod
+    def __get_int(value: Any, default: int) -> int:
+        """
+        转换整数配置项，非法时使用默认值
+        """
+        try:
+            return max(int(value), 0)
+        except (TypeError, ValueError):
+            return default
+
     @staticmethod
     def __get_hash(torrent: Any, dl_type: str):
         """
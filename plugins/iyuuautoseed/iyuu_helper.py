@@ -90,6 +90,16 @@ class IyuuHelper(object):
             return result.get('sid_sha1')
         return None
 
+    def prepare(self) -> bool:
+        """
+        预先加载站点列表并汇报辅种站点，避免并发查询时重复请求
+        """
+        if not self._sites:
+            self._sites = self.__get_sites()
+        if not self._sid_sha1:
+            self._sid_sha1 = self.__report_existing()
+        return True if self._sid_sha1 else False
+
     def get_seed_info(self, info_hashs: list) -> Tuple[Optional[dict], str]:
         """
         返回info_hash对应的站点id、种子id
@@ -24,6 +24,92 @@ from app.utils.system import SystemUtils
 lock = threading.Lock()
 
 
+class PathFilter(object):
+    """
+    路径过滤器，回收站及隐藏文件、排除关键词、整理屏蔽词预编译为一个正则，媒体文件扩展名预存为集合
+    """
+    # 回收站及隐藏的文件
+    _ignore_keywords = ["/@Recycle/", "/#recycle/", r"/\.", "/@eaDir"]
+    # 反向引用无法合并到一个正则中
+    _backref_pattern = re.compile(r"\\[1-9]|\(\?P=")
+
+    def __init__(self, exclude_keywords: str = "", transfer_exclude_words: Optional[List[str]] = None,
+                 extensions: Optional[List[str]] = None):
+        """
+        :param exclude_keywords: 排除关键词，每行一个
+        :param transfer_exclude_words: 整理屏蔽词，忽略大小写
+        :param extensions: 媒体文件扩展名，为空时不过滤扩展名
+        """
+        self._exclude_keywords = [keyword for keyword in (exclude_keywords or "").split("\n") if keyword]
+        self._extensions = frozenset(ext.casefold() for ext in extensions) if extensions else None
+        self._transfer_exclude_words = None
+        # 合并后的正则
+        self._pattern: Optional[re.Pattern] = None
+        # 全部关键字 (类型, 关键字, 正则)
+        self._patterns: List[Tuple[str, str, re.Pattern]] = []
+        # 无法合并的关键字
+        self._extra_patterns: List[Tuple[str, str, re.Pattern]] = []
+        self.update(transfer_exclude_words)
+
+    def update(self, transfer_exclude_words: Optional[List[str]] = None):
+        """
+        整理屏蔽词变化时重新编译
+        """
+        words = tuple(word for word in (transfer_exclude_words or []) if word)
+        if words == self._transfer_exclude_words:
+            return
+        self._transfer_exclude_words = words
+
+        items = [("ignore", keyword, 0) for keyword in self._ignore_keywords] \
+            + [("exclude", keyword, 0) for keyword in self._exclude_keywords] \
+            + [("transfer_exclude", word, re.IGNORECASE) for word in words]
+        parts = []
+        patterns = []
+        extra_patterns = []
+        for kind, keyword, flags in items:
+            try:
+                pattern = re.compile(keyword, flags)
+            except re.error:
+                logger.warn(f"关键字 {keyword} 不是有效的正则表达式，按普通文本匹配")
+                pattern = re.compile(re.escape(keyword), flags)
+            patterns.append((kind, keyword, pattern))
+            if self._backref_pattern.search(pattern.pattern):
+                extra_patterns.append((kind, keyword, pattern))
+                continue
+            # 使用非捕获分组，命名分组会明显降低匹配速度
+            parts.append(f"(?i:{pattern.pattern})" if flags else f"(?:{pattern.pattern})")
+        self._patterns = patterns
+        try:
+            self._pattern = re.compile("|".join(parts)) if parts else None
+            self._extra_patterns = extra_patterns
+        except re.error:
+            # 含全局标志、重名分组等无法合并时逐个匹配
+            self._pattern = None
+            self._extra_patterns = patterns
+
+    def match(self, path: str) -> Optional[Tuple[str, str]]:
+        """
+        匹配路径，命中时返回类型（ignore/exclude/transfer_exclude）及关键字
+        """
+        if self._pattern and self._pattern.search(path):
+            # 命中后再查找具体的关键字
+            for kind, keyword, pattern in self._patterns:
+                if pattern.search(path):
+                    return kind, keyword
+        for kind, keyword, pattern in self._extra_patterns:
+            if pattern.search(path):
+                return kind, keyword
+        return None
+
+    def is_media(self, suffix: str) -> bool:
+        """
+        是否媒体文件扩展名
+        """
+        if self._extensions is None:
+            return True
+        return suffix.casefold() in self._extensions
+
+
 class FileMonitorHandler(FileSystemEventHandler):
     """
     目录监控响应类
@@ -51,7 +137,7 @@ class LinkMonitor(_PluginBase):
     # 插件图标
     plugin_icon = "Linkace_C.png"
     # 插件版本
-    plugin_version = "1.6"
+    plugin_version = "1.7"
     # 插件作者
     plugin_author = "jxxghp"
     # 作者主页
@@ -74,6 +160,8 @@ class LinkMonitor(_PluginBase):
     # 转移方式
     _monitor_dirs = ""
     _exclude_keywords = ""
+    # 路径过滤器
+    _path_filter: Optional[PathFilter] = None
 
     # 模式 compatibility/fast
     _mode = "fast"
@@ -100,6 +188,9 @@ class LinkMonitor(_PluginBase):
             self._cron = config.get("cron")
             self._size = config.get("size") or 0
 
+        # 路径过滤器
+        self._path_filter = PathFilter(exclude_keywords=self._exclude_keywords)
+
         # 停止现有任务
         self.stop_service()
 
@@ -290,21 +381,16 @@ class LinkMonitor(_PluginBase):
             # 全程加锁
             with lock:
 
-                # 回收站及隐藏的文件不处理
-                if event_path.find('/@Recycle/') != -1 \
-                        or event_path.find('/#recycle/') != -1 \
-                        or event_path.find('/.') != -1 \
-                        or event_path.find('/@eaDir') != -1:
-                    logger.debug(f"{event_path} 是回收站或隐藏的文件")
+                # 回收站及隐藏的文件、命中过滤关键字不处理
+                matched = self._path_filter.match(event_path)
+                if matched:
+                    kind, keyword = matched
+                    if kind == "ignore":
+                        logger.debug(f"{event_path} 是回收站或隐藏的文件")
+                    else:
+                        logger.info(f"{event_path} 命中过滤关键字 {keyword}，不处理")
                     return
 
-                # 命中过滤关键字不处理
-                if self._exclude_keywords:
-                    for keyword in self._exclude_keywords.split("\n"):
-                        if keyword and re.findall(keyword, event_path):
-                            logger.info(f"{event_path} 命中过滤关键字 {keyword}，不处理")
-                            return
-
                 # 判断文件大小
                 if self._size and float(self._size) > 0 and file_path.stat().st_size < float(self._size) * 1024:
                     logger.info(f"{event_path} 文件大小小于最小文件大小，复制...")
@@ -19,6 +19,48 @@ from app.modules.emby import Emby
 from app.modules.jellyfin import Jellyfin
 from app.plugins import _PluginBase
 from app.schemas.types import NotificationType, EventType, MediaType, MediaImageType
+from app.utils.http import RequestUtils
+
+
+class TorrentActionPlan(object):
+    """
+    种子删除、暂停计划，汇总后按下载器批量执行
+    """
+
+    def __init__(self):
+        # 下载器 -> 需要删除的种子
+        self._remove: Dict[Optional[str], Dict[str, None]] = {}
+        # 下载器 -> 需要暂停的种子
+        self._stop: Dict[Optional[str], Dict[str, None]] = {}
+        # 已处理辅种的种子及删除标志
+        self.seed_checked = set()
+
+    def remove(self, hashs: str, downloader: Optional[str] = None):
+        """
+        添加删除种子
+        """
+        self._remove.setdefault(downloader, {})[hashs] = None
+
+    def stop(self, hashs: str, downloader: Optional[str] = None):
+        """
+        添加暂停种子
+        """
+        self._stop.setdefault(downloader, {})[hashs] = None
+
+    def execute(self, chain: Any):
+        """
+        每个下载器的删除、暂停操作各调用一次，同时删除和暂停的种子只删除
+        """
+        for downloader, hashs in self._remove.items():
+            logger.info(f"删除下载器 {downloader or settings.DEFAULT_DOWNLOADER} 种子 {len(hashs)} 个")
+            chain.remove_torrents(hashs=list(hashs), downloader=downloader)
+        for downloader, hashs in self._stop.items():
+            removed = self._remove.get(downloader) or {}
+            stop_hashs = [torrent_hash for torrent_hash in hashs if torrent_hash not in removed]
+            if not stop_hashs:
+                continue
+            logger.info(f"暂停下载器 {downloader or settings.DEFAULT_DOWNLOADER} 种子 {len(stop_hashs)} 个")
+            chain.stop_torrents(hashs=stop_hashs, downloader=downloader)
 
 
 class MediaSyncDel(_PluginBase):
@@ -29,7 +71,7 @@ class MediaSyncDel(_PluginBase):
     # 插件图标
     plugin_icon = "mediasyncdel.png"
     # 插件版本
-    plugin_version = "1.7.1"
+    plugin_version = "1.9"
     # 插件作者
     plugin_author = "thsrite"
     # 作者主页
@@ -54,6 +96,16 @@ class MediaSyncDel(_PluginBase):
     _transferchain = None
     _transferhis = None
     _downloadhis = None
+    # 日志解析正则
+    _emby_log_pattern = re.compile(
+        r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}.\d{3}) Info App: Removing item from database, Type: (\w+), Name: (.*), Path: (.*), Id: (\d+)')
+    _jellyfin_log_pattern = re.compile(r'\[(.*?)\].*?Removing item, Type: "(.*?)", Name: "(.*?)", Path: "(.*?)"')
+    # 已提示无法增量读取日志的媒体服务器
+    _log_range_warned = set()
+    _year_pattern = re.compile(r'\(\d+\)')
+    _name_pattern = re.compile(r"\/([\u4e00-\u9fa5]+)(?= \()")
+    _season_pattern = re.compile(r"Season\s*(\d+)")
+    _episode_pattern = re.compile(r"S\d+E(\d+)")
 
     def init_plugin(self, config: dict = None):
         self._transferchain = TransferChain()
@@ -785,10 +837,9 @@ class MediaSyncDel(_PluginBase):
 
         # 开始删除
         year = None
-        del_torrent_hashs = []
-        stop_torrent_hashs = []
-        error_cnt = 0
         image = 'https://emby.media/notificationicon.png'
+        # 需要处理种子的转移记录
+        torrent_transfer_history = []
         for transferhis in transfer_history:
             title = transferhis.title
             if title not in media_name:
@@ -807,21 +858,10 @@ class MediaSyncDel(_PluginBase):
                 if transferhis.src and Path(transferhis.src).suffix in settings.RMT_MEDIAEXT:
                     self._transferchain.delete_files(Path(transferhis.src))
                     if transferhis.download_hash:
-                        try:
-                            # 2、判断种子是否被删除完
-                            delete_flag, success_flag, handle_torrent_hashs = self.handle_torrent(
-                                type=transferhis.type,
-                                src=transferhis.src,
-                                torrent_hash=transferhis.download_hash)
-                            if not success_flag:
-                                error_cnt += 1
-                            else:
-                                if delete_flag:
-                                    del_torrent_hashs += handle_torrent_hashs
-                                else:
-                                    stop_torrent_hashs += handle_torrent_hashs
-                        except Exception as e:
-                            logger.error("删除种子失败：%s" % str(e))
+                        torrent_transfer_history.append(transferhis)
+
+        # 2、批量判断种子是否被删除完并处理
+        del_torrent_hashs, stop_torrent_hashs, error_cnt = self.__handle_torrents(torrent_transfer_history)
 
         logger.info(f"同步删除 {msg} 完成！")
 
@@ -955,6 +995,8 @@ class MediaSyncDel(_PluginBase):
         # 读取历史记录
         history = self.get_data('history') or []
         last_time = self.get_data("last_time") or None
+        # 各日志文件已解析的位置
+        log_offsets = self.get_data("log_offsets") or {}
         del_medias = []
 
         # 媒体服务器类型，多个以,分隔
@@ -963,15 +1005,16 @@ class MediaSyncDel(_PluginBase):
         media_servers = settings.MEDIASERVER.split(',')
         for media_server in media_servers:
             if media_server == 'emby':
-                del_medias.extend(self.parse_emby_log(last_time))
+                del_medias.extend(self.parse_emby_log(last_time, log_offsets))
             elif media_server == 'jellyfin':
-                del_medias.extend(self.parse_jellyfin_log(last_time))
+                del_medias.extend(self.parse_jellyfin_log(last_time, log_offsets))
             elif media_server == 'plex':
                 # TODO plex解析日志
                 return
 
         if not del_medias:
             logger.error("未解析到已删除媒体信息")
+            self.save_data("log_offsets", log_offsets)
             return
 
         # 遍历删除
@@ -1055,9 +1098,8 @@ class MediaSyncDel(_PluginBase):
 
             # 开始删除
             image = 'https://emby.media/notificationicon.png'
-            del_torrent_hashs = []
-            stop_torrent_hashs = []
-            error_cnt = 0
+            # 需要处理种子的转移记录
+            torrent_transfer_history = []
             for transferhis in transfer_history:
                 title = transferhis.title
                 if title not in media_name:
@@ -1075,21 +1117,10 @@ class MediaSyncDel(_PluginBase):
                     if transferhis.src and Path(transferhis.src).suffix in settings.RMT_MEDIAEXT:
                         self._transferchain.delete_files(Path(transferhis.src))
                         if transferhis.download_hash:
-                            try:
-                                # 2、判断种子是否被删除完
-                                delete_flag, success_flag, handle_torrent_hashs = self.handle_torrent(
-                                    type=transferhis.type,
-                                    src=transferhis.src,
-                                    torrent_hash=transferhis.download_hash)
-                                if not success_flag:
-                                    error_cnt += 1
-                                else:
-                                    if delete_flag:
-                                        del_torrent_hashs += handle_torrent_hashs
-                                    else:
-                                        stop_torrent_hashs += handle_torrent_hashs
-                            except Exception as e:
-                                logger.error("删除种子失败：%s" % str(e))
+                            torrent_transfer_history.append(transferhis)
+
+            # 2、批量判断种子是否被删除完并处理
+            del_torrent_hashs, stop_torrent_hashs, _ = self.__handle_torrents(torrent_transfer_history)
 
             logger.info(f"同步删除 {msg} 完成！")
 
@@ -1130,6 +1161,8 @@ class MediaSyncDel(_PluginBase):
         self.save_data("history", history)
 
         self.save_data("last_time", last_del_time)
+        # 全部处理完成后才保存解析位置，中途退出时下次重新解析
+        self.save_data("log_offsets", log_offsets)
 
     def handle_torrent(self, type: str, src: str, torrent_hash: str):
         """
@@ -1137,6 +1170,72 @@ class MediaSyncDel(_PluginBase):
         局部删除则暂停种子
         全部删除则删除种子
         """
+        try:
+            # 删除本次种子记录
+            self._downloadhis.delete_file_by_fullpath(fullpath=src)
+        except Exception as e:
+            logger.error(f"删种失败： {str(e)}")
+            return False, False, 0
+        plan = TorrentActionPlan()
+        result = self.__plan_torrent(type=type, srcs=[src], torrent_hash=torrent_hash, plan=plan)
+        try:
+            plan.execute(self.chain)
+        except Exception as e:
+            logger.error(f"删种失败： {str(e)}")
+            return False, False, 0
+        return result
+
+    def __handle_torrents(self, transfer_history: List[TransferHistory]) -> Tuple[list, list, int]:
+        """
+        批量处理转移记录对应的种子：先删除全部文件记录，再按种子hash分组判断是否局部删除，
+        最后每个下载器的删除、暂停操作各调用一次
+        :return: 删除的种子、暂停的种子、失败数
+        """
+        del_torrent_hashs = []
+        stop_torrent_hashs = []
+        error_cnt = 0
+        if not transfer_history:
+            return del_torrent_hashs, stop_torrent_hashs, error_cnt
+
+        # 按种子hash分组
+        torrent_groups: Dict[str, List[TransferHistory]] = {}
+        for transferhis in transfer_history:
+            torrent_groups.setdefault(transferhis.download_hash, []).append(transferhis)
+
+        # 删除本次种子记录，全部删除后文件状态即为最终状态
+        for transferhis in transfer_history:
+            try:
+                self._downloadhis.delete_file_by_fullpath(fullpath=transferhis.src)
+            except Exception as e:
+                logger.error(f"删除下载文件记录失败：{transferhis.src} {str(e)}")
+
+        # 计算每个种子的最终操作
+        plan = TorrentActionPlan()
+        for torrent_hash, rows in torrent_groups.items():
+            delete_flag, success_flag, handle_torrent_hashs = self.__plan_torrent(
+                type=rows[0].type,
+                srcs=[row.src for row in rows],
+                torrent_hash=torrent_hash,
+                plan=plan)
+            if not success_flag:
+                error_cnt += 1
+            elif delete_flag:
+                del_torrent_hashs += handle_torrent_hashs
+            else:
+                stop_torrent_hashs += handle_torrent_hashs
+
+        # 批量执行
+        try:
+            plan.execute(self.chain)
+        except Exception as e:
+            logger.error("删除种子失败：%s" % str(e))
+        return del_torrent_hashs, stop_torrent_hashs, error_cnt
+
+    def __plan_torrent(self, type: str, srcs: List[str], torrent_hash: str, plan: TorrentActionPlan):
+        """
+        判断种子是否局部删除，局部删除则暂停种子，全部删除则删除种子，操作加入计划中
+        :param srcs: 本次删除的该种子的文件，文件记录需已删除
+        """
         download_id = torrent_hash
         download = settings.DEFAULT_DOWNLOADER
         history_key = "%s-%s" % (download, torrent_hash)
@@ -1147,9 +1246,6 @@ class MediaSyncDel(_PluginBase):
 
         handle_torrent_hashs = []
         try:
-            # 删除本次种子记录
-            self._downloadhis.delete_file_by_fullpath(fullpath=src)
-
             # 根据种子hash查询所有下载器文件记录
             download_files = self._downloadhis.get_files_by_hash(download_hash=torrent_hash)
             if not download_files:
@@ -1189,14 +1285,13 @@ class MediaSyncDel(_PluginBase):
 
                         # 删除源种子
                         logger.info(f"删除源下载器下载任务：{settings.DEFAULT_DOWNLOADER} - {torrent_hash}")
-                        self.chain.remove_torrents(torrent_hash)
+                        plan.remove(torrent_hash)
                         handle_torrent_hashs.append(torrent_hash)
 
                     # 删除转种后任务
                     logger.info(f"删除转种后下载任务：{download} - {download_id}")
                     # 删除转种后下载任务
-                    self.chain.remove_torrents(hashs=torrent_hash,
-                                               downloader=download)
+                    plan.remove(torrent_hash, downloader=download)
                     handle_torrent_hashs.append(download_id)
                 else:
                     # 暂停种子
@@ -1206,43 +1301,46 @@ class MediaSyncDel(_PluginBase):
 
                         # 暂停源种子
                         logger.info(f"暂停源下载器下载任务：{settings.DEFAULT_DOWNLOADER} - {torrent_hash}")
-                        self.chain.stop_torrents(torrent_hash)
+                        plan.stop(torrent_hash)
                         handle_torrent_hashs.append(torrent_hash)
 
                     logger.info(f"暂停转种后下载任务：{download} - {download_id}")
                     # 删除转种后下载任务
-                    self.chain.stop_torrents(hashs=download_id, downloader=download)
+                    plan.stop(download_id, downloader=download)
                     handle_torrent_hashs.append(download_id)
             else:
                 # 未转种de情况
                 if delete_flag:
                     # 删除源种子
                     logger.info(f"删除源下载器下载任务：{download} - {download_id}")
-                    self.chain.remove_torrents(download_id)
+                    plan.remove(download_id)
                 else:
                     # 暂停源种子
                     logger.info(f"暂停源下载器下载任务：{download} - {download_id}")
-                    self.chain.stop_torrents(download_id)
+                    plan.stop(download_id)
                 handle_torrent_hashs.append(download_id)
 
             # 处理辅种
             handle_torrent_hashs = self.__del_seed(download_id=download_id,
                                                    delete_flag=delete_flag,
-                                                   handle_torrent_hashs=handle_torrent_hashs)
+                                                   handle_torrent_hashs=handle_torrent_hashs,
+                                                   plan=plan)
             # 处理合集
             if str(type) == "电视剧":
-                handle_torrent_hashs = self.__del_collection(src=src,
-                                                             delete_flag=delete_flag,
-                                                             torrent_hash=torrent_hash,
-                                                             download_files=download_files,
-                                                             handle_torrent_hashs=handle_torrent_hashs)
+                for src in srcs:
+                    handle_torrent_hashs = self.__del_collection(src=src,
+                                                                 delete_flag=delete_flag,
+                                                                 torrent_hash=torrent_hash,
+                                                                 download_files=download_files,
+                                                                 handle_torrent_hashs=handle_torrent_hashs,
+                                                                 plan=plan)
             return delete_flag, True, handle_torrent_hashs
         except Exception as e:
             logger.error(f"删种失败： {str(e)}")
             return False, False, 0
 
     def __del_collection(self, src: str, delete_flag: bool, torrent_hash: str, download_files: list,
-                         handle_torrent_hashs: list):
+                         handle_torrent_hashs: list, plan: TorrentActionPlan):
         """
         处理合集
         """
@@ -1253,6 +1351,9 @@ class MediaSyncDel(_PluginBase):
                     # src查询记录 判断download_hash是否不一致
                     if download_file and download_file.download_hash and str(download_file.download_hash) != str(
                             torrent_hash):
+                        # 同一合集种子只处理一次
+                        if download_file.download_hash in handle_torrent_hashs:
+                            continue
                         # 查询新download_hash对应files数量
                         hash_download_files = self._downloadhis.get_files_by_hash(
                             download_hash=download_file.download_hash)
@@ -1272,13 +1373,11 @@ class MediaSyncDel(_PluginBase):
 
                             # 删除合集种子
                             if delete_flag:
-                                self.chain.remove_torrents(hashs=download_file.download_hash,
-                                                           downloader=download_file.downloader)
+                                plan.remove(download_file.download_hash, downloader=download_file.downloader)
                                 logger.info(f"删除合集种子 {download_file.downloader} {download_file.download_hash}")
                             else:
                                 # 暂停合集种子
-                                self.chain.stop_torrents(hashs=download_file.download_hash,
-                                                         downloader=download_file.downloader)
+                                plan.stop(download_file.download_hash, downloader=download_file.downloader)
                                 logger.info(f"暂停合集种子 {download_file.downloader} {download_file.download_hash}")
                             # 已处理种子+1
                             handle_torrent_hashs.append(download_file.download_hash)
@@ -1286,17 +1385,22 @@ class MediaSyncDel(_PluginBase):
                             # 处理合集辅种
                             handle_torrent_hashs = self.__del_seed(download_id=download_file.download_hash,
                                                                    delete_flag=delete_flag,
-                                                                   handle_torrent_hashs=handle_torrent_hashs)
+                                                                   handle_torrent_hashs=handle_torrent_hashs,
+                                                                   plan=plan)
         except Exception as e:
             logger.error(f"处理 {torrent_hash} 合集失败")
             print(str(e))
 
         return handle_torrent_hashs
 
-    def __del_seed(self, download_id, delete_flag, handle_torrent_hashs):
+    def __del_seed(self, download_id, delete_flag, handle_torrent_hashs, plan: TorrentActionPlan):
         """
         删除辅种
         """
+        # 同一种子的辅种只处理一次
+        if (download_id, delete_flag) in plan.seed_checked:
+            return handle_torrent_hashs
+        plan.seed_checked.add((download_id, delete_flag))
         # 查询是否有辅种记录
         history_key = download_id
         plugin_id = "IYUUAutoSeed"
@@ -1320,17 +1424,17 @@ class MediaSyncDel(_PluginBase):
                     # 删除辅种
                     if delete_flag:
                         logger.info(f"删除辅种：{downloader} - {torrent}")
-                        self.chain.remove_torrents(hashs=torrent,
-                                                   downloader=downloader)
+                        plan.remove(torrent, downloader=downloader)
                     # 暂停辅种
                     else:
-                        self.chain.stop_torrents(hashs=torrent, downloader=downloader)
+                        plan.stop(torrent, downloader=downloader)
                         logger.info(f"辅种：{downloader} - {torrent} 暂停")
 
                     # 处理辅种的辅种
                     handle_torrent_hashs = self.__del_seed(download_id=torrent,
                                                            delete_flag=delete_flag,
-                                                           handle_torrent_hashs=handle_torrent_hashs)
+                                                           handle_torrent_hashs=handle_torrent_hashs,
+                                                           plan=plan)
 
             # 删除辅种历史
             if delete_flag:
@@ -1339,210 +1443,238 @@ class MediaSyncDel(_PluginBase):
         return handle_torrent_hashs
 
     @staticmethod
-    def parse_emby_log(last_time):
+    def __format_host(host: Optional[str]) -> Optional[str]:
         """
-        获取emby日志列表、解析emby日志
+        按媒体服务器模块的规则补全服务器地址
         """
+        if not host:
+            return None
+        if not host.endswith("/"):
+            host += "/"
+        if not host.startswith("http"):
+            host = "http://" + host
+        return host
 
-        def __parse_log(file_name: str, del_list: list):
-            """
-            解析emby日志
-            """
-            log_url = f"[HOST]System/Logs/{file_name}?api_key=[APIKEY]"
-            log_res = Emby().get_data(log_url)
-            if not log_res or log_res.status_code != 200:
-                logger.error("获取emby日志失败，请检查服务器配置")
-                return del_list
-
-            # 正则解析删除的媒体信息
-            pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}.\d{3}) Info App: Removing item from database, Type: (\w+), Name: (.*), Path: (.*), Id: (\d+)'
-            matches = re.findall(pattern, log_res.text)
-
-            # 循环获取媒体信息
-            for match in matches:
-                mtime = match[0]
-                # 排除已处理的媒体信息
-                if last_time and mtime < last_time:
-                    continue
+    @staticmethod
+    def __read_log_tail(server: Any, host: Optional[str], apikey: Optional[str], log_url: str, log_key: str,
+                        log_meta: Optional[dict], log_offsets: dict) -> Optional[str]:
+        """
+        增量读取日志，只返回上次解析位置之后的完整行
+        :param server: 媒体服务器
+        :param host: 媒体服务器地址，与API密钥均配置时才能增量读取
+        :param apikey: 媒体服务器API密钥
+        :param log_url: 日志地址
+        :param log_key: 日志标识
+        :param log_meta: 日志列表中的文件信息（大小、创建时间），用于判断日志是否变化及轮转
+        :param log_offsets: 各日志已解析的位置，读取后更新
+        """
+        state = log_offsets.get(log_key) or {}
+        offset = state.get("offset") or 0
+        created = (log_meta or {}).get("DateCreated")
+        size = (log_meta or {}).get("Size")
+        # 日志被轮转，从头读取
+        if created and state.get("created") and created != state.get("created"):
+            offset = 0
+        if size is not None and size < offset:
+            offset = 0
+        # 日志未变化
+        if offset and size is not None and size == offset:
+            return None
+
+        content, partial = None, False
+        host = MediaSyncDel.__format_host(host)
+        server_name = log_key.split(":")[0]
+        if offset and not (host and apikey) and server_name not in MediaSyncDel._log_range_warned:
+            MediaSyncDel._log_range_warned.add(server_name)
+            logger.warn(f"{server_name} 服务器地址或API密钥未配置，无法增量读取日志，每次将获取完整日志")
+        if offset and host and apikey:
+            # 尝试只获取新增部分，服务器不支持时会返回完整日志
+            res = RequestUtils(headers={"Range": f"bytes={offset}-"}).get_res(
+                url=log_url.replace("[HOST]", host).replace("[APIKEY]", apikey))
+            if res is not None:
+                if res.status_code == 206:
+                    content, partial = res.content, True
+                elif res.status_code == 416:
+                    return None
+                elif res.status_code == 200:
+                    content = res.content
+        if content is None:
+            res = server.get_data(log_url)
+            if not res or res.status_code != 200:
+                logger.error(f"获取日志 {log_key} 失败，请检查服务器配置")
+                return None
+            content = res.content
+        if not partial:
+            if len(content) < offset:
+                # 日志被轮转，从头读取
+                offset = 0
+            content = content[offset:]
+
+        # 只解析完整的行，不完整的行留到下次
+        end = content.rfind(b"\n") + 1
+        log_offsets[log_key] = {
+            "offset": offset + end,
+            "created": created
+        }
+        if not end:
+            return None
+        return content[:end].decode("utf-8", errors="ignore")
 
-                mtype = match[1]
-                name = match[2]
-                path = match[3]
-
-                year = None
-                year_pattern = r'\(\d+\)'
-                year_match = re.search(year_pattern, path)
-                if year_match:
-                    year = year_match.group()[1:-1]
-
-                season = None
-                episode = None
-                if mtype == 'Episode' or mtype == 'Season':
-                    name_pattern = r"\/([\u4e00-\u9fa5]+)(?= \()"
-                    season_pattern = r"Season\s*(\d+)"
-                    episode_pattern = r"S\d+E(\d+)"
-                    name_match = re.search(name_pattern, path)
-                    season_match = re.search(season_pattern, path)
-                    episode_match = re.search(episode_pattern, path)
-
-                    if name_match:
-                        name = name_match.group(1)
-
-                    if season_match:
-                        season = season_match.group(1)
-                        if int(season) < 10:
-                            season = f'S0{season}'
-                        else:
-                            season = f'S{season}'
-                    else:
-                        season = None
+    @staticmethod
+    def __parse_log_lines(text: str, keyword: str, pattern: re.Pattern, last_time: str, del_list: list) -> list:
+        """
+        逐行解析日志中删除的媒体信息
+        """
+        for line in text.splitlines():
+            if keyword not in line:
+                continue
+            match = pattern.search(line)
+            if not match:
+                continue
+            mtime = match.group(1)
+            # 排除已处理的媒体信息
+            if last_time and mtime < last_time:
+                continue
 
-                    if episode_match:
-                        episode = episode_match.group(1)
-                        episode = f'E{episode}'
+            mtype = match.group(2)
+            name = match.group(3)
+            path = match.group(4)
+
+            year = None
+            year_match = MediaSyncDel._year_pattern.search(path)
+            if year_match:
+                year = year_match.group()[1:-1]
+
+            season = None
+            episode = None
+            if mtype == 'Episode' or mtype == 'Season':
+                name_match = MediaSyncDel._name_pattern.search(path)
+                season_match = MediaSyncDel._season_pattern.search(path)
+                episode_match = MediaSyncDel._episode_pattern.search(path)
+
+                if name_match:
+                    name = name_match.group(1)
+
+                if season_match:
+                    season = season_match.group(1)
+                    if int(season) < 10:
+                        season = f'S0{season}'
                     else:
-                        episode = None
-
-                media = {
-                    "time": mtime,
-                    "type": mtype,
-                    "name": name,
-                    "year": year,
-                    "path": path,
-                    "season": season,
-                    "episode": episode,
-                }
-                logger.debug(f"解析到删除媒体：{json.dumps(media)}")
-                del_list.append(media)
+                        season = f'S{season}'
+                else:
+                    season = None
+
+                if episode_match:
+                    episode = episode_match.group(1)
+                    episode = f'E{episode}'
+                else:
+                    episode = None
+
+            media = {
+                "time": mtime,
+                "type": mtype,
+                "name": name,
+                "year": year,
+                "path": path,
+                "season": season,
+                "episode": episode,
+            }
+            logger.debug(f"解析到删除媒体：{json.dumps(media)}")
+            del_list.append(media)
 
-            return del_list
+        return del_list
 
-        log_files = []
+    @staticmethod
+    def parse_emby_log(last_time, log_offsets: dict):
+        """
+        获取emby日志列表、增量解析emby日志
+        """
+        emby = Emby()
+        log_files = {}
         try:
             # 获取所有emby日志
             log_list_url = "[HOST]System/Logs/Query?Limit=3&api_key=[APIKEY]"
-            log_list_res = Emby().get_data(log_list_url)
+            log_list_res = emby.get_data(log_list_url)
 
             if log_list_res and log_list_res.status_code == 200:
                 log_files_dict = json.loads(log_list_res.text)
                 for item in log_files_dict.get("Items"):
                     if str(item.get('Name')).startswith("embyserver"):
-                        log_files.append(str(item.get('Name')))
+                        log_files[str(item.get('Name'))] = item
         except Exception as e:
             print(str(e))
 
         if not log_files:
-            log_files.append("embyserver.txt")
+            log_files["embyserver.txt"] = None
 
         del_medias = []
-        log_files.reverse()
-        for log_file in log_files:
-            del_medias = __parse_log(file_name=log_file,
-                                     del_list=del_medias)
+        for log_file in reversed(list(log_files.keys())):
+            text = MediaSyncDel.__read_log_tail(server=emby,
+                                                host=settings.EMBY_HOST,
+                                                apikey=settings.EMBY_API_KEY,
+                                                log_url=f"[HOST]System/Logs/{log_file}?api_key=[APIKEY]",
+                                                log_key=f"emby:{log_file}",
+                                                log_meta=log_files.get(log_file),
+                                                log_offsets=log_offsets)
+            if not text:
+                continue
+            del_medias = MediaSyncDel.__parse_log_lines(text=text,
+                                                        keyword="Removing item from database",
+                                                        pattern=MediaSyncDel._emby_log_pattern,
+                                                        last_time=last_time,
+                                                        del_list=del_medias)
+        # 获取到日志列表时，清理已不存在的日志
+        if any(log_files.values()):
+            for log_key in [key for key in log_offsets if key.startswith("emby:")]:
+                if log_key[len("emby:"):] not in log_files:
+                    log_offsets.pop(log_key)
 
         return del_medias
 
     @staticmethod
-    def parse_jellyfin_log(last_time: datetime):
+    def parse_jellyfin_log(last_time: datetime, log_offsets: dict):
         """
-        获取jellyfin日志列表、解析jellyfin日志
+        获取jellyfin日志列表、增量解析jellyfin日志
         """
-
-        def __parse_log(file_name: str, del_list: list):
-            """
-            解析jellyfin日志
-            """
-            log_url = f"[HOST]System/Logs/Log?name={file_name}&api_key=[APIKEY]"
-            log_res = Jellyfin().get_data(log_url)
-            if not log_res or log_res.status_code != 200:
-                logger.error("获取jellyfin日志失败，请检查服务器配置")
-                return del_list
-
-            # 正则解析删除的媒体信息
-            pattern = r'\[(.*?)\].*?Removing item, Type: "(.*?)", Name: "(.*?)", Path: "(.*?)"'
-            matches = re.findall(pattern, log_res.text)
-
-            # 循环获取媒体信息
-            for match in matches:
-                mtime = match[0]
-                # 排除已处理的媒体信息
-                if last_time and mtime < last_time:
-                    continue
-
-                mtype = match[1]
-                name = match[2]
-                path = match[3]
-
-                year = None
-                year_pattern = r'\(\d+\)'
-                year_match = re.search(year_pattern, path)
-                if year_match:
-                    year = year_match.group()[1:-1]
-
-                season = None
-                episode = None
-                if mtype == 'Episode' or mtype == 'Season':
-                    name_pattern = r"\/([\u4e00-\u9fa5]+)(?= \()"
-                    season_pattern = r"Season\s*(\d+)"
-                    episode_pattern = r"S\d+E(\d+)"
-                    name_match = re.search(name_pattern, path)
-                    season_match = re.search(season_pattern, path)
-                    episode_match = re.search(episode_pattern, path)
-
-                    if name_match:
-                        name = name_match.group(1)
-
-                    if season_match:
-                        season = season_match.group(1)
-                        if int(season) < 10:
-                            season = f'S0{season}'
-                        else:
-                            season = f'S{season}'
-                    else:
-                        season = None
-
-                    if episode_match:
-                        episode = episode_match.group(1)
-                        episode = f'E{episode}'
-                    else:
-                        episode = None
-
-                media = {
-                    "time": mtime,
-                    "type": mtype,
-                    "name": name,
-                    "year": year,
-                    "path": path,
-                    "season": season,
-                    "episode": episode,
-                }
-                logger.debug(f"解析到删除媒体：{json.dumps(media)}")
-                del_list.append(media)
-
-            return del_list
-
-        log_files = []
+        jellyfin = Jellyfin()
+        log_files = {}
         try:
             # 获取所有jellyfin日志
             log_list_url = "[HOST]System/Logs?api_key=[APIKEY]"
-            log_list_res = Jellyfin().get_data(log_list_url)
+            log_list_res = jellyfin.get_data(log_list_url)
 
             if log_list_res and log_list_res.status_code == 200:
                 log_files_dict = json.loads(log_list_res.text)
                 for item in log_files_dict:
                     if str(item.get('Name')).startswith("log_"):
-                        log_files.append(str(item.get('Name')))
+                        log_files[str(item.get('Name'))] = item
         except Exception as e:
             print(str(e))
 
         if not log_files:
-            log_files.append("log_%s.log" % datetime.date.today().strftime("%Y%m%d"))
+            log_files["log_%s.log" % datetime.date.today().strftime("%Y%m%d")] = None
 
         del_medias = []
-        log_files.reverse()
-        for log_file in log_files:
-            del_medias = __parse_log(file_name=log_file,
-                                     del_list=del_medias)
+        for log_file in reversed(list(log_files.keys())):
+            text = MediaSyncDel.__read_log_tail(server=jellyfin,
+                                                host=settings.JELLYFIN_HOST,
+                                                apikey=settings.JELLYFIN_API_KEY,
+                                                log_url=f"[HOST]System/Logs/Log?name={log_file}&api_key=[APIKEY]",
+                                                log_key=f"jellyfin:{log_file}",
+                                                log_meta=log_files.get(log_file),
+                                                log_offsets=log_offsets)
+            if not text:
+                continue
+            del_medias = MediaSyncDel.__parse_log_lines(text=text,
+                                                        keyword="Removing item",
+                                                        pattern=MediaSyncDel._jellyfin_log_pattern,
+                                                        last_time=last_time,
+                                                        del_list=del_medias)
+        # 获取到日志列表时，清理已不存在的日志
+        if any(log_files.values()):
+            for log_key in [key for key in log_offsets if key.startswith("jellyfin:")]:
+                if log_key[len("jellyfin:"):] not in log_files:
+                    log_offsets.pop(log_key)
 
         return del_medias
 
@@ -1,8 +1,11 @@
 import json
+import os
 import re
 import warnings
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from multiprocessing.dummy import Pool as ThreadPool
+from pathlib import Path
 from threading import Lock
 from typing import Optional, Any, List, Dict, Tuple
 
@@ -34,6 +37,251 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 lock = Lock()
 
 
+class SiteDataStore(object):
+    """
+    站点数据时序存储，按 站点 × 日期 × 指标 列式保存，持久化到插件数据目录
+    dates: 升序日期列表
+    sites: 站点名称列表，行号即站点索引
+    values: 指标 -> 每个站点一行、与 dates 对齐的数值列表，无数据为 None
+    deltas: 指标 -> 每个站点相对上一个有数据日期的增量，与 values 对齐
+    totals、delta_totals: 指标 -> 每日全部站点汇总
+    snapshot: 最新一天的完整站点数据，用于页面明细展示
+    """
+    # 保存的数值指标
+    METRICS = ("upload", "download", "seeding", "seeding_size", "bonus")
+    # 计算增量的指标
+    DELTA_METRICS = ("upload", "download")
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = Lock()
+        self._dates: List[str] = []
+        self._sites: List[str] = []
+        self._site_index: Dict[str, int] = {}
+        self._values: Dict[str, List[list]] = {}
+        self._deltas: Dict[str, List[list]] = {}
+        self._totals: Dict[str, list] = {}
+        self._delta_totals: Dict[str, list] = {}
+        self._snapshot: Dict[str, Any] = {}
+        self._dirty = False
+        self.load()
+
+    def __reset(self):
+        self._dates, self._sites, self._site_index = [], [], {}
+        self._values = {metric: [] for metric in self.METRICS}
+        self._deltas = {metric: [] for metric in self.DELTA_METRICS}
+        self._totals = {metric: [] for metric in self.METRICS}
+        self._delta_totals = {metric: [] for metric in self.DELTA_METRICS}
+        self._snapshot = {}
+
+    def load(self):
+        """
+        从文件加载
+        """
+        with self._lock:
+            self.__reset()
+            self._dirty = False
+            if not self._path.exists():
+                return
+            try:
+                data = json.loads(self._path.read_text(encoding="utf-8")) or {}
+                dates = data.get("dates") or []
+                sites = data.get("sites") or []
+                values = data.get("values") or {}
+                deltas = data.get("deltas") or {}
+                totals = data.get("totals") or {}
+                delta_totals = data.get("delta_totals") or {}
+                # 校验各列长度，不一致时视为损坏，重新迁移
+                for metric in self.METRICS:
+                    if len(values.get(metric) or []) != len(sites) \
+                            or len(totals.get(metric) or []) != len(dates) \
+                            or any(len(row) != len(dates) for row in values[metric]):
+                        raise ValueError(f"指标 {metric} 数据不完整")
+                for metric in self.DELTA_METRICS:
+                    if len(deltas.get(metric) or []) != len(sites) \
+                            or len(delta_totals.get(metric) or []) != len(dates):
+                        raise ValueError(f"指标 {metric} 增量数据不完整")
+                self._dates, self._sites = dates, sites
+                self._site_index = {site: row for row, site in enumerate(sites)}
+                self._values = {metric: values[metric] for metric in self.METRICS}
+                self._deltas = {metric: deltas[metric] for metric in self.DELTA_METRICS}
+                self._totals = {metric: totals[metric] for metric in self.METRICS}
+                self._delta_totals = {metric: delta_totals[metric] for metric in self.DELTA_METRICS}
+                self._snapshot = data.get("snapshot") or {}
+            except Exception as e:
+                self.__reset()
+                logger.error(f"加载站点数据存储失败：{str(e)}")
+
+    def save(self) -> bool:
+        """
+        有变化时写入文件
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            content = json.dumps({
+                "dates": self._dates,
+                "sites": self._sites,
+                "values": self._values,
+                "deltas": self._deltas,
+                "totals": self._totals,
+                "delta_totals": self._delta_totals,
+                "snapshot": self._snapshot
+            }, separators=(',', ':'), ensure_ascii=False)
+            self._dirty = False
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_suffix(".tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, self._path)
+            return True
+        except Exception as e:
+            logger.error(f"保存站点数据存储失败：{str(e)}")
+            return False
+
+    @property
+    def last_date(self) -> Optional[str]:
+        """
+        最新数据日期
+        """
+        return self._dates[-1] if self._dates else None
+
+    @staticmethod
+    def __to_number(value: Any) -> Optional[float]:
+        """
+        转换为数值，无法转换时返回 None
+        """
+        if value is None or value == "":
+            return None
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return int(number) if number.is_integer() else number
+
+    def append(self, date: str, sites_data: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        追加一天的站点数据，同一天重复写入时覆盖当天数据，早于最新日期的数据不写入
+        """
+        if not date or not isinstance(sites_data, dict):
+            return False
+        with self._lock:
+            if self._dates and date < self._dates[-1]:
+                logger.warn(f"站点数据日期 {date} 早于已保存的 {self._dates[-1]}，不写入")
+                return False
+            if not self._dates or date > self._dates[-1]:
+                # 新增一列
+                self._dates.append(date)
+                for rows in list(self._values.values()) + list(self._deltas.values()):
+                    for row in rows:
+                        row.append(None)
+                for column in list(self._totals.values()) + list(self._delta_totals.values()):
+                    column.append(None)
+            col = len(self._dates) - 1
+            # 覆盖当天数据时先清空
+            for rows in list(self._values.values()) + list(self._deltas.values()):
+                for row in rows:
+                    row[col] = None
+            for site, data in sites_data.items():
+                if not isinstance(data, dict):
+                    continue
+                row = self._site_index.get(site)
+                if row is None:
+                    # 新站点
+                    row = len(self._sites)
+                    self._sites.append(site)
+                    self._site_index[site] = row
+                    for rows in list(self._values.values()) + list(self._deltas.values()):
+                        rows.append([None] * len(self._dates))
+                for metric in self.METRICS:
+                    self._values[metric][row][col] = self.__to_number(data.get(metric))
+                for metric in self.DELTA_METRICS:
+                    value = self._values[metric][row][col]
+                    if value is None:
+                        continue
+                    # 与该站点上一个有数据的日期比较，没有历史数据时增量即为当前值
+                    previous = None
+                    for i in range(col - 1, -1, -1):
+                        if self._values[metric][row][i] is not None:
+                            previous = self._values[metric][row][i]
+                            break
+                    self._deltas[metric][row][col] = max(value - previous, 0) if previous is not None else value
+            # 汇总
+            for metric in self.METRICS:
+                self._totals[metric][col] = sum(row[col] for row in self._values[metric] if row[col] is not None)
+            for metric in self.DELTA_METRICS:
+                self._delta_totals[metric][col] = sum(row[col] for row in self._deltas[metric]
+                                                      if row[col] is not None)
+            self._snapshot = {"date": date, "data": sites_data}
+            self._dirty = True
+            return True
+
+    def __slice(self, start: str = None, end: str = None) -> Tuple[int, int]:
+        """
+        日期范围对应的列下标，含首尾
+        """
+        begin = bisect_left(self._dates, start) if start else 0
+        stop = bisect_right(self._dates, end) if end else len(self._dates)
+        return begin, stop
+
+    def get_snapshot(self) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+        """
+        最新一天的日期和完整站点数据
+        """
+        with self._lock:
+            return self._snapshot.get("date") or "", dict(self._snapshot.get("data") or {})
+
+    def get_deltas(self, date: str) -> Dict[str, Dict[str, Any]]:
+        """
+        指定日期各站点的增量数据
+        """
+        with self._lock:
+            begin, stop = self.__slice(date, date)
+            if begin == stop:
+                return {}
+            deltas = {}
+            for site, row in self._site_index.items():
+                inc = {metric: self._deltas[metric][row][begin] for metric in self.DELTA_METRICS
+                       if self._deltas[metric][row][begin] is not None}
+                if inc:
+                    deltas[site] = inc
+            return deltas
+
+    def get_series(self, metric: str, start: str = None, end: str = None,
+                   site: str = None, delta: bool = False) -> Tuple[List[str], list]:
+        """
+        查询日期范围内的指标序列
+        :param metric: 指标
+        :param start: 开始日期，含
+        :param end: 结束日期，含
+        :param site: 站点名称，为空时返回全部站点汇总
+        :param delta: 是否返回增量
+        :return: 日期列表、数值列表
+        """
+        with self._lock:
+            begin, stop = self.__slice(start, end)
+            if delta:
+                columns, totals = self._deltas.get(metric), self._delta_totals.get(metric)
+            else:
+                columns, totals = self._values.get(metric), self._totals.get(metric)
+            if totals is None:
+                return [], []
+            if site:
+                row = self._site_index.get(site)
+                if row is None:
+                    return [], []
+                return self._dates[begin:stop], columns[row][begin:stop]
+            return self._dates[begin:stop], totals[begin:stop]
+
+    def get_rollup(self, metric: str, start: str = None, end: str = None,
+                   site: str = None) -> float:
+        """
+        日期范围内的增量汇总
+        """
+        _, values = self.get_series(metric=metric, start=start, end=end, site=site, delta=True)
+        return sum(value for value in values if value)
+
+
 class SiteStatistic(_PluginBase):
     # 插件名称
     plugin_name = "站点数据统计"
@@ -42,7 +290,7 @@ class SiteStatistic(_PluginBase):
     # 插件图标
     plugin_icon = "statistic.png"
     # 插件版本
-    plugin_version = "4.0.1"
+    plugin_version = "4.3"
     # 插件作者
     plugin_author = "lightolly"
     # 作者主页
@@ -61,6 +309,11 @@ class SiteStatistic(_PluginBase):
     _last_update_time: Optional[datetime] = None
     _sites_data: dict = {}
     _site_schema: List[ISiteUserInfo] = None
+    # 站点域名 -> 已识别的站点类型
+    _site_schema_cache: Dict[str, Any] = {}
+    # 站点数据时序存储
+    _store: Optional[SiteDataStore] = None
+    _store_lock = Lock()
 
     # 配置属性
     _enabled: bool = False
@@ -79,6 +332,9 @@ class SiteStatistic(_PluginBase):
         self.siteoper = SiteOper()
         # 停止现有任务
         self.stop_service()
+        # 插件数据可能已被清理或重新导入，下次使用时重新加载站点数据存储
+        with self._store_lock:
+            self._store = None
 
         # 配置
         if config:
@@ -105,6 +361,7 @@ class SiteStatistic(_PluginBase):
                                                   filter_func=lambda _, obj: hasattr(obj, 'schema'))
 
             self._site_schema.sort(key=lambda x: x.order)
+            self._site_schema_cache = {}
             # 站点上一次更新时间
             self._last_update_time = None
             # 站点数据
@@ -427,39 +684,62 @@ class SiteStatistic(_PluginBase):
             "dashboard_type": 'today'
         }
 
+    def __get_store(self) -> SiteDataStore:
+        """
+        获取站点数据时序存储，首次使用时从按日期保存的历史数据迁移
+        """
+        with self._store_lock:
+            if not self._store:
+                store = SiteDataStore(self.get_data_path() / "site_data.json")
+                last_update_time = self.get_data("last_update_time")
+                if last_update_time and (not store.last_date or store.last_date < last_update_time):
+                    self.__migrate_store(store)
+                self._store = store
+            return self._store
+
+    def __migrate_store(self, store: SiteDataStore):
+        """
+        将 save_data 按日期保存的站点数据迁移到时序存储
+        """
+        data_list: List[PluginData] = self.get_data(key=None) or []
+        # 取key符合日期格式且晚于存储中最新日期的数据
+        last_date = store.last_date or ""
+        data_list = [data for data in data_list
+                     if re.match(r"\d{4}-\d{2}-\d{2}$", data.key) and data.key > last_date]
+        data_list.sort(key=lambda x: x.key)
+        count = 0
+        for data in data_list:
+            if not ObjectUtils.is_obj(data.value):
+                continue
+            try:
+                if store.append(data.key, json.loads(data.value)):
+                    count += 1
+            except Exception as e:
+                logger.error(f"迁移 {data.key} 站点数据失败：{str(e)}")
+        if count:
+            store.save()
+            logger.info(f"已迁移 {count} 天站点数据到时序存储")
+
     def __get_data(self) -> Tuple[str, dict, dict]:
         """
-        获取今天的日期、今天的站点数据、昨天的站点数据
+        获取最新的日期、站点数据、各站点相对上一次的增量数据
         """
-        # 最近一天的签到数据
-        stattistic_data: Dict[str, Dict[str, Any]] = {}
-        # 昨天数据
-        yesterday_sites_data: Dict[str, Dict[str, Any]] = {}
-        # 获取最近所有数据
-        data_list: List[PluginData] = self.get_data(key=None)
-        if not data_list:
+        store = self.__get_store()
+        today, stattistic_data = store.get_snapshot()
+        if not stattistic_data:
             return "", {}, {}
-        # 取key符合日期格式的数据
-        data_list = [data for data in data_list if re.match(r"\d{4}-\d{2}-\d{2}", data.key)]
-        # 按日期倒序排序
-        data_list.sort(key=lambda x: x.key, reverse=True)
-        # 今天的日期
-        today = data_list[0].key
-        # 数据按时间降序排序
-        datas = [json.loads(data.value) for data in data_list if ObjectUtils.is_obj(data.value)]
-        if len(data_list) > 0:
-            stattistic_data = datas[0]
-        if len(data_list) > 1:
-            yesterday_sites_data = datas[1]
+        deltas = store.get_deltas(today)
 
         # 数据按时间降序排序
         stattistic_data = dict(sorted(stattistic_data.items(),
                                       key=lambda item: item[1].get('upload') or 0,
                                       reverse=True))
-        return today, stattistic_data, yesterday_sites_data
+        # 增量数据与站点数据顺序一致
+        inc_data = {site: deltas[site] for site in stattistic_data if site in deltas}
+        return today, stattistic_data, inc_data
 
     @staticmethod
-    def __get_total_elements(today: str, stattistic_data: dict, yesterday_sites_data: dict,
+    def __get_total_elements(today: str, stattistic_data: dict, inc_data: dict,
                              dashboard: str = "today") -> List[dict]:
         """
         获取统计元素
@@ -473,22 +753,6 @@ class SiteStatistic(_PluginBase):
                 return 0
             return round(float(value) / 1024 / 1024 / 1024, 1)
 
-        def __sub_dict(d1: dict, d2: dict) -> dict:
-            """
-            计算两个字典相同Key值的差值（如果值为数字），返回新字典
-            """
-            if not d1:
-                return {}
-            if not d2:
-                return d1
-            d = {k: int(d1.get(k)) - int(d2.get(k)) for k in d1
-                 if k in d2 and str(d1.get(k)).isdigit() and str(d2.get(k)).isdigit()}
-            # 把小于0的数据变成0
-            for k, v in d.items():
-                if str(v).isdigit() and int(v) < 0:
-                    d[k] = 0
-            return d
-
         if dashboard in ['total', 'all']:
             # 总上传量
             total_upload = sum([int(data.get("upload"))
@@ -785,12 +1049,6 @@ class SiteStatistic(_PluginBase):
             total_elements = []
 
         if dashboard in ["today", "all"]:
-            # 计算增量数据集
-            inc_data = {}
-            for site, data in stattistic_data.items():
-                inc = __sub_dict(data, yesterday_sites_data.get(site))
-                if inc:
-                    inc_data[site] = inc
             # 今日上传
             uploads = {k: v for k, v in inc_data.items() if v.get("upload")}
             # 今日上传站点
@@ -909,7 +1167,7 @@ class SiteStatistic(_PluginBase):
         # 全局配置
         attrs = {}
         # 获取数据
-        today, stattistic_data, yesterday_sites_data = self.__get_data()
+        today, stattistic_data, inc_data = self.__get_data()
         # 汇总
         # 站点统计
         elements = [
@@ -918,7 +1176,7 @@ class SiteStatistic(_PluginBase):
                 'content': self.__get_total_elements(
                     today=today,
                     stattistic_data=stattistic_data,
-                    yesterday_sites_data=yesterday_sites_data,
+                    inc_data=inc_data,
                     dashboard=self._dashboard_type
                 )
             }
@@ -937,7 +1195,7 @@ class SiteStatistic(_PluginBase):
                 return '0.0'
 
         # 获取数据
-        today, stattistic_data, yesterday_sites_data = self.__get_data()
+        today, stattistic_data, inc_data = self.__get_data()
         if not stattistic_data:
             return [
                 {
@@ -953,10 +1211,61 @@ class SiteStatistic(_PluginBase):
         site_totals = self.__get_total_elements(
             today=today,
             stattistic_data=stattistic_data,
-            yesterday_sites_data=yesterday_sites_data,
+            inc_data=inc_data,
             dashboard='all'
         )
 
+        # 近30天上传下载趋势
+        trend_start = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=29)).strftime('%Y-%m-%d')
+        store = self.__get_store()
+        trend_dates, trend_uploads = store.get_series("upload", start=trend_start, end=today, delta=True)
+        _, trend_downloads = store.get_series("download", start=trend_start, end=today, delta=True)
+        trend_upload = store.get_rollup("upload", start=trend_start, end=today)
+        trend_download = store.get_rollup("download", start=trend_start, end=today)
+        trend_elements = [
+            {
+                'component': 'VCol',
+                'props': {
+                    'cols': 12
+                },
+                'content': [
+                    {
+                        'component': 'VApexChart',
+                        'props': {
+                            'height': 300,
+                            'options': {
+                                'chart': {
+                                    'type': 'line',
+                                },
+                                'xaxis': {
+                                    'categories': trend_dates
+                                },
+                                'title': {
+                                    'text': f'近30天上传 {StringUtils.str_filesize(trend_upload)}，'
+                                            f'下载 {StringUtils.str_filesize(trend_download)}'
+                                },
+                                'noData': {
+                                    'text': '暂无数据'
+                                }
+                            },
+                            'series': [
+                                {
+                                    'name': '上传量',
+                                    'data': [round(float(value or 0) / 1024 / 1024 / 1024, 1)
+                                             for value in trend_uploads]
+                                },
+                                {
+                                    'name': '下载量',
+                                    'data': [round(float(value or 0) / 1024 / 1024 / 1024, 1)
+                                             for value in trend_downloads]
+                                }
+                            ]
+                        }
+                    }
+                ]
+            }
+        ]
+
         # 站点数据明细
         site_trs = [
             {
@@ -1018,7 +1327,7 @@ class SiteStatistic(_PluginBase):
         return [
             {
                 'component': 'VRow',
-                'content': site_totals + [
+                'content': site_totals + trend_elements + [
                     # 各站点数据明细
                     {
                         'component': 'VCol',
@@ -1125,7 +1434,19 @@ class SiteStatistic(_PluginBase):
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
 
-    def __build_class(self, html_text: str) -> Any:
+    def __build_class(self, html_text: str, url: str = None) -> Any:
+        """
+        识别站点类型，识别成功后按域名缓存，后续刷新不再逐个匹配
+        """
+        domain = StringUtils.get_url_domain(url) if url else None
+        if domain and domain in self._site_schema_cache:
+            return self._site_schema_cache[domain]
+        site_schema = self.__match_class(html_text)
+        if domain and site_schema:
+            self._site_schema_cache[domain] = site_schema
+        return site_schema
+
+    def __match_class(self, html_text: str) -> Any:
         for site_schema in self._site_schema:
             try:
                 if site_schema.match(html_text):
@@ -1227,7 +1548,7 @@ class SiteStatistic(_PluginBase):
                     return None
             # 解析站点类型
             if html_text:
-                site_schema = self.__build_class(html_text)
+                site_schema = self.__build_class(html_text, url=url)
                 if not site_schema:
                     logger.error(f"站点 {site_name} 无法识别站点类型，可能是由于插件代码不全，请尝试强制重装插件以确保代码完整")
                     return None
@@ -1288,6 +1609,8 @@ class SiteStatistic(_PluginBase):
 
                 # 获取不到数据时，仅返回错误信息，不做历史数据更新
                 if site_user_info.err_msg:
+                    # 下次刷新重新识别站点类型
+                    self._site_schema_cache.pop(StringUtils.get_url_domain(site_url), None)
                     self._sites_data.update({site_name: {"err_msg": site_user_info.err_msg}})
                     return None
 
@@ -1324,6 +1647,7 @@ class SiteStatistic(_PluginBase):
 
         except Exception as e:
             import traceback
+            self._site_schema_cache.pop(StringUtils.get_url_domain(site_url), None)
             logger.error(f"站点 {site_name} 获取流量数据失败：{str(e)}")
             logger.error(traceback.format_exc())
         return None
@@ -1389,7 +1713,7 @@ class SiteStatistic(_PluginBase):
             # 将数据初始化为前一天，筛选站点
             yesterday_sites_data = {}
             today_date = datetime.now().strftime('%Y-%m-%d')
-            if self._statistic_type == "add" or not self._remove_failed:
+            if not self._remove_failed:
                 if last_update_time := self.get_data("last_update_time"):
                     yesterday_sites_data = self.get_data(last_update_time) or {}
 
@@ -1401,8 +1725,21 @@ class SiteStatistic(_PluginBase):
             with ThreadPool(min(len(refresh_sites), int(self._queue_cnt or 5))) as p:
                 p.map(self.__refresh_site_data, refresh_sites)
 
+            # 保存数据
+            self.save_data(today_date, self._sites_data)
+
+            # 更新时间
+            self.save_data("last_update_time", today_date)
+
+            # 写入时序存储
+            store = self.__get_store()
+            if store.append(today_date, self._sites_data):
+                store.save()
+
             # 通知刷新完成
             if self._notify:
+                # 各站点相对上一次的增量
+                inc_data = store.get_deltas(today_date) if self._statistic_type == "add" else {}
                 messages = {}
                 # 总上传
                 incUploads = 0
@@ -1414,9 +1751,9 @@ class SiteStatistic(_PluginBase):
                     download = int(self._sites_data[site].get("download") or 0)
                     updated_date = self._sites_data[site].get("updated_at")
 
-                    if self._statistic_type == "add" and yesterday_sites_data.get(site):
-                        upload -= int(yesterday_sites_data[site].get("upload") or 0)
-                        download -= int(yesterday_sites_data[site].get("download") or 0)
+                    if self._statistic_type == "add":
+                        upload = int(inc_data.get(site, {}).get("upload") or 0)
+                        download = int(inc_data.get(site, {}).get("download") or 0)
 
                     if updated_date and updated_date != today_date:
                         updated_date = f"（{updated_date}）"
@@ -1442,12 +1779,6 @@ class SiteStatistic(_PluginBase):
                     self.post_message(mtype=NotificationType.SiteMessage,
                                       title="站点数据统计", text="\n".join(sorted_messages))
 
-            # 保存数据
-            self.save_data(today_date, self._sites_data)
-
-            # 更新时间
-            self.save_data("last_update_time", today_date)
-
             self.eventmanager.send_event(etype=EventType.PluginAction, data={
                 "action": "sitestatistic_refresh_complete"
             })
@@ -2,10 +2,13 @@
 import json
 import re
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Optional
+from typing import Optional, List
 from urllib.parse import urljoin, urlsplit
 
+from lxml import etree
 from requests import Session
 
 from app.core.config import settings
@@ -43,6 +46,17 @@ class ISiteUserInfo(metaclass=ABCMeta):
     order = SITE_BASE_ORDER
     # 请求模式 cookie/apikey
     request_mode = "cookie"
+    # 页面解析缓存数量
+    _html_cache_size = 4
+    # 单站点做种页面并发请求数，为1时逐页请求
+    seeding_page_concurrency = 3
+    # 并发请求的做种页面数上限
+    _max_seeding_pages = 500
+    # 分页参数
+    _page_param_pattern = re.compile(r"([?&;]page=)(\d+)")
+    # 处理HTML干扰部分的正则
+    _px_pattern = re.compile(r"\d+px")
+    _hash_pattern = re.compile(r"#\d+")
 
     def __init__(self, site_name: str,
                  url: str,
@@ -98,6 +112,8 @@ class ISiteUserInfo(metaclass=ABCMeta):
         self.err_msg = None
         # 内部数据
         self._addition_headers = None
+        # 页面解析缓存，同一页面只解析一次
+        self._html_cache = OrderedDict()
 
         # 站点页面
         self._brief_page = "index.php"
@@ -190,6 +206,8 @@ class ISiteUserInfo(metaclass=ABCMeta):
         # 解析用户做种信息
         self._parse_seeding_pages()
         self.seeding_info = json.dumps(self.seeding_info)
+        # 解析完成，释放页面缓存
+        self._html_cache.clear()
 
     def _pase_unread_msgs(self):
         """
@@ -238,17 +256,27 @@ class ISiteUserInfo(metaclass=ABCMeta):
 
     def _parse_seeding_pages(self):
         """
-        解析做种页面
+        解析做种页面，按第一页的分页链接并发请求其余页面，超出分页链接的页面按顺序获取
         """
         if self._torrent_seeding_page:
             # 第一页
-            next_page = self._parse_user_torrent_seeding_info(
-                self._get_page_content(
-                    url=urljoin(self._base_url, self._torrent_seeding_page),
-                    params=self._torrent_seeding_params,
-                    headers=self._torrent_seeding_headers
-                )
+            html_text = self._get_page_content(
+                url=urljoin(self._base_url, self._torrent_seeding_page),
+                params=self._torrent_seeding_params,
+                headers=self._torrent_seeding_headers
             )
+            next_page = self._parse_user_torrent_seeding_info(html_text)
+
+            # 其他页并发处理，第一页返回的是扩展做种页面时按原方式处理
+            if next_page and isinstance(next_page, str) and next_page != self._torrent_seeding_page \
+                    and self.seeding_page_concurrency > 1:
+                page_urls = self._get_seeding_page_urls(html_text, next_page)
+                if page_urls:
+                    logger.debug(f"{self.site_name} 至少 {len(page_urls) + 1} 页做种数据，并发获取")
+                    next_page = self.__parse_seeding_pages_concurrently(page_urls)
+                    # 分页链接未列出全部页码时，最后一页仍有下页，从该页继续按顺序获取
+                    if next_page in page_urls:
+                        next_page = None
 
             # 其他页处理
             while next_page is not None and next_page is not False:
@@ -260,12 +288,81 @@ class ISiteUserInfo(metaclass=ABCMeta):
                     ),
                     multi_page=True)
 
-    @staticmethod
-    def _prepare_html_text(html_text):
+    def _get_seeding_page_urls(self, html_text: str, next_page: str) -> List[str]:
+        """
+        根据第一页的分页链接计算其余页面地址，无法确定总页数时返回空列表
+        :param html_text: 第一页内容
+        :param next_page: 第一页解析出的下页地址
+        :return: 第二页起的全部页面地址
+        """
+        next_match = self._page_param_pattern.search(next_page)
+        if not next_match:
+            return []
+        next_page_no = int(next_match.group(2))
+        # 与下页地址只有页码不同的链接视为分页链接
+        template = self._page_param_pattern.sub(r"\g<1>{page}", next_page, count=1)
+        html = self._get_html(str(html_text).replace(r'\/', '/'))
+        if html is None:
+            return []
+        last_page_no = next_page_no
+        for href in html.xpath("//a/@href"):
+            href = str(href).strip()
+            page_match = self._page_param_pattern.search(href)
+            if not page_match:
+                continue
+            # 下页地址可能在分页链接后追加了参数
+            if not template.startswith(self._page_param_pattern.sub(r"\g<1>{page}", href, count=1)):
+                continue
+            last_page_no = max(last_page_no, int(page_match.group(2)))
+        if last_page_no <= next_page_no or last_page_no - next_page_no >= self._max_seeding_pages:
+            return []
+        return [template.replace("{page}", str(page_no), 1) for page_no in range(next_page_no, last_page_no + 1)]
+
+    def __parse_seeding_pages_concurrently(self, page_urls: List[str]) -> Optional[str]:
+        """
+        并发请求做种页面，按页码顺序解析
+        :return: 最后一页解析出的下页地址
+        """
+        base_url = urljoin(self._base_url, self._torrent_seeding_page)
+        with ThreadPoolExecutor(max_workers=min(self.seeding_page_concurrency, len(page_urls)),
+                                thread_name_prefix=f"SiteStatistic-{self.site_domain}") as executor:
+            futures = [executor.submit(self._get_page_content,
+                                       url=urljoin(base_url, page_url),
+                                       params=self._torrent_seeding_params,
+                                       headers=self._torrent_seeding_headers)
+                       for page_url in page_urls]
+            next_page = None
+            for future in futures:
+                try:
+                    html_text = future.result()
+                except Exception as e:
+                    logger.error(f"{self.site_name} 获取做种页面失败：{str(e)}")
+                    next_page = None
+                    continue
+                next_page = self._parse_user_torrent_seeding_info(html_text, multi_page=True)
+        return next_page
+
+    @classmethod
+    def _prepare_html_text(cls, html_text):
         """
         处理掉HTML中的干扰部分
         """
-        return re.sub(r"#\d+", "", re.sub(r"\d+px", "", html_text))
+        return cls._hash_pattern.sub("", cls._px_pattern.sub("", html_text))
+
+    def _get_html(self, html_text: str):
+        """
+        解析HTML，同一页面内容只解析一次，多个解析方法共用解析结果
+        :param html_text: 页面内容
+        :return: 解析后的HTML文档，不可修改
+        """
+        if html_text in self._html_cache:
+            self._html_cache.move_to_end(html_text)
+            return self._html_cache[html_text]
+        html = etree.HTML(html_text)
+        self._html_cache[html_text] = html
+        if len(self._html_cache) > self._html_cache_size:
+            self._html_cache.popitem(last=False)
+        return html
 
     @abstractmethod
     def _parse_message_unread_links(self, html_text: str, msg_links: list) -> Optional[str]:
@@ -23,7 +23,7 @@ class DiscuzUserInfo(ISiteUserInfo):
 
     def _parse_user_base_info(self, html_text: str):
         html_text = self._prepare_html_text(html_text)
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
 
         user_info = html.xpath('//a[contains(@href, "&uid=")]')
         if user_info:
@@ -44,7 +44,7 @@ class DiscuzUserInfo(ISiteUserInfo):
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
@@ -87,7 +87,7 @@ class DiscuzUserInfo(ISiteUserInfo):
         :param multi_page: 是否多页数据
         :return: 下页地址
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
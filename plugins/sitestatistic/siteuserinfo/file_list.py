@@ -33,7 +33,7 @@ class FileListSiteUserInfo(ISiteUserInfo):
 
     def _parse_user_base_info(self, html_text: str):
         html_text = self._prepare_html_text(html_text)
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
 
         ret = html.xpath(f'//a[contains(@href, "userdetails") and contains(@href, "{self.userid}")]//text()')
         if ret:
@@ -49,7 +49,7 @@ class FileListSiteUserInfo(ISiteUserInfo):
 
     def _parse_user_detail_info(self, html_text: str):
         html_text = self._prepare_html_text(html_text)
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
 
         upload_html = html.xpath('//table//tr/td[text()="Uploaded"]/following-sibling::td//text()')
         if upload_html:
@@ -89,7 +89,7 @@ class FileListSiteUserInfo(ISiteUserInfo):
         :param multi_page: 是否多页数据
         :return: 下页地址
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
@@ -24,7 +24,7 @@ class GazelleSiteUserInfo(ISiteUserInfo):
 
     def _parse_user_base_info(self, html_text: str):
         html_text = self._prepare_html_text(html_text)
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
 
         tmps = html.xpath('//a[contains(@href, "user.php?id=")]')
         if tmps:
@@ -76,7 +76,7 @@ class GazelleSiteUserInfo(ISiteUserInfo):
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
@@ -106,7 +106,7 @@ class GazelleSiteUserInfo(ISiteUserInfo):
         :param multi_page: 是否多页数据
         :return: 下页地址
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
@@ -13,6 +13,67 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
     schema = SiteSchema.NexusPhp
     order = SITE_BASE_ORDER * 2
 
+    # 预编译XPath，避免每次解析重复编译
+    _string_xpath = etree.XPath("string(.)")
+    _message_labels_xpath = etree.XPath('//a[@href="messages.php"]/..')
+    _message_contains_labels_xpath = etree.XPath('//a[contains(@href, "messages.php")]/..')
+    _username_bold_xpath = etree.XPath('//a[contains(@href, "userdetails") and contains(@href, $userid)]//b//text()')
+    _username_xpath = etree.XPath('//a[contains(@href, "userdetails") and contains(@href, $userid)]//text()')
+    _username_strong_xpath = etree.XPath('//a[contains(@href, "userdetails")]//strong//text()')
+    _bonus_xpath = etree.XPath('//a[contains(@href,"mybonus")]/text()')
+    _ucoin_gold_xpath = etree.XPath('//span[@class = "ucoin-symbol ucoin-gold"]//text()')
+    _ucoin_silver_xpath = etree.XPath('//span[@class = "ucoin-symbol ucoin-silver"]//text()')
+    _ucoin_copper_xpath = etree.XPath('//span[@class = "ucoin-symbol ucoin-copper"]//text()')
+    _seeding_url_xpath = etree.XPath('//a[contains(@href,"torrents.php") and contains(@href,"seeding")]/@href')
+    _size_col_xpath = etree.XPath('//tr[position()=1]/'
+                                  'td[(img[@class="size"] and img[@alt="size"])'
+                                  ' or (text() = "大小")'
+                                  ' or (a/img[@class="size" and @alt="size"])]')
+    _seeders_col_xpath = etree.XPath('//tr[position()=1]/'
+                                     'td[(img[@class="seeders"] and img[@alt="seeders"])'
+                                     ' or (text() = "在做种")'
+                                     ' or (a/img[@class="seeders" and @alt="seeders"])]')
+    _torrents_table_xpath = etree.XPath('//table[@class="torrents"]')
+    _seeding_sizes_xpath = etree.XPath('//tr[position()>1]/td[$col]')
+    _seeding_seeders_xpath = etree.XPath('//tr[position()>1]/td[$col]/b/a/text()')
+    _seeding_seeders_text_xpath = etree.XPath('//tr[position()>1]/td[$col]//text()')
+    _table_seeding_sizes_xpath = etree.XPath('//table[@class="torrents"]//tr[position()>1]/td[$col]')
+    _table_seeding_seeders_xpath = etree.XPath('//table[@class="torrents"]//tr[position()>1]/td[$col]/b/a/text()')
+    _table_seeding_seeders_text_xpath = etree.XPath('//table[@class="torrents"]//tr[position()>1]/td[$col]//text()')
+    _seeding_next_page_xpath = etree.XPath('//a[contains(.//text(), "下一页") or contains(.//text(), "下一頁")'
+                                           ' or contains(.//text(), ">")]/@href')
+    _join_at_xpath = etree.XPath('//tr/td[text()="加入日期" or text()="注册日期" or *[text()="加入日期"]]'
+                                 '/following-sibling::td[1]//text()'
+                                 '|//div/b[text()="加入日期"]/../text()')
+    _detail_seeding_sizes_xpath = etree.XPath('//tr/td[text()="当前上传"]/following-sibling::td[1]//'
+                                              'table[tr[1][td[4 and text()="尺寸"]]]//tr[position()>1]/td[4]')
+    _detail_seeding_seeders_xpath = etree.XPath('//tr/td[text()="当前上传"]/following-sibling::td[1]//'
+                                                'table[tr[1][td[5 and text()="做种者"]]]//tr[position()>1]/td[5]//text()')
+    _detail_seeding_stat_xpath = etree.XPath('//tr/td[text()="做种统计"]/following-sibling::td[1]//text()')
+    _seeding_list_url_xpath = etree.XPath('//a[contains(@href,"getusertorrentlist.php") '
+                                          'and contains(@href,"seeding")]/@href')
+    _seeding_js_url_xpath = etree.XPath('//a[contains(@href, "javascript: getusertorrentlistajax") '
+                                        'and contains(@href,"seeding")]/@href')
+    _csrf_xpath = etree.XPath('//meta[@name="x-csrf"]/@content')
+    _user_level_title_xpath = etree.XPath('//tr/td[text()="等級" or text()="等级" or *[text()="等级"]]/'
+                                          'following-sibling::td[1]/img[1]/@title')
+    _user_level_text_xpath = etree.XPath('//tr/td[text()="等級" or text()="等级"]/'
+                                         'following-sibling::td[1 and not(img)]'
+                                         '|//tr/td[text()="等級" or text()="等级"]/'
+                                         'following-sibling::td[1 and img[not(@title)]]')
+    _user_level_td_xpath = etree.XPath('//tr/td[text()="等級" or text()="等级"]/following-sibling::td[1]')
+    _user_level_ptt_xpath = etree.XPath('//tr/td[text()="用户等级"]/following-sibling::td[1]/b/@title')
+    _user_level_link_xpath = etree.XPath('//a[contains(@href, "userdetails")]/text()')
+    _message_links_xpath = etree.XPath('//tr[not(./td/img[@alt="Read"])]/td/a[contains(@href, "viewmessage")]/@href')
+    _message_next_page_xpath = etree.XPath('//a[contains(.//text(), "下一页") or contains(.//text(), "下一頁")]/@href')
+    _message_head_xpath = etree.XPath('//h1/text()'
+                                      '|//div[@class="layui-card-header"]/span[1]/text()')
+    _message_date_xpath = etree.XPath('//h1/following-sibling::table[.//tr/td[@class="colhead"]]//tr[2]/td[2]'
+                                      '|//div[@class="layui-card-header"]/span[2]/span[2]')
+    _message_content_xpath = etree.XPath('//h1/following-sibling::table[.//tr/td[@class="colhead"]]//tr[3]/td'
+                                         '|//div[contains(@class,"layui-card-body")]')
+    _bonus_td_xpath = etree.XPath('//tr/td[text()="魔力值" or text()="猫粮"]/following-sibling::td[1]/text()')
+
     @classmethod
     def match(cls, html_text: str) -> bool:
         """
@@ -43,14 +104,14 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
-        message_labels = html.xpath('//a[@href="messages.php"]/..')
-        message_labels.extend(html.xpath('//a[contains(@href, "messages.php")]/..'))
+        message_labels = self._message_labels_xpath(html)
+        message_labels.extend(self._message_contains_labels_xpath(html))
         if message_labels:
-            message_text = message_labels[0].xpath("string(.)")
+            message_text = self._string_xpath(message_labels[0])
 
             logger.debug(f"{self.site_name} 消息原始信息 {message_text}")
             message_unread_match = re.findall(r"[^Date](信息箱\s*|\(|你有\xa0)(\d+)", message_text)
@@ -70,19 +131,19 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
         self._parse_message_unread(html_text)
 
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
-        ret = html.xpath(f'//a[contains(@href, "userdetails") and contains(@href, "{self.userid}")]//b//text()')
+        ret = self._username_bold_xpath(html, userid=str(self.userid))
         if ret:
             self.username = str(ret[0])
             return
-        ret = html.xpath(f'//a[contains(@href, "userdetails") and contains(@href, "{self.userid}")]//text()')
+        ret = self._username_xpath(html, userid=str(self.userid))
         if ret:
             self.username = str(ret[0])
 
-        ret = html.xpath('//a[contains(@href, "userdetails")]//strong//text()')
+        ret = self._username_strong_xpath(html)
         if ret:
             self.username = str(ret[0])
             return
@@ -107,11 +168,11 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         leeching_match = re.search(r"(Torrents leeching|下载中)[\u4E00-\u9FA5\D\s]+(\d+)[\s\S]+<", html_text)
         self.leeching = StringUtils.str_int(leeching_match.group(2)) if leeching_match and leeching_match.group(
             2).strip() else 0
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         has_ucoin, self.bonus = self._parse_ucoin(html)
         if has_ucoin:
             return
-        tmps = html.xpath('//a[contains(@href,"mybonus")]/text()') if html else None
+        tmps = self._bonus_xpath(html) if html else None
         if tmps:
             bonus_text = str(tmps[0]).strip()
             bonus_match = re.search(r"([\d,.]+)", bonus_text)
@@ -131,8 +192,8 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         except Exception as err:
             logger.error(f"{self.site_name} 解析魔力值出错, 错误信息: {str(err)}")
 
-    @staticmethod
-    def _parse_ucoin(html):
+    @classmethod
+    def _parse_ucoin(cls, html):
         """
         解析ucoin, 统一转换为铜币
         :param html:
@@ -141,13 +202,13 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         if html:
             gold, silver, copper = None, None, None
 
-            golds = html.xpath('//span[@class = "ucoin-symbol ucoin-gold"]//text()')
+            golds = cls._ucoin_gold_xpath(html)
             if golds:
                 gold = StringUtils.str_float(str(golds[-1]))
-            silvers = html.xpath('//span[@class = "ucoin-symbol ucoin-silver"]//text()')
+            silvers = cls._ucoin_silver_xpath(html)
             if silvers:
                 silver = StringUtils.str_float(str(silvers[-1]))
-            coppers = html.xpath('//span[@class = "ucoin-symbol ucoin-copper"]//text()')
+            coppers = cls._ucoin_copper_xpath(html)
             if coppers:
                 copper = StringUtils.str_float(str(coppers[-1]))
             if gold or silver or copper:
@@ -164,13 +225,12 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :param multi_page: 是否多页数据
         :return: 下页地址
         """
-        html = etree.HTML(str(html_text).replace(r'\/', '/'))
+        html = self._get_html(str(html_text).replace(r'\/', '/'))
         if not html:
             return None
 
         # 首页存在扩展链接，使用扩展链接
-        seeding_url_text = html.xpath('//a[contains(@href,"torrents.php") '
-                                      'and contains(@href,"seeding")]/@href')
+        seeding_url_text = self._seeding_url_xpath(html)
         if multi_page is False and seeding_url_text and seeding_url_text[0].strip():
             self._torrent_seeding_page = seeding_url_text[0].strip()
             return self._torrent_seeding_page
@@ -178,34 +238,33 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         size_col = 3
         seeders_col = 4
         # 搜索size列
-        size_col_xpath = '//tr[position()=1]/' \
-                         'td[(img[@class="size"] and img[@alt="size"])' \
-                         ' or (text() = "大小")' \
-                         ' or (a/img[@class="size" and @alt="size"])]'
-        if html.xpath(size_col_xpath):
-            size_col = len(html.xpath(f'{size_col_xpath}/preceding-sibling::td')) + 1
+        size_cols = self._size_col_xpath(html)
+        if size_cols:
+            size_col = self.__count_preceding_cols(size_cols) + 1
         # 搜索seeders列
-        seeders_col_xpath = '//tr[position()=1]/' \
-                            'td[(img[@class="seeders"] and img[@alt="seeders"])' \
-                            ' or (text() = "在做种")' \
-                            ' or (a/img[@class="seeders" and @alt="seeders"])]'
-        if html.xpath(seeders_col_xpath):
-            seeders_col = len(html.xpath(f'{seeders_col_xpath}/preceding-sibling::td')) + 1
+        seeders_cols = self._seeders_col_xpath(html)
+        if seeders_cols:
+            seeders_col = self.__count_preceding_cols(seeders_cols) + 1
 
         page_seeding = 0
         page_seeding_size = 0
         page_seeding_info = []
         # 如果 table class="torrents"，则增加table[@class="torrents"]
-        table_class = '//table[@class="torrents"]' if html.xpath('//table[@class="torrents"]') else ''
-        seeding_sizes = html.xpath(f'{table_class}//tr[position()>1]/td[{size_col}]')
-        seeding_seeders = html.xpath(f'{table_class}//tr[position()>1]/td[{seeders_col}]/b/a/text()')
-        if not seeding_seeders:
-            seeding_seeders = html.xpath(f'{table_class}//tr[position()>1]/td[{seeders_col}]//text()')
+        if self._torrents_table_xpath(html):
+            seeding_sizes = self._table_seeding_sizes_xpath(html, col=size_col)
+            seeding_seeders = self._table_seeding_seeders_xpath(html, col=seeders_col)
+            if not seeding_seeders:
+                seeding_seeders = self._table_seeding_seeders_text_xpath(html, col=seeders_col)
+        else:
+            seeding_sizes = self._seeding_sizes_xpath(html, col=size_col)
+            seeding_seeders = self._seeding_seeders_xpath(html, col=seeders_col)
+            if not seeding_seeders:
+                seeding_seeders = self._seeding_seeders_text_xpath(html, col=seeders_col)
         if seeding_sizes and seeding_seeders:
             page_seeding = len(seeding_sizes)
 
             for i in range(0, len(seeding_sizes)):
-                size = StringUtils.num_filesize(seeding_sizes[i].xpath("string(.)").strip())
+                size = StringUtils.num_filesize(self._string_xpath(seeding_sizes[i]).strip())
                 seeders = StringUtils.str_int(seeding_seeders[i])
 
                 page_seeding_size += size
@@ -217,7 +276,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
         # 是否存在下页数据
         next_page = None
-        next_page_text = html.xpath('//a[contains(.//text(), "下一页") or contains(.//text(), "下一頁") or contains(.//text(), ">")]/@href')
+        next_page_text = self._seeding_next_page_xpath(html)
         if next_page_text:
             next_page = next_page_text[-1].strip()
             # fix up page url
@@ -226,13 +285,23 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
         return next_page
 
+    @staticmethod
+    def __count_preceding_cols(cols: list) -> int:
+        """
+        统计列前面的列数，与XPath preceding-sibling::td 的结果一致（多个列时取并集）
+        """
+        preceding = set()
+        for col in cols:
+            preceding.update(col.itersiblings("td", preceding=True))
+        return len(preceding)
+
     def _parse_user_detail_info(self, html_text: str):
         """
         解析用户额外信息，加入时间，等级
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
@@ -241,23 +310,19 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         self._fixup_traffic_info(html)
 
         # 加入日期
-        join_at_text = html.xpath(
-            '//tr/td[text()="加入日期" or text()="注册日期" or *[text()="加入日期"]]/following-sibling::td[1]//text()'
-            '|//div/b[text()="加入日期"]/../text()')
+        join_at_text = self._join_at_xpath(html)
         if join_at_text:
             self.join_at = StringUtils.unify_datetime_str(join_at_text[0].split(' (')[0].strip())
 
         # 做种体积 & 做种数
         # seeding 页面获取不到的话，此处再获取一次
-        seeding_sizes = html.xpath('//tr/td[text()="当前上传"]/following-sibling::td[1]//'
-                                   'table[tr[1][td[4 and text()="尺寸"]]]//tr[position()>1]/td[4]')
-        seeding_seeders = html.xpath('//tr/td[text()="当前上传"]/following-sibling::td[1]//'
-                                     'table[tr[1][td[5 and text()="做种者"]]]//tr[position()>1]/td[5]//text()')
+        seeding_sizes = self._detail_seeding_sizes_xpath(html)
+        seeding_seeders = self._detail_seeding_seeders_xpath(html)
         tmp_seeding = len(seeding_sizes)
         tmp_seeding_size = 0
         tmp_seeding_info = []
         for i in range(0, len(seeding_sizes)):
-            size = StringUtils.num_filesize(seeding_sizes[i].xpath("string(.)").strip())
+            size = StringUtils.num_filesize(self._string_xpath(seeding_sizes[i]).strip())
             seeders = StringUtils.str_int(seeding_seeders[i])
 
             tmp_seeding_size += size
@@ -270,7 +335,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         if not self.seeding_info:
             self.seeding_info = tmp_seeding_info
 
-        seeding_sizes = html.xpath('//tr/td[text()="做种统计"]/following-sibling::td[1]//text()')
+        seeding_sizes = self._detail_seeding_stat_xpath(html)
         if seeding_sizes:
             seeding_match = re.search(r"总做种数:\s+(\d+)", seeding_sizes[0], re.IGNORECASE)
             seeding_size_match = re.search(r"总做种体积:\s+([\d,.\s]+[KMGTPI]*B)", seeding_sizes[0], re.IGNORECASE)
@@ -292,14 +357,12 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :return:
         """
         # 单独的种子页面
-        seeding_url_text = html.xpath('//a[contains(@href,"getusertorrentlist.php") '
-                                      'and contains(@href,"seeding")]/@href')
+        seeding_url_text = self._seeding_list_url_xpath(html)
         if seeding_url_text:
             self._torrent_seeding_page = seeding_url_text[0].strip()
         # 从JS调用种获取用户ID
-        seeding_url_text = html.xpath('//a[contains(@href, "javascript: getusertorrentlistajax") '
-                                      'and contains(@href,"seeding")]/@href')
-        csrf_text = html.xpath('//meta[@name="x-csrf"]/@content')
+        seeding_url_text = self._seeding_js_url_xpath(html)
+        csrf_text = self._csrf_xpath(html)
         if not self._torrent_seeding_page and seeding_url_text:
             user_js = re.search(r"javascript: getusertorrentlistajax\(\s*'(\d+)", seeding_url_text[0])
             if user_js and user_js.group(1).strip():
@@ -320,33 +383,28 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
     def _get_user_level(self, html):
         # 等级 获取同一行等级数据，图片格式等级，取title信息，否则取文本信息
-        user_levels_text = html.xpath('//tr/td[text()="等級" or text()="等级" or *[text()="等级"]]/'
-                                      'following-sibling::td[1]/img[1]/@title')
+        user_levels_text = self._user_level_title_xpath(html)
         if user_levels_text:
             self.user_level = user_levels_text[0].strip()
             return
 
-        user_levels_text = html.xpath('//tr/td[text()="等級" or text()="等级"]/'
-                                      'following-sibling::td[1 and not(img)]'
-                                      '|//tr/td[text()="等級" or text()="等级"]/'
-                                      'following-sibling::td[1 and img[not(@title)]]')
+        user_levels_text = self._user_level_text_xpath(html)
         if user_levels_text:
-            self.user_level = user_levels_text[0].xpath("string(.)").strip()
+            self.user_level = self._string_xpath(user_levels_text[0]).strip()
             return
 
-        user_levels_text = html.xpath('//tr/td[text()="等級" or text()="等级"]/'
-                                      'following-sibling::td[1]')
+        user_levels_text = self._user_level_td_xpath(html)
         if user_levels_text:
-            self.user_level = user_levels_text[0].xpath("string(.)").strip()
+            self.user_level = self._string_xpath(user_levels_text[0]).strip()
             return
 
         # 适配PTT用户等级
-        user_levels_text = html.xpath('//tr/td[text()="用户等级"]/following-sibling::td[1]/b/@title')
+        user_levels_text = self._user_level_ptt_xpath(html)
         if user_levels_text:
             self.user_level = user_levels_text[0].strip()
             return
 
-        user_levels_text = html.xpath('//a[contains(@href, "userdetails")]/text()')
+        user_levels_text = self._user_level_link_xpath(html)
         if not self.user_level and user_levels_text:
             for user_level_text in user_levels_text:
                 user_level_match = re.search(r"\[(.*)]", user_level_text)
@@ -355,50 +413,47 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
                     break
 
     def _parse_message_unread_links(self, html_text: str, msg_links: list) -> Optional[str]:
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
-        message_links = html.xpath('//tr[not(./td/img[@alt="Read"])]/td/a[contains(@href, "viewmessage")]/@href')
+        message_links = self._message_links_xpath(html)
         msg_links.extend(message_links)
         # 是否存在下页数据
         next_page = None
-        next_page_text = html.xpath('//a[contains(.//text(), "下一页") or contains(.//text(), "下一頁")]/@href')
+        next_page_text = self._message_next_page_xpath(html)
         if next_page_text:
             next_page = next_page_text[-1].strip()
 
         return next_page
 
     def _parse_message_content(self, html_text):
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None, None, None
         # 标题
         message_head_text = None
-        message_head = html.xpath('//h1/text()'
-                                  '|//div[@class="layui-card-header"]/span[1]/text()')
+        message_head = self._message_head_xpath(html)
         if message_head:
             message_head_text = message_head[-1].strip()
 
         # 消息时间
         message_date_text = None
-        message_date = html.xpath('//h1/following-sibling::table[.//tr/td[@class="colhead"]]//tr[2]/td[2]'
-                                  '|//div[@class="layui-card-header"]/span[2]/span[2]')
+        message_date = self._message_date_xpath(html)
         if message_date:
-            message_date_text = message_date[0].xpath("string(.)").strip()
+            message_date_text = self._string_xpath(message_date[0]).strip()
 
         # 消息内容
         message_content_text = None
-        message_content = html.xpath('//h1/following-sibling::table[.//tr/td[@class="colhead"]]//tr[3]/td'
-                                     '|//div[contains(@class,"layui-card-body")]')
+        message_content = self._message_content_xpath(html)
         if message_content:
-            message_content_text = message_content[0].xpath("string(.)").strip()
+            message_content_text = self._string_xpath(message_content[0]).strip()
 
         return message_head_text, message_date_text, message_content_text
 
     def _fixup_traffic_info(self, html):
         # fixup bonus
         if not self.bonus:
-            bonus_text = html.xpath('//tr/td[text()="魔力值" or text()="猫粮"]/following-sibling::td[1]/text()')
+            bonus_text = self._bonus_td_xpath(html)
             if bonus_text:
                 self.bonus = StringUtils.str_float(bonus_text[0].strip())